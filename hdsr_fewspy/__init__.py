@@ -1,15 +1,23 @@
 from hdsr_fewspy._version import __version__
 from hdsr_fewspy.api import Api
+from hdsr_fewspy.async_api import AsyncApi
 from hdsr_fewspy.constants.choices import DefaultPiSettingsChoices
 from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.constants.choices import PiRestDocumentFormatChoices
 from hdsr_fewspy.constants.choices import TimeZoneChoices
 from hdsr_fewspy.constants.pi_settings import PiSettings
+from hdsr_fewspy.multi_api import ApiCall
+from hdsr_fewspy.multi_api import MultiApi
 
 
 # silence flake8
 Api = Api
+AsyncApi = AsyncApi
+MultiApi = MultiApi
+ApiCall = ApiCall
 PiSettings = PiSettings
 OutputChoices = OutputChoices
 TimeZoneChoices = TimeZoneChoices
+PiRestDocumentFormatChoices = PiRestDocumentFormatChoices
 DefaultPiSettingsChoices = DefaultPiSettingsChoices
 __version__ = __version__
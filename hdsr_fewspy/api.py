@@ -1,26 +1,18 @@
 from datetime import datetime
 from hdsr_fewspy import api_calls
-from hdsr_fewspy import exceptions
+from hdsr_fewspy.api_base import ApiBase
 from hdsr_fewspy.constants.choices import DefaultPiSettingsChoices
 from hdsr_fewspy.constants.choices import OutputChoices
-from hdsr_fewspy.constants.choices import TimeZoneChoices
 from hdsr_fewspy.constants.custom_types import ResponseType
 from hdsr_fewspy.constants.paths import SECRETS_ENV_PATH
-from hdsr_fewspy.constants.pi_settings import GithubPiSettingDefaults
 from hdsr_fewspy.constants.pi_settings import PiSettings
-from hdsr_fewspy.constants.request_settings import get_default_request_settings
-from hdsr_fewspy.constants.request_settings import RequestSettings
-from hdsr_fewspy.permissions import Permissions
 from hdsr_fewspy.retry_session import RetryBackoffSession
-from hdsr_fewspy.secrets import Secrets
 from pathlib import Path
 from typing import List
-from typing import Optional
+from typing import TYPE_CHECKING
 from typing import Union
 
-import geopandas as gpd
 import logging
-import os
 import pandas as pd
 import urllib3  # noqa
 
@@ -28,10 +20,13 @@ import urllib3  # noqa
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
+if TYPE_CHECKING:
+    import geopandas as gpd  # imported when used (see GetLocations), as it is slow to import
+
 logger = logging.getLogger(__name__)
 
 
-class Api:
+class Api(ApiBase):
     """Python API for the Deltares FEWS PI REST Web Service.
 
     The methods corresponding with the FEWS PI-REST requests. For more info on how to work with the FEWS REST Web
@@ -44,15 +39,15 @@ class Api:
         secrets_env_path: Union[str, Path] = SECRETS_ENV_PATH,
         pi_settings: Union[PiSettings, DefaultPiSettingsChoices] = None,
         output_directory_root: Union[str, Path] = None,
+        startup_cache_path: Union[str, Path] = None,
     ):
-        self.secrets = Secrets(
+        super().__init__(
             github_personal_access_token=github_personal_access_token,
             secrets_env_path=secrets_env_path,
+            pi_settings=pi_settings,
+            output_directory_root=output_directory_root,
+            startup_cache_path=startup_cache_path,
         )
-        self.permissions = Permissions(secrets=self.secrets)
-        self.output_dir = self.__get_output_dir(output_directory_root=output_directory_root)
-        self.pi_settings = self.__validate_pi_settings(pi_settings=pi_settings)
-        self.request_settings: RequestSettings = get_default_request_settings()
         self.retry_backoff_session = RetryBackoffSession(
             _request_settings=self.request_settings,
             pi_settings=self.pi_settings,
@@ -60,83 +55,27 @@ class Api:
         )
         self.__ensure_service_is_running()
 
-    @staticmethod
-    def __get_output_dir(output_directory_root: Union[str, Path] = None) -> Optional[Path]:
-        if output_directory_root is None:
-            return None
-        # check 1
-        output_directory_root = Path(output_directory_root)
-        assert output_directory_root.is_dir(), f"output_directory_root {output_directory_root} must exist"
-        # check 2
-        is_dir_writable = os.access(path=output_directory_root.as_posix(), mode=os.W_OK)
-        assert is_dir_writable, f"output_directory_root {output_directory_root} must be writable"
-        # create subdir
-        output_dir = output_directory_root / f"hdsr_fewspy_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        return output_dir
-
-    def __log_not_running_service(self, err: Exception = None, response: ResponseType = None) -> None:
-        error = f"{response.text}, {err}" if response else str(err)
-        msg = (
-            f"Piwebservice is not running, Ensure that you can visit the test page '{self.pi_settings.test_url}', "
-            f"err={error}"
-        )
-        if self.pi_settings.domain == "localhost":
-            msg += ". Please make sure FEWS SA webservice is running and start embedded tomcat server via F12 key."
-            raise exceptions.StandAloneFewsWebServiceNotRunningError(msg)
-        raise exceptions.FewsWebServiceNotRunningError(msg)
+    def with_pi_settings(self, pi_settings: Union[PiSettings, DefaultPiSettingsChoices]) -> "Api":
+        """An Api for other pi_settings (e.g. another dataset) that shares everything else with this Api: the permission
+        check, request_settings, output_dir, the connection pool and (per FEWS domain) the rate limiter. See MultiApi.
+        """
+        api = self._copy_with_pi_settings(pi_settings=pi_settings)
+        api.retry_backoff_session = self.retry_backoff_session.with_pi_settings(pi_settings=api.pi_settings)
+        api.__ensure_service_is_running()
+        return api
 
     def __ensure_service_is_running(self) -> None:
-        """Just request endpoint with smallest response (=timezonid)."""
+        """Just request endpoint with smallest response (=timezonid). Skipped if it was running a moment ago."""
+        if self._is_service_recently_running():
+            return
         try:
             response = self.get_timezone_id(output_choice=OutputChoices.json_response_in_memory)
             if response.ok:
-                logger.info(f"PiWebService is running (see test page: '{self.pi_settings.test_url}')")
+                self._set_service_running()
                 return
-            self.__log_not_running_service(err=None, response=response)
+            self._log_not_running_service(err=None, response=response)
         except Exception as err:
-            self.__log_not_running_service(err=err, response=None)
-
-    def __validate_pi_settings(self, pi_settings: Union[PiSettings, DefaultPiSettingsChoices] = None) -> PiSettings:
-        github_pi_setting_defaults = GithubPiSettingDefaults(self.secrets.github_personal_access_token)
-
-        if pi_settings is None:
-            pi_settings = github_pi_setting_defaults.get_pi_settings(
-                DefaultPiSettingsChoices.wis_production_point_validated.value
-            )
-            logger.info(f"no pi_settings defined, so using '{pi_settings.settings_name}'")
-        elif isinstance(pi_settings, DefaultPiSettingsChoices):
-            pi_settings = github_pi_setting_defaults.get_pi_settings(settings_name=pi_settings.value)
-            logger.info(f"default pi_settings defined '{pi_settings.settings_name}'")
-        elif isinstance(pi_settings, PiSettings):
-            logger.info(f"custom pi_settings defined '{pi_settings.settings_name}'")
-        else:
-            default_options = DefaultPiSettingsChoices.get_all()
-            msg = (
-                f"pi_settings {pi_settings} must be a either None, or a str (choose from '{default_options}'), or a "
-                f"custom PiSettings (see README.ml example how to create one)"
-            )
-            raise NotImplementedError(msg)
-
-        mapper = {
-            # setting: (used, allowed)
-            "domain": (pi_settings.domain, self.permissions.allowed_domain),
-            "module_instance_id": (pi_settings.module_instance_ids, self.permissions.allowed_module_instance_id),
-            "timezone": (pi_settings.time_zone, TimeZoneChoices.get_all_values()),
-            "filter_id": (pi_settings.filter_id, self.permissions.allowed_filter_id),
-            "service": (pi_settings.service, self.permissions.allowed_service),
-        }
-
-        for setting, value in mapper.items():
-            used_value, allowed_values = value
-            if not isinstance(allowed_values, list):
-                msg = f"code error __validate_pi_settings: allowed_values {allowed_values} must be a list"
-                raise AssertionError(msg)
-            if used_value in allowed_values:
-                continue
-            msg = f"setting='{setting}' used_value='{used_value}' is not in allowed_values='{allowed_values}'"
-            raise exceptions.PiSettingsError(msg)
-
-        return pi_settings
+            self._log_not_running_service(err=err, response=None)
 
     def get_parameters(self, output_choice: OutputChoices) -> Union[ResponseType, pd.DataFrame]:
         # show_attributes does not make a difference in response (both for Pi_JSON and PI_XML)
@@ -154,7 +93,7 @@ class Api:
 
     def get_locations(
         self, output_choice: OutputChoices, show_attributes: bool = True
-    ) -> Union[ResponseType, gpd.GeoDataFrame]:
+    ) -> Union[ResponseType, "gpd.GeoDataFrame"]:
         api_call = api_calls.GetLocations(
             show_attributes=show_attributes,
             output_choice=output_choice,
@@ -256,6 +195,40 @@ class Api:
         result = api_call.run()
         return result
 
+    def get_time_series_inventory(
+        self,
+        output_choice: OutputChoices,
+        #
+        start_time: Union[datetime, str],
+        end_time: Union[datetime, str],
+        location_ids: List[str],
+        parameter_ids: List[str],
+        qualifier_ids: List[str] = None,
+        omit_empty_time_series: bool = True,
+    ) -> pd.DataFrame:
+        """Get valueCount, firstValueTime, lastValueTime, and timeStep of all location/parameter/qualifier combinations.
+
+        Only a few requests are needed (max 100 location_ids per request, one request per qualifier_id), so this is a
+        fast way to find out which combinations have data before downloading. Returns for example:
+            location_id parameter_id qualifier_id  value_count    first_value_time     last_value_time time_step
+            OW433001    H.G.0        None                  102 2012-01-01 00:15:00 2012-01-02 00:00:00       NaT
+            OW433002    H.G.0        None                   96 2012-01-01 00:00:00 2012-01-01 23:45:00       NaT
+        """
+        api_call = api_calls.GetTimeSeriesInventory(
+            start_time=start_time,
+            end_time=end_time,
+            location_ids=location_ids,
+            parameter_ids=parameter_ids,
+            qualifier_ids=qualifier_ids,
+            thinning=None,
+            omit_empty_time_series=omit_empty_time_series,
+            #
+            output_choice=output_choice,
+            retry_backoff_session=self.retry_backoff_session,
+        )
+        result = api_call.run()
+        return result
+
     def get_time_series_single(
         self,
         output_choice: OutputChoices,
@@ -318,6 +291,9 @@ class Api:
         flag_threshold: int = 6,
         #
         only_value_and_flag: bool = True,
+        #
+        max_workers: int = 1,
+        batched: bool = False,
     ) -> List[Path]:
         """Multi means: use >=1 location_id and/or parameter_id and/or qualifier_id.
 
@@ -327,6 +303,13 @@ class Api:
         'drop_missing_values' have no effect.
         For more info on flags see: https://publicwiki.deltares.nl/display/FEWSDOC/D+Time+Series+Flag.
 
+        max_workers > 1 downloads and writes that many unique combinations concurrently. All workers share one
+        rate limiter, so together they still respect the request_settings requests_per_second to the FEWS server.
+
+        batched=True requests combinations that only differ in location_id together (one request for many location_ids)
+        and splits the response per combination afterwards. This saves many requests for sparse time-series (e.g.
+        Q.B.m). The output (files) is the same as with batched=False.
+
         start_time and end_time can be of type:
             - datetime: a python datetime.datetime
             - str: a string with format "%Y-%m-%dT%H:%M:%SZ" e.g. "2012-01-01T00:00:00Z
@@ -342,6 +325,8 @@ class Api:
             drop_missing_values=drop_missing_values,
             flag_threshold=flag_threshold,
             #
+            max_workers=max_workers,
+            batched=batched,
             output_choice=output_choice,
             retry_backoff_session=self.retry_backoff_session,
         )
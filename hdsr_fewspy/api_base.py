@@ -0,0 +1,172 @@
+from datetime import datetime
+from datetime import timedelta
+from hdsr_fewspy import exceptions
+from hdsr_fewspy.constants.choices import DefaultPiSettingsChoices
+from hdsr_fewspy.constants.choices import TimeZoneChoices
+from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.constants.paths import SECRETS_ENV_PATH
+from hdsr_fewspy.constants.pi_settings import GithubPiSettingDefaults
+from hdsr_fewspy.constants.pi_settings import PiSettings
+from hdsr_fewspy.constants.request_settings import get_default_request_settings
+from hdsr_fewspy.constants.request_settings import RequestSettings
+from hdsr_fewspy.permissions import Permissions
+from hdsr_fewspy.secrets import Secrets
+from hdsr_fewspy.startup_cache import get_startup_cache
+from hdsr_fewspy.startup_cache import StartupCache
+from pathlib import Path
+from typing import Optional
+from typing import Union
+
+import copy
+import logging
+import os
+
+
+logger = logging.getLogger(__name__)
+
+
+class ApiBase:
+    """Everything Api and AsyncApi share: authentication, authorisation (pi_settings) and settings.
+
+    Permissions, default pi settings and pi_settings are resolved (and validated) on first use, not in the constructor.
+
+    Permissions, default pi settings and the last successful health check are remembered in a StartupCache, so that a
+    new Api only goes to github and FEWS if these are unknown or expired. Off by default: use argument
+    startup_cache_path (e.g. constants.paths.STARTUP_CACHE_PATH) to enable it.
+    """
+
+    service_running_ttl = timedelta(minutes=5)  # skip the health check if FEWS was running less than this ago
+
+    def __init__(
+        self,
+        github_personal_access_token: str = None,
+        secrets_env_path: Union[str, Path] = SECRETS_ENV_PATH,
+        pi_settings: Union[PiSettings, DefaultPiSettingsChoices] = None,
+        output_directory_root: Union[str, Path] = None,
+        startup_cache_path: Union[str, Path] = None,
+    ):
+        self.secrets = Secrets(
+            github_personal_access_token=github_personal_access_token,
+            secrets_env_path=secrets_env_path,
+        )
+        self.startup_cache_path: Optional[Path] = Path(startup_cache_path) if startup_cache_path else None
+        self.output_dir = self.__get_output_dir(output_directory_root=output_directory_root)
+        self.request_settings: RequestSettings = get_default_request_settings()
+        self.__pi_settings_argument = pi_settings
+        self.__pi_settings: Optional[PiSettings] = None
+        self.__permissions: Optional[Permissions] = None
+        self.__github_pi_setting_defaults: Optional[GithubPiSettingDefaults] = None
+
+    @property
+    def permissions(self) -> Permissions:
+        if self.__permissions is None:
+            self.__permissions = Permissions(secrets=self.secrets, startup_cache=self.startup_cache)
+        return self.__permissions
+
+    @property
+    def github_pi_setting_defaults(self) -> GithubPiSettingDefaults:
+        if self.__github_pi_setting_defaults is None:
+            self.__github_pi_setting_defaults = GithubPiSettingDefaults(
+                self.secrets.github_personal_access_token, startup_cache=self.startup_cache
+            )
+        return self.__github_pi_setting_defaults
+
+    @property
+    def pi_settings(self) -> PiSettings:
+        if self.__pi_settings is None:
+            self.__pi_settings = self.__validate_pi_settings(pi_settings=self.__pi_settings_argument)
+        return self.__pi_settings
+
+    def _copy_with_pi_settings(self, pi_settings: Union[PiSettings, DefaultPiSettingsChoices]) -> "ApiBase":
+        """Shallow copy with other (validated) pi_settings. The copy shares secrets, permissions, default pi settings,
+        request_settings and output_dir with this api, so it needs no github requests."""
+        validated_pi_settings = self.__validate_pi_settings(pi_settings=pi_settings)
+        api = copy.copy(self)
+        api.__pi_settings_argument = validated_pi_settings
+        api.__pi_settings = validated_pi_settings
+        return api
+
+    @property
+    def startup_cache(self) -> Optional[StartupCache]:
+        return get_startup_cache(path=self.startup_cache_path)
+
+    @property
+    def _service_running_key(self) -> str:
+        return f"service_running|{self.pi_settings.test_url}"
+
+    def _is_service_recently_running(self) -> bool:
+        """True if FEWS was running less than service_running_ttl ago, then we do not need to check it again."""
+        if not self.startup_cache:
+            return False
+        return bool(self.startup_cache.get(key=self._service_running_key, ttl=self.service_running_ttl))
+
+    def _set_service_running(self) -> None:
+        logger.info(f"PiWebService is running (see test page: '{self.pi_settings.test_url}')")
+        if self.startup_cache:
+            self.startup_cache.set(key=self._service_running_key, value=True)
+
+    @staticmethod
+    def __get_output_dir(output_directory_root: Union[str, Path] = None) -> Optional[Path]:
+        if output_directory_root is None:
+            return None
+        # check 1
+        output_directory_root = Path(output_directory_root)
+        assert output_directory_root.is_dir(), f"output_directory_root {output_directory_root} must exist"
+        # check 2
+        is_dir_writable = os.access(path=output_directory_root.as_posix(), mode=os.W_OK)
+        assert is_dir_writable, f"output_directory_root {output_directory_root} must be writable"
+        # create subdir
+        output_dir = output_directory_root / f"hdsr_fewspy_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        return output_dir
+
+    def _log_not_running_service(self, err: Exception = None, response: ResponseType = None) -> None:
+        error = f"{response.text}, {err}" if response else str(err)
+        msg = (
+            f"Piwebservice is not running, Ensure that you can visit the test page '{self.pi_settings.test_url}', "
+            f"err={error}"
+        )
+        if self.pi_settings.domain == "localhost":
+            msg += ". Please make sure FEWS SA webservice is running and start embedded tomcat server via F12 key."
+            raise exceptions.StandAloneFewsWebServiceNotRunningError(msg)
+        raise exceptions.FewsWebServiceNotRunningError(msg)
+
+    def __validate_pi_settings(self, pi_settings: Union[PiSettings, DefaultPiSettingsChoices] = None) -> PiSettings:
+        github_pi_setting_defaults = self.github_pi_setting_defaults
+        if pi_settings is None:
+            pi_settings = github_pi_setting_defaults.get_pi_settings(
+                DefaultPiSettingsChoices.wis_production_point_validated.value
+            )
+            logger.info(f"no pi_settings defined, so using '{pi_settings.settings_name}'")
+        elif isinstance(pi_settings, DefaultPiSettingsChoices):
+            pi_settings = github_pi_setting_defaults.get_pi_settings(settings_name=pi_settings.value)
+            logger.info(f"default pi_settings defined '{pi_settings.settings_name}'")
+        elif isinstance(pi_settings, PiSettings):
+            logger.info(f"custom pi_settings defined '{pi_settings.settings_name}'")
+        else:
+            default_options = DefaultPiSettingsChoices.get_all()
+            msg = (
+                f"pi_settings {pi_settings} must be a either None, or a str (choose from '{default_options}'), or a "
+                f"custom PiSettings (see README.ml example how to create one)"
+            )
+            raise NotImplementedError(msg)
+
+        mapper = {
+            # setting: (used, allowed)
+            "domain": (pi_settings.domain, self.permissions.allowed_domain),
+            "module_instance_id": (pi_settings.module_instance_ids, self.permissions.allowed_module_instance_id),
+            "timezone": (pi_settings.time_zone, TimeZoneChoices.get_all_values()),
+            "filter_id": (pi_settings.filter_id, self.permissions.allowed_filter_id),
+            "service": (pi_settings.service, self.permissions.allowed_service),
+        }
+
+        for setting, value in mapper.items():
+            used_value, allowed_values = value
+            if not isinstance(allowed_values, list):
+                msg = f"code error __validate_pi_settings: allowed_values {allowed_values} must be a list"
+                raise AssertionError(msg)
+            if used_value in allowed_values:
+                continue
+            msg = f"setting='{setting}' used_value='{used_value}' is not in allowed_values='{allowed_values}'"
+            raise exceptions.PiSettingsError(msg)
+
+        return pi_settings
@@ -4,6 +4,7 @@ from hdsr_fewspy.api_calls.get_parameters import GetParameters
 from hdsr_fewspy.api_calls.get_qualifiers import GetQualifiers
 from hdsr_fewspy.api_calls.get_samples import GetSamples
 from hdsr_fewspy.api_calls.get_timezone_id import GetTimeZoneId
+from hdsr_fewspy.api_calls.time_series.get_time_series_inventory import GetTimeSeriesInventory
 from hdsr_fewspy.api_calls.time_series.get_time_series_multi import GetTimeSeriesMulti
 from hdsr_fewspy.api_calls.time_series.get_time_series_single import GetTimeSeriesSingle
 from hdsr_fewspy.api_calls.time_series.get_time_series_statistics import GetTimeSeriesStatistics
@@ -16,6 +17,7 @@ GetParameters = GetParameters
 GetQualifiers = GetQualifiers
 GetSamples = GetSamples
 GetTimeSeriesStatistics = GetTimeSeriesStatistics
+GetTimeSeriesInventory = GetTimeSeriesInventory
 GetTimeSeriesSingle = GetTimeSeriesSingle
 GetTimeSeriesMulti = GetTimeSeriesMulti
 GetTimeZoneId = GetTimeZoneId
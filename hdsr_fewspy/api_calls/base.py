@@ -1,31 +1,44 @@
 from abc import abstractmethod
+from dataclasses import replace
 from enum import Enum
+from hdsr_fewspy.async_retry_session import AsyncRetryBackoffSession
 from hdsr_fewspy.constants.choices import ApiParameters
 from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.constants.choices import PiRestDocumentFormatChoices
 from hdsr_fewspy.constants.custom_types import ResponseType
 from hdsr_fewspy.constants.pi_settings import PiSettings
 from hdsr_fewspy.constants.request_settings import RequestSettings
 from hdsr_fewspy.converters.manager import ResponseManager
 from hdsr_fewspy.converters.utils import datetime_to_fews_date_str
 from hdsr_fewspy.converters.utils import snake_to_camel_case
+from hdsr_fewspy.metadata_cache import get_metadata_cache
+from hdsr_fewspy.metadata_cache import MetadataCache
 from hdsr_fewspy.retry_session import RetryBackoffSession
 from pathlib import Path
 from typing import Any
 from typing import Dict
+from typing import Generator
 from typing import List
 from typing import Optional
 from typing import Tuple
+from typing import Union
 
 
 class GetRequest:
-    def __init__(self, output_choice: OutputChoices, retry_backoff_session: RetryBackoffSession):
-        self.retry_backoff_session: RetryBackoffSession = retry_backoff_session
-        self.pi_settings: PiSettings = retry_backoff_session.pi_settings
+    use_metadata_cache: bool = False  # True for metadata (e.g. locations), see MetadataCache
+
+    def __init__(
+        self,
+        output_choice: OutputChoices,
+        retry_backoff_session: Union[RetryBackoffSession, AsyncRetryBackoffSession],
+    ):
+        self.retry_backoff_session: Union[RetryBackoffSession, AsyncRetryBackoffSession] = retry_backoff_session
         self.request_settings: RequestSettings = retry_backoff_session.request_settings
         self.output_choice: OutputChoices = self.validate_output_choice(output_choice=output_choice)
+        # a copy per request: the session pi_settings are shared with other (async or MultiApi) requests in flight
+        self.pi_settings: PiSettings = replace(retry_backoff_session.pi_settings, document_format=self.document_format)
         self.output_dir: Optional[Path] = self.validate_output_dir(output_dir=retry_backoff_session.output_dir)
         self.url: str = f"{self.pi_settings.base_url}{self.url_post_fix}/"
-        self.pi_settings.document_format = OutputChoices.get_pi_rest_document_format(output_choice)
         self._initial_fews_parameters = None
         self._filtered_fews_parameters = None
         self.response_manager = ResponseManager(
@@ -40,6 +53,11 @@ class GetRequest:
     def url_post_fix(self) -> str:
         raise NotImplementedError
 
+    @property
+    def document_format(self) -> PiRestDocumentFormatChoices:
+        """The document format of this request (also in self.pi_settings, a copy of the session pi_settings)."""
+        return OutputChoices.get_pi_rest_document_format(output_choice=self.output_choice)
+
     @property
     @abstractmethod
     def allowed_request_args(self) -> List[str]:
@@ -103,13 +121,16 @@ class GetRequest:
                  'filter_id': 'INTERNAL-API',
                  'max_request_nr_timestamps': 100000,
                  'max_request_period': Timedelta('728 days 00:00:00'),
+                 'min_request_period': Timedelta('1 days 00:00:00'),
                  'max_response_time': Timedelta('0 days 00:00:20'),
                  'min_request_nr_timestamps': 10000,
-                 'min_time_between_requests': Timedelta('0 days 00:00:01'),
                  'module_instance_ids': 'WerkFilter',
                  'output_choice': 'json_response_in_memory',
                  'output_dir': None,
                  'port': 8080,
+                 'requests_per_second': 2.0,
+                 'burst_size': 4,
+                 'max_requests_in_flight': 1,
                  'service': 'FewsWebServices',
                  'settings_name': 'default stand-alone',
                  'show_attributes': True,
@@ -120,7 +141,7 @@ class GetRequest:
         """
         all_parameters = dict()
         for key, value in self.__dict__.items():
-            if isinstance(value, RetryBackoffSession) or isinstance(value, ResponseManager):
+            if isinstance(value, (RetryBackoffSession, AsyncRetryBackoffSession, ResponseManager)):
                 continue
             elif isinstance(value, PiSettings) or isinstance(value, RequestSettings):
                 for k, v in value.__dict__.items():
@@ -173,9 +194,70 @@ class GetRequest:
         fews_parameters = {x[0]: x[1] for x in params_non_pi + params_pi if x[1] is not None}
         return fews_parameters
 
-    @abstractmethod
-    def run(self, *args, **kwargs):
-        raise NotImplementedError
+    def run(self):
+        return self._send_requests(requests_generator=self.iter_run())
+
+    def iter_run(self) -> Generator[Dict, ResponseType, Any]:
+        """Yield the request parameters of every request needed for this GetRequest, and receive their responses.
+
+        The same generator is used by the blocking Api (see _send_requests) and by the asyncio AsyncApi. This way the
+        logic which requests are needed only exists once. Most GetRequests need only one request.
+
+        A metadata response (see use_metadata_cache) is taken from the MetadataCache if possible, without a request.
+        """
+        metadata_cache = self.metadata_cache
+        request_params = self.filtered_fews_parameters
+        response = metadata_cache.get(url=self.url, params=request_params) if metadata_cache else None
+        if response is None:
+            response = yield request_params
+            if metadata_cache:
+                metadata_cache.set(url=self.url, params=request_params, response=response)
+        return self.parse_response(response=response)
+
+    @property
+    def metadata_cache(self) -> Optional[MetadataCache]:
+        if not self.use_metadata_cache:
+            return None
+        return get_metadata_cache(
+            path=self.request_settings.metadata_cache_path, ttl=self.request_settings.metadata_cache_ttl
+        )
+
+    def parse_response(self, response: ResponseType):
+        """Convert the response to the output_choice. By default, the response itself is returned."""
+        return response
+
+    def _send_requests(self, requests_generator: Generator[Dict, ResponseType, Any]) -> Any:
+        """Request every request_params yielded by requests_generator and send the response back into it.
+
+        If a request fails (e.g. a timeout), the error is raised inside requests_generator, so it can handle it (e.g.
+        retry with a smaller time-window). Otherwise, the error is raised here.
+
+        A requests_generator may also yield a list of request_params that do not depend on each other. These are
+        requested concurrently and a list with their responses (same order) is sent back. Like asyncio.gather with
+        return_exceptions=True, a failed request results in its error instead of a response in that list.
+        """
+        try:
+            request_params = next(requests_generator)
+            while True:
+                try:
+                    if isinstance(request_params, list):
+                        response = self._get_concurrently(request_params_list=request_params)
+                    else:
+                        response = self._get(request_params=request_params)
+                except Exception as err:
+                    request_params = requests_generator.throw(err)
+                    continue
+                request_params = requests_generator.send(response)
+        except StopIteration as stop:
+            return stop.value
+
+    def _get(self, request_params: Dict) -> ResponseType:
+        return self.retry_backoff_session.get(url=self.url, params=request_params, verify=self.pi_settings.ssl_verify)
+
+    def _get_concurrently(self, request_params_list: List[Dict]) -> List[Union[ResponseType, Exception]]:
+        executor = self.retry_backoff_session.executor
+        futures = [executor.submit(self._get, request_params) for request_params in request_params_list]
+        return [future.exception() or future.result() for future in futures]
 
     def handle_response(self, response: ResponseType, **kwargs):
         return self.response_manager.run(response=response, **kwargs)
@@ -1,7 +1,6 @@
 from hdsr_fewspy.api_calls.base import GetRequest
 from hdsr_fewspy.constants.choices import ApiParameters
 from hdsr_fewspy.constants.choices import OutputChoices
-from hdsr_fewspy.constants.custom_types import ResponseType
 from typing import List
 
 import logging
@@ -11,6 +10,8 @@ logger = logging.getLogger(__name__)
 
 
 class GetFilters(GetRequest):
+    use_metadata_cache = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -32,9 +33,3 @@ class GetFilters(GetRequest):
             OutputChoices.json_response_in_memory,
             OutputChoices.xml_response_in_memory,
         ]
-
-    def run(self) -> ResponseType:
-        response = self.retry_backoff_session.get(
-            url=self.url, params=self.filtered_fews_parameters, verify=self.pi_settings.ssl_verify
-        )
-        return response
@@ -2,21 +2,28 @@ from hdsr_fewspy.api_calls.base import GetRequest
 from hdsr_fewspy.constants.choices import ApiParameters
 from hdsr_fewspy.constants.choices import OutputChoices
 from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.converters import json_to_arrow
 from hdsr_fewspy.converters.utils import camel_to_snake_case
 from hdsr_fewspy.converters.utils import geo_datum_to_crs
 from hdsr_fewspy.converters.utils import xy_array_to_point
 from typing import List
+from typing import TYPE_CHECKING
 from typing import Union
 
-import geopandas as gpd
 import logging
 import pandas as pd
 
 
+if TYPE_CHECKING:
+    import geopandas as gpd
+    import pyarrow as pa
+
 logger = logging.getLogger(__name__)
 
 
 class GetLocations(GetRequest):
+    use_metadata_cache = True
+
     def __init__(self, show_attributes: bool = True, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.show_attributes = show_attributes
@@ -47,15 +54,16 @@ class GetLocations(GetRequest):
             OutputChoices.json_response_in_memory,
             OutputChoices.xml_response_in_memory,
             OutputChoices.pandas_dataframe_in_memory,
+            OutputChoices.arrow_table_in_memory,
         ]
 
-    def run(self) -> Union[ResponseType, gpd.GeoDataFrame]:
-        response = self.retry_backoff_session.get(
-            url=self.url, params=self.filtered_fews_parameters, verify=self.pi_settings.ssl_verify
-        )
-
+    def parse_response(self, response: ResponseType) -> Union[ResponseType, "gpd.GeoDataFrame", "pa.Table"]:
         if self.output_choice in {OutputChoices.json_response_in_memory, OutputChoices.xml_response_in_memory}:
             return response
+        if self.output_choice == OutputChoices.arrow_table_in_memory:
+            return self._parse_response_to_table(response=response)
+        # geopandas (and shapely) are slow to import, so only import them when we need them
+        import geopandas as gpd
 
         assert self.output_choice == OutputChoices.pandas_dataframe_in_memory, "code error GetLocations"
         # parse the response to dataframe
@@ -75,3 +83,14 @@ class GetLocations(GetRequest):
             gdf = gpd.GeoDataFrame()
 
         return gdf
+
+    @staticmethod
+    def _parse_response_to_table(response: ResponseType) -> "pa.Table":
+        """Locations as a pyarrow table (no geometry, use columns x and y). The geoDatum is in the schema metadata."""
+        pa = json_to_arrow.import_pyarrow()
+        if response.status_code != 200:
+            logger.error(f"FEWS Server responds {response.text}")
+            return pa.table({})
+        response_json = response.json()
+        table = json_to_arrow.records_to_table(records=response_json.get("locations", []))
+        return table.replace_schema_metadata({"geo_datum": response_json.get("geoDatum", "")})
@@ -2,14 +2,19 @@ from hdsr_fewspy.api_calls.base import GetRequest
 from hdsr_fewspy.constants.choices import ApiParameters
 from hdsr_fewspy.constants.choices import OutputChoices
 from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.converters import json_to_arrow
 from hdsr_fewspy.converters.utils import camel_to_snake_case
 from typing import List
+from typing import TYPE_CHECKING
 from typing import Union
 
 import logging
 import pandas as pd
 
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 logger = logging.getLogger(__name__)
 
 COLUMNS = [
@@ -24,6 +29,8 @@ COLUMNS = [
 
 
 class GetParameters(GetRequest):
+    use_metadata_cache = True
+
     def __init__(self, *args, **kwargs):
         # show_attributes does not make a difference in response (both for Pi_JSON and PI_XML)
         super().__init__(*args, **kwargs)
@@ -54,15 +61,16 @@ class GetParameters(GetRequest):
             OutputChoices.json_response_in_memory,
             OutputChoices.xml_response_in_memory,
             OutputChoices.pandas_dataframe_in_memory,
+            OutputChoices.arrow_table_in_memory,
         ]
 
-    def run(self) -> Union[ResponseType, pd.DataFrame]:
-        response = self.retry_backoff_session.get(
-            url=self.url, params=self.filtered_fews_parameters, verify=self.pi_settings.ssl_verify
-        )
+    def parse_response(self, response: ResponseType) -> Union[ResponseType, pd.DataFrame, "pa.Table"]:
         if self.output_choice in {OutputChoices.json_response_in_memory, OutputChoices.xml_response_in_memory}:
             return response
 
+        if self.output_choice == OutputChoices.arrow_table_in_memory:
+            return self._parse_response_to_table(response=response)
+
         assert self.output_choice == OutputChoices.pandas_dataframe_in_memory, "code error GetParameters"
         # parse the response to dataframe
         df = pd.DataFrame(columns=COLUMNS)
@@ -76,3 +84,15 @@ class GetParameters(GetRequest):
         df.set_index("id", inplace=True)
 
         return df
+
+    @staticmethod
+    def _parse_response_to_table(response: ResponseType) -> "pa.Table":
+        pa = json_to_arrow.import_pyarrow()
+        if response.status_code != 200:
+            logger.error(f"FEWS Server responds {response.text}")
+            return pa.table({x: pa.array([], type=pa.string()) for x in COLUMNS})
+        table = json_to_arrow.records_to_table(records=response.json().get("timeSeriesParameters", []))
+        if "uses_datum" in table.column_names:
+            index = table.column_names.index("uses_datum")
+            table = table.set_column(index, "uses_datum", pa.compute.equal(table["uses_datum"], "true"))
+        return table
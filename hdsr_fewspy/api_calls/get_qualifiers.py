@@ -19,6 +19,8 @@ COLUMNS = ["id", "name", "group_id"]
 
 
 class GetQualifiers(GetRequest):
+    use_metadata_cache = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -38,10 +40,7 @@ class GetQualifiers(GetRequest):
     def required_request_args(self) -> List[str]:
         return [ApiParameters.document_format, ApiParameters.document_version]
 
-    def run(self) -> Union[ResponseType, pd.DataFrame]:
-        response = self.retry_backoff_session.get(
-            url=self.url, params=self.filtered_fews_parameters, verify=self.pi_settings.ssl_verify
-        )
+    def parse_response(self, response: ResponseType) -> Union[ResponseType, pd.DataFrame]:
         if self.output_choice == OutputChoices.xml_response_in_memory:
             return response
 
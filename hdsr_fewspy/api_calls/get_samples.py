@@ -2,6 +2,7 @@ from datetime import datetime
 from hdsr_fewspy.api_calls.base import GetRequest
 from hdsr_fewspy.constants.choices import ApiParameters
 from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.constants.custom_types import ResponseType
 from typing import List
 
 import logging
@@ -11,7 +12,6 @@ logger = logging.getLogger(__name__)
 
 
 class GetSamples(GetRequest):
-
     def __init__(
         self, start_time: datetime, end_time: datetime, location_ids: str = None, sample_ids=None, *args, **kwargs
     ):
@@ -66,11 +66,7 @@ class GetSamples(GetRequest):
             OutputChoices.xml_response_in_memory,
         ]
 
-    def run(self):
-        response = self.retry_backoff_session.get(
-            url=self.url, params=self.filtered_fews_parameters, verify=self.pi_settings.ssl_verify
-        )
-        # parse the response to dataframe
+    def parse_response(self, response: ResponseType) -> ResponseType:
         if response.status_code != 200:
             logger.error(f"FEWS Server responds {response.text}")
         return response
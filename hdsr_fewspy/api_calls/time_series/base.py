@@ -1,33 +1,76 @@
 from abc import abstractmethod
+from dataclasses import dataclass
 from datetime import datetime
+from datetime import timezone
 from hdsr_fewspy import exceptions
 from hdsr_fewspy.api_calls.base import GetRequest
 from hdsr_fewspy.constants.choices import ApiParameters
 from hdsr_fewspy.constants.choices import DefaultPiSettingsChoices
+from hdsr_fewspy.constants.choices import OutputChoices
 from hdsr_fewspy.constants.choices import PiRestDocumentFormatChoices
 from hdsr_fewspy.constants.custom_types import ResponseType
 from hdsr_fewspy.constants.pi_settings import PiSettings
+from hdsr_fewspy.converters.header_probe import HeaderStatistics
+from hdsr_fewspy.converters.header_probe import probe_pi_headers
+from hdsr_fewspy.converters.json_to_df_time_series import response_jsons_to_events
 from hdsr_fewspy.converters.utils import datetime_to_fews_date_str
 from hdsr_fewspy.converters.utils import fews_date_str_to_datetime
-from hdsr_fewspy.converters.xml_to_python_obj import parse
 from hdsr_fewspy.date_frequency import DateFrequencyBuilder
+from hdsr_fewspy.series_store import DownloadPeriod
+from hdsr_fewspy.series_store import get_series_store
+from hdsr_fewspy.series_store import SeriesStore
+from hdsr_fewspy.window_hints import get_window_hints
+from hdsr_fewspy.window_hints import WindowHint
+from hdsr_fewspy.window_hints import WindowHints
+from typing import Any
 from typing import Dict
+from typing import Generator
 from typing import List
 from typing import Optional
 from typing import Tuple
 from typing import Union
 
+import copy
 import logging
 import pandas as pd
+import requests
 
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class TimeSeriesStatistics:
+    """Statistics of one location_parameter_qualifier combination for the whole requested period."""
+
+    nr_timestamps: Optional[int]  # None if FEWS did not return a valueCount
+    first_value_time: Optional[pd.Timestamp] = None
+    last_value_time: Optional[pd.Timestamp] = None
+    time_step: Optional[pd.Timedelta] = None  # None for nonequidistant time-series
+
+
 class GetTimeSeriesBase(GetRequest):
     response_text_no_ts_found = "No timeSeries found"
     response_text_location_not_found = "Some of the location ids do not exist"
     response_text_parameter_not_found = "Some of the parameters do not exists"
+    # a time-window that fails with one of these errors (or a 5xx response) is bisected (see _iter_download_date_range)
+    time_window_errors = (
+        requests.exceptions.Timeout,
+        requests.exceptions.ConnectionError,
+        requests.exceptions.RetryError,
+    )
+
+    max_request_nr_location_ids: int = 100  # keep the request url short enough
+    series_store_clock_margin = pd.Timedelta(minutes=5)  # our clock may be ahead of FEWS, see _get_synced_at
+    inventory_columns = [
+        "location_id",
+        "parameter_id",
+        "qualifier_id",
+        "value_count",
+        "first_value_time",
+        "last_value_time",
+        "time_step",
+    ]
 
     start_time_all = datetime_to_fews_date_str(date_time=datetime(year=2011, month=1, day=1))
     end_time_all = datetime_to_fews_date_str(date_time=datetime.now())
@@ -65,14 +108,24 @@ class GetTimeSeriesBase(GetRequest):
         self.drop_missing_values = drop_missing_values
         self.flag_threshold = flag_threshold
         self.only_value_and_flag = only_value_and_flag
+        # the time-window that worked in this api call: the first guess for the next download (e.g. the next
+        # combination of GetTimeSeriesMulti). Workers may overwrite it, which is fine as it is probed anyway
+        self.updated_request_period: Optional[pd.Timedelta] = None
         #
         self.__validate_constructor_base()
         #
         super().__init__(*args, **kwargs)
+        self.__validate_max_requests_in_flight()
 
     def __validate_constructor_base(self):
         assert self.start_time < self.end_time, f"start_time {self.start_time} must be before end_time {self.end_time}"
 
+    def __validate_max_requests_in_flight(self):
+        max_pool_size = self.retry_backoff_session.pool_maxsize
+        assert (
+            self.max_requests_in_flight <= max_pool_size
+        ), f"request_settings max_requests_in_flight {self.max_requests_in_flight} must be <= {max_pool_size}"
+
     @staticmethod
     def __validate_time(time: Union[datetime, str]) -> datetime:
         datetime_obj = fews_date_str_to_datetime(fews_date_str=time) if isinstance(time, str) else time
@@ -111,6 +164,15 @@ class GetTimeSeriesBase(GetRequest):
     def url_post_fix(self):
         return "timeseries"
 
+    @property
+    def document_format(self) -> PiRestDocumentFormatChoices:
+        """Time-series can be converted to a dataframe (or csv) from PI_JSON and PI_XML, see dataframe_document_format
+        in RequestSettings."""
+        return OutputChoices.get_pi_rest_document_format(
+            output_choice=self.output_choice,
+            dataframe_document_format=self.request_settings.dataframe_document_format,
+        )
+
     @property
     def allowed_request_args(self) -> List[str]:
         return [
@@ -158,31 +220,34 @@ class GetTimeSeriesBase(GetRequest):
         task_uuid = f"{loc} {par} {qual}"
         return task_uuid.strip()
 
-    def _download_time_series(
+    def _iter_download_time_series(
         self,
         date_ranges: List[Tuple[pd.Timestamp, pd.Timestamp]],
         date_range_freq: pd.Timedelta,
         request_params: Dict,
         responses: Optional[List[ResponseType]] = None,
-    ) -> List[ResponseType]:
+        check_exists: bool = True,
+    ) -> Generator[Dict, ResponseType, List[ResponseType]]:
         """Download time-series in little chunks by updating parameters 'startTime' and 'endTime' every loop.
 
         Before each download of actual time-series we first check nr_timestamps_in_response (a small request with
         showHeaders=True, and showStatistics=True). If that number if outside a certain bandwidth, then we update
         (smaller or larger windows) parameters 'startTime' and 'endTime' again.
+
+        Use check_exists=False if it is already known that time-series exist (e.g. from an inventory).
+
+        If request_settings.max_requests_in_flight > 1, then the download of a chunk and the check of the next chunk are
+        requested at the same time (pipelined), so we do not wait twice per chunk. Only these two requests overlap: the
+        responses are parsed (and written) after the last chunk, see run.
         """
         responses = responses if responses else []
+        prefetched_nr_timestamps = None
 
         # firstly, check if any time-series exist at all (no start_time and end_time)
-        try:
-            has_time_series = self._get_nr_timestamps_no_start_end(request_params=request_params) > 0
-            if not has_time_series:
-                task_uuid = self.get_task_uuid(request_params=request_params)
-                logger.info(f"skipping since no time-series at all for '{task_uuid}'")
+        if check_exists:
+            exists = yield from self._iter_exists(request_params=request_params)
+            if not exists:
                 return []
-        except (exceptions.LocationIdsDoesNotExistErr, exceptions.ParameterIdsDoesNotExistErr) as err:
-            logger.warning(err)
-            return []
 
         # secondly, download time-series in little chunks
         for request_index, (data_range_start, data_range_end) in enumerate(date_ranges):
@@ -190,7 +255,10 @@ class GetTimeSeriesBase(GetRequest):
             request_params["startTime"] = datetime_to_fews_date_str(data_range_start)
             request_params["endTime"] = datetime_to_fews_date_str(data_range_end)
             try:
-                nr_timestamps_in_response = self._get_nr_timestamps(request_params=request_params)
+                if prefetched_nr_timestamps is None:
+                    nr_timestamps_in_response = yield from self._iter_get_nr_timestamps(request_params=request_params)
+                else:
+                    nr_timestamps_in_response, prefetched_nr_timestamps = prefetched_nr_timestamps, None
             except (exceptions.LocationIdsDoesNotExistErr, exceptions.ParameterIdsDoesNotExistErr) as err:
                 logger.warning(err)
                 return []
@@ -204,7 +272,8 @@ class GetTimeSeriesBase(GetRequest):
             )
             create_new_date_ranges = new_date_range_freq != date_range_freq
             if create_new_date_ranges:
-                self.request_settings.updated_request_period = new_date_range_freq
+                self.updated_request_period = new_date_range_freq
+                self._save_window_hint(request_params=request_params, request_period=new_date_range_freq)
                 new_date_ranges, new_date_range_freq = DateFrequencyBuilder.create_date_ranges_and_frequency_used(
                     startdate_obj=data_range_start,
                     enddate_obj=pd.Timestamp(self.end_time),
@@ -212,23 +281,32 @@ class GetTimeSeriesBase(GetRequest):
                 )
                 logger.debug(f"Updated request time-window from {date_range_freq} to {new_date_range_freq}")
                 # continue with recursive call with updated (smaller or larger) time-window
-                return self._download_time_series(
-                    date_ranges=new_date_ranges,
-                    date_range_freq=new_date_range_freq,
-                    request_params=request_params,
-                    responses=responses,
+                return (
+                    yield from self._iter_download_time_series(
+                        date_ranges=new_date_ranges,
+                        date_range_freq=new_date_range_freq,
+                        request_params=request_params,
+                        responses=responses,
+                        check_exists=False,
+                    )
                 )
             else:
                 # ready to download time-series (with new_date_range_freq)
-                request_params["onlyHeaders"] = False
-                request_params["showStatistics"] = False
-                response = self.retry_backoff_session.get(
-                    url=self.url, params=request_params, verify=self.pi_settings.ssl_verify
+                next_date_range = date_ranges[request_index + 1] if request_index + 1 < len(date_ranges) else None
+                response, prefetched_nr_timestamps = yield from self._iter_download_and_check_next(
+                    request_params=request_params, next_date_range=next_date_range
+                )
+                responses += yield from self._iter_download_date_range(
+                    request_params=request_params, date_range=(data_range_start, data_range_end), response=response
+                )
+                self._save_window_hint(
+                    request_params=request_params,
+                    timestamps_per_day=self._get_timestamps_per_day(
+                        nr_timestamps=nr_timestamps_in_response,
+                        first_value_time=data_range_start,
+                        last_value_time=data_range_end,
+                    ),
                 )
-                if response.status_code != 200:
-                    logger.error(f"FEWS Server responds {response.text}")
-                else:
-                    responses.append(response)
                 DateFrequencyBuilder.log_progress_download_ts(
                     task=self.get_task_uuid(request_params=request_params),
                     request_end=data_range_end,
@@ -237,45 +315,443 @@ class GetTimeSeriesBase(GetRequest):
                 )
         return responses
 
-    def _get_statistics(self, request_params: Dict) -> ResponseType:
+    def _iter_exists(self, request_params: Dict) -> Generator[Dict, ResponseType, bool]:
+        try:
+            nr_timestamps = yield from self._iter_get_nr_timestamps_no_start_end(request_params=request_params)
+        except (exceptions.LocationIdsDoesNotExistErr, exceptions.ParameterIdsDoesNotExistErr) as err:
+            logger.warning(err)
+            return False
+        if not nr_timestamps > 0:
+            logger.info(
+                f"skipping since no time-series at all for '{self.get_task_uuid(request_params=request_params)}'"
+            )
+            return False
+        return True
+
+    def _iter_download_and_check_next(
+        self, request_params: Dict, next_date_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]]
+    ) -> Generator[
+        Union[Dict, List[Dict]],
+        Union[ResponseType, List[ResponseType]],
+        Tuple[Union[ResponseType, Exception], Optional[int]],
+    ]:
+        """Download one chunk, and if pipelined also get nr_timestamps of the next chunk with a concurrent request.
+
+        A failed download returns its error instead of a response (see _iter_download_date_range).
+        """
+        request_params["onlyHeaders"] = False
+        request_params["showStatistics"] = False
+        download_params = request_params.copy()
+        if next_date_range is None or self.max_requests_in_flight == 1:
+            responses = yield from self._iter_get_many(request_params_list=[download_params], return_exceptions=True)
+            return responses[0], None
+        check_params = self._get_statistics_params(request_params=request_params.copy())
+        check_params["startTime"] = datetime_to_fews_date_str(next_date_range[0])
+        check_params["endTime"] = datetime_to_fews_date_str(next_date_range[1])
+        response, check_response = yield from self._iter_get_many(
+            request_params_list=[download_params, check_params], return_exceptions=True
+        )
+        if isinstance(check_response, Exception):
+            raise check_response
+        nr_timestamps = self._get_nr_timestamps_from_response(response=check_response, request_params=check_params)
+        return response, nr_timestamps
+
+    @property
+    def max_requests_in_flight(self) -> int:
+        return max(self.request_settings.max_requests_in_flight or 1, 1)
+
+    def _iter_download_time_series_planned(
+        self, request_params: Dict, statistics: Optional[TimeSeriesStatistics] = None
+    ) -> Generator[Dict, ResponseType, List[ResponseType]]:
+        """Download time-series with date ranges that are planned upfront (see create_planned_date_ranges).
+
+        The statistics (valueCount, firstValueTime, lastValueTime, timeStep) of the whole period are taken from argument
+        statistics (e.g. from an inventory) or requested with one small request. Each planned date range is downloaded
+        without probing, max_requests_in_flight date ranges at the same time. Equidistant time-series can always be
+        planned exactly. Without valueCount, we use the density of an earlier run (window hints): that is only an
+        estimate, so then each planned date range is still checked against max_request_nr_timestamps (probing, see
+        _iter_download_time_series) before it is downloaded. If no plan can be made, we fall back to probing per date
+        range, starting with the time-window of an earlier run.
+        """
+        if statistics is None:
+            statistics = yield from self._iter_get_statistics_whole_period(request_params=request_params)
+        if statistics is None:
+            return []
+        if statistics.nr_timestamps == 0:
+            return (yield from self._iter_download_time_series_empty(request_params=request_params))
+
+        planned = self._plan_date_ranges(
+            statistics=statistics, window_hint=self._get_window_hint(request_params=request_params)
+        )
+        if planned is None:
+            return (yield from self._iter_download_time_series_probed(request_params=request_params))
+
+        date_ranges, date_range_freq = planned
+        if len(date_ranges) > 1:
+            self.updated_request_period = date_range_freq
+        self._save_window_hint(
+            request_params=request_params,
+            request_period=date_range_freq if len(date_ranges) > 1 else None,
+            timestamps_per_day=self._get_timestamps_per_day(
+                nr_timestamps=statistics.nr_timestamps,
+                first_value_time=statistics.first_value_time,
+                last_value_time=statistics.last_value_time,
+            ),
+        )
+        if self._is_estimated_plan(statistics=statistics):
+            return (
+                yield from self._iter_download_time_series(
+                    date_ranges=date_ranges,
+                    date_range_freq=date_range_freq,
+                    request_params=request_params,
+                    check_exists=False,
+                )
+            )
+        return (yield from self._iter_download_date_ranges(request_params=request_params, date_ranges=date_ranges))
+
+    @staticmethod
+    def _is_estimated_plan(statistics: TimeSeriesStatistics) -> bool:
+        """A nonequidistant time-series without valueCount is planned with the density of an earlier run."""
+        return statistics.nr_timestamps is None and not DateFrequencyBuilder.is_equidistant(
+            time_step=statistics.time_step
+        )
+
+    def _iter_download_time_series_empty(
+        self, request_params: Dict
+    ) -> Generator[Dict, ResponseType, List[ResponseType]]:
+        """No timestamps between start_time and end_time.
+
+        If the time-series does exist (outside that period), we return one (empty) response for the whole period.
+        """
+        exists = yield from self._iter_exists(request_params=request_params)
+        if not exists:
+            return []
+        date_range = (pd.Timestamp(self.start_time), pd.Timestamp(self.end_time))
+        return (yield from self._iter_download_date_ranges(request_params=request_params, date_ranges=[date_range]))
+
+    def _iter_download_date_ranges(
+        self, request_params: Dict, date_ranges: List[Tuple[pd.Timestamp, pd.Timestamp]]
+    ) -> Generator[Union[Dict, List[Dict]], Union[ResponseType, List[ResponseType]], List[ResponseType]]:
+        """Download all date ranges, max_requests_in_flight date ranges at the same time (no probing)."""
+        ts_start, ts_end = pd.Timestamp(self.start_time), pd.Timestamp(self.end_time)
+        responses = []
+        for index in range(0, len(date_ranges), self.max_requests_in_flight):
+            # request max_requests_in_flight date ranges at the same time (they do not depend on each other)
+            date_ranges_in_flight = date_ranges[index : index + self.max_requests_in_flight]  # noqa
+            request_params_in_flight = []
+            for data_range_start, data_range_end in date_ranges_in_flight:
+                request_params["startTime"] = datetime_to_fews_date_str(data_range_start)
+                request_params["endTime"] = datetime_to_fews_date_str(data_range_end)
+                request_params["onlyHeaders"] = False
+                request_params["showStatistics"] = False
+                request_params_in_flight.append(request_params.copy())
+            responses_in_flight = yield from self._iter_get_many(
+                request_params_list=request_params_in_flight, return_exceptions=True
+            )
+            for date_range, response in zip(date_ranges_in_flight, responses_in_flight):
+                responses += yield from self._iter_download_date_range(
+                    request_params=request_params, date_range=date_range, response=response
+                )
+            DateFrequencyBuilder.log_progress_download_ts(
+                task=self.get_task_uuid(request_params=request_params),
+                request_end=date_ranges_in_flight[-1][1],
+                ts_start=ts_start,
+                ts_end=ts_end,
+            )
+        return responses
+
+    def _iter_download_date_range(
+        self,
+        request_params: Dict,
+        date_range: Tuple[pd.Timestamp, pd.Timestamp],
+        response: Union[ResponseType, Exception, None] = None,
+        is_bisected: bool = False,
+    ) -> Generator[Dict, ResponseType, List[ResponseType]]:
+        """Download one date range (or use its response or error if already requested) and return its responses.
+
+        If the download fails with a timeout, connection error or 5xx response (e.g. a sensor spike with 1-minute data
+        makes the time-window too large for the FEWS server), the date range is bisected and both halves are downloaded
+        on their own, recursively down to request_settings.min_request_period. So one dense period does not kill a
+        multi-year download. If even a time-window of min_request_period fails, the size was not the problem and we
+        raise a TimeWindowDownloadError (instead of bisecting all other halves too).
+        """
+        if response is None:
+            download_params = request_params.copy()
+            download_params["startTime"] = datetime_to_fews_date_str(date_range[0])
+            download_params["endTime"] = datetime_to_fews_date_str(date_range[1])
+            download_params["onlyHeaders"] = False
+            download_params["showStatistics"] = False
+            responses = yield from self._iter_get_many(request_params_list=[download_params], return_exceptions=True)
+            response = responses[0]
+        is_failed = self._is_failed_time_window(response=response)
+        halves = None
+        if is_failed:
+            halves = DateFrequencyBuilder.bisect_date_range(
+                startdate_obj=date_range[0],
+                enddate_obj=date_range[1],
+                min_period=self.request_settings.min_request_period,
+            )
+        if halves is None and is_failed and is_bisected:
+            msg = f"download {self.get_task_uuid(request_params=request_params)} {date_range[0]} - {date_range[1]}"
+            raise exceptions.TimeWindowDownloadError(f"{msg} failed after bisecting, err={response}")
+        if halves is None:
+            return self._get_ok_responses(responses=[response])
+        logger.warning(
+            f"download {self.get_task_uuid(request_params=request_params)} {date_range[0]} - {date_range[1]} failed "
+            f"({response}), continue with two halves"
+        )
+        responses = []
+        for half in halves:
+            responses += yield from self._iter_download_date_range(
+                request_params=request_params, date_range=half, is_bisected=True
+            )
+        return responses
+
+    def _is_failed_time_window(self, response: Union[ResponseType, Exception]) -> bool:
+        """Did the download of a time-window fail, probably because it is too large (or too slow) for FEWS?"""
+        if isinstance(response, Exception):
+            return isinstance(response, self.time_window_errors)
+        return response.status_code >= 500
+
+    @staticmethod
+    def _get_ok_responses(responses: List[Union[ResponseType, Exception]]) -> List[ResponseType]:
+        """Raise the first error, log and skip responses that are not ok."""
+        ok_responses = []
+        for response in responses:
+            if isinstance(response, Exception):
+                raise response
+            if response.status_code != 200:
+                logger.error(f"FEWS Server responds {response.text}")
+                continue
+            ok_responses.append(response)
+        return ok_responses
+
+    def _plan_date_ranges(
+        self, statistics: TimeSeriesStatistics, window_hint: Optional[WindowHint]
+    ) -> Optional[Tuple[List[Tuple[pd.Timestamp, pd.Timestamp]], pd.Timedelta]]:
+        ts_start, ts_end = pd.Timestamp(self.start_time), pd.Timestamp(self.end_time)
+        nr_timestamps = statistics.nr_timestamps
+        if nr_timestamps is None and window_hint and window_hint.timestamps_per_day:
+            # estimate with the density of an earlier run
+            first_value_time = ts_start if pd.isna(statistics.first_value_time) else statistics.first_value_time
+            last_value_time = ts_end if pd.isna(statistics.last_value_time) else statistics.last_value_time
+            days = (pd.Timestamp(last_value_time) - pd.Timestamp(first_value_time)) / pd.Timedelta(days=1)
+            nr_timestamps = max(int(days * window_hint.timestamps_per_day), 1)
+        return DateFrequencyBuilder.create_planned_date_ranges(
+            startdate_obj=ts_start,
+            enddate_obj=ts_end,
+            nr_timestamps=nr_timestamps,
+            first_value_time=statistics.first_value_time,
+            last_value_time=statistics.last_value_time,
+            request_settings=self.request_settings,
+            time_step=statistics.time_step,
+        )
+
+    def _iter_download_time_series_probed(
+        self, request_params: Dict
+    ) -> Generator[Dict, ResponseType, List[ResponseType]]:
+        """Download time-series with probing per date range, starting with the best time-window we know."""
+        ts_start, ts_end = pd.Timestamp(self.start_time), pd.Timestamp(self.end_time)
+        window_hint = self._get_window_hint(request_params=request_params)
+        frequency = (
+            (window_hint.request_period if window_hint else None)
+            or self.updated_request_period
+            or pd.Timedelta(ts_end - ts_start)
+        )
+        date_ranges, date_range_freq = DateFrequencyBuilder.create_date_ranges_and_frequency_used(
+            startdate_obj=ts_start, enddate_obj=ts_end, frequency=frequency
+        )
+        return (
+            yield from self._iter_download_time_series(
+                date_ranges=date_ranges,
+                date_range_freq=date_range_freq,
+                request_params=request_params,
+                check_exists=False,
+            )
+        )
+
+    @staticmethod
+    def _get_timestamps_per_day(
+        nr_timestamps: Optional[int], first_value_time: Optional[pd.Timestamp], last_value_time: Optional[pd.Timestamp]
+    ) -> Optional[float]:
+        if not nr_timestamps or pd.isna(first_value_time) or pd.isna(last_value_time):
+            return None
+        days = (pd.Timestamp(last_value_time) - pd.Timestamp(first_value_time)) / pd.Timedelta(days=1)
+        return nr_timestamps / days if days > 0 else None
+
+    @property
+    def window_hints(self) -> Optional[WindowHints]:
+        return get_window_hints(path=self.request_settings.window_hints_path)
+
+    def _get_window_hint(self, request_params: Dict) -> Optional[WindowHint]:
+        if not self.window_hints or not isinstance(request_params.get("locationIds", None), str):
+            return None
+        return self.window_hints.get(key=self.window_hints.get_key(self.pi_settings.domain, request_params))
+
+    def _save_window_hint(
+        self,
+        request_params: Dict,
+        request_period: Optional[pd.Timedelta] = None,
+        timestamps_per_day: Optional[float] = None,
+    ) -> None:
+        if not self.window_hints or not isinstance(request_params.get("locationIds", None), str):
+            return
+        self.window_hints.update(
+            key=self.window_hints.get_key(self.pi_settings.domain, request_params),
+            request_period=request_period,
+            timestamps_per_day=timestamps_per_day,
+        )
+
+    def _save_window_hints(self) -> None:
+        """Write the window hints of this download to file at once (see WindowHints.save)."""
+        if self.window_hints:
+            self.window_hints.save()
+
+    @staticmethod
+    def _iter_get_many(
+        request_params_list: List[Dict], return_exceptions: bool = False
+    ) -> Generator[Union[Dict, List[Dict]], Union[ResponseType, List[ResponseType]], List[ResponseType]]:
+        """Yield one request_params, or a list of request_params to request them concurrently (see _send_requests).
+
+        Like asyncio.gather: with return_exceptions=True a failed request results in its error instead of a response,
+        otherwise the first error is raised.
+        """
+        if len(request_params_list) == 1:
+            try:
+                responses = [(yield request_params_list[0])]
+            except Exception as err:
+                if not return_exceptions:
+                    raise
+                responses = [err]
+        else:
+            responses = yield request_params_list
+        errors = [x for x in responses if isinstance(x, Exception)]
+        if errors and not return_exceptions:
+            raise errors[0]
+        return responses
+
+    def _iter_get_statistics_whole_period(
+        self, request_params: Dict
+    ) -> Generator[Dict, ResponseType, Optional[TimeSeriesStatistics]]:
+        """Returns the statistics of one time-series between start_time and end_time (one small request).
+
+        Returns None if the location_id or parameter_id does not exist.
+        """
+        request_params_copy = request_params.copy()
+        request_params_copy["startTime"] = datetime_to_fews_date_str(self.start_time)
+        request_params_copy["endTime"] = datetime_to_fews_date_str(self.end_time)
+        try:
+            inventory = yield from self._iter_get_inventory(request_params=request_params_copy)
+        except (exceptions.LocationIdsDoesNotExistErr, exceptions.ParameterIdsDoesNotExistErr) as err:
+            logger.warning(err)
+            return None
+        if inventory.empty:
+            return TimeSeriesStatistics(nr_timestamps=0)
+        return self._get_statistics_from_inventory(inventory=inventory)
+
+    @staticmethod
+    def _get_statistics_from_inventory(inventory: pd.DataFrame) -> TimeSeriesStatistics:
+        """Combine inventory rows of one combination (e.g. >1 time-series with different moduleInstanceIds)."""
+        value_counts = inventory["value_count"]
+        time_steps = inventory["time_step"]
+        has_one_time_step = time_steps.notna().all() and time_steps.nunique() == 1
+        return TimeSeriesStatistics(
+            nr_timestamps=None if value_counts.isna().any() else int(value_counts.sum()),
+            first_value_time=inventory["first_value_time"].min(),
+            last_value_time=inventory["last_value_time"].max(),
+            time_step=time_steps.iloc[0] if has_one_time_step else None,
+        )
+
+    @staticmethod
+    def _get_statistics_params(request_params: Dict) -> Dict:
         request_params["onlyHeaders"] = True
         request_params["showStatistics"] = True
-        response = self.retry_backoff_session.get(
-            url=self.url, params=request_params, verify=self.pi_settings.ssl_verify
-        )
-        return response
+        return request_params.copy()
 
-    def _get_nr_timestamps_no_start_end(self, request_params: Dict) -> int:
+    def _iter_get_nr_timestamps_no_start_end(self, request_params: Dict) -> Generator[Dict, ResponseType, int]:
         request_params_copy = request_params.copy()
         request_params_copy["startTime"] = self.start_time_all
         request_params_copy["endTime"] = self.end_time_all
-        return self._get_nr_timestamps(request_params_copy)
+        return (yield from self._iter_get_nr_timestamps(request_params_copy))
 
-    def _get_nr_timestamps(self, request_params: Dict) -> int:
-        assert "moduleInstanceIds" in request_params, "code error _get_nr_timestamps"
-        response = self._get_statistics(request_params=request_params)
-        msg = f"status_code={response.status_code}, err={response.text}, request_params={request_params}"
+    def _iter_get_nr_timestamps(self, request_params: Dict) -> Generator[Dict, ResponseType, int]:
+        assert "moduleInstanceIds" in request_params, "code error _iter_get_nr_timestamps"
+        response = yield self._get_statistics_params(request_params=request_params)
+        return self._get_nr_timestamps_from_response(response=response, request_params=request_params)
+
+    def _iter_get_inventory(self, request_params: Dict) -> Generator[Dict, ResponseType, pd.DataFrame]:
+        """Get valueCount, firstValueTime, lastValueTime, timeStep of all time-series in request_params.
+
+        Per qualifierId we do one small request (onlyHeaders=True, and showStatistics=True) for max
+        max_request_nr_location_ids locationIds and all parameterIds. The statistics are always requested as PI_JSON
+        (regardless of output_choice) as that is easiest to parse. Time-series without values are not in the
+        inventory if omitEmptyTimeSeries=True. Returns for example:
+
+            location_id parameter_id qualifier_id  value_count    first_value_time     last_value_time time_step
+            OW433001    H.G.0        None                  102 2012-01-01 00:15:00 2012-01-02 00:00:00       NaT
+            OW433002    H.G.0        None                   96 2012-01-01 00:00:00 2012-01-01 23:45:00       NaT
+        """
+        assert "moduleInstanceIds" in request_params, "code error _iter_get_inventory"
+        location_ids = self._as_list(request_params.get("locationIds", None))
+        qualifier_ids = self._as_list(request_params.get("qualifierIds", None)) or [None]
+        rows = []
+        for qualifier_id in qualifier_ids:
+            for index in range(0, len(location_ids), self.max_request_nr_location_ids):
+                location_ids_chunk = location_ids[index : index + self.max_request_nr_location_ids]  # noqa
+                inventory_params = self._get_statistics_params(request_params=request_params.copy())
+                inventory_params["documentFormat"] = PiRestDocumentFormatChoices.json.value
+                inventory_params["locationIds"] = location_ids_chunk
+                inventory_params.pop("qualifierIds", None)
+                if qualifier_id is not None:
+                    inventory_params["qualifierIds"] = qualifier_id
+                response = yield inventory_params
+                if not response.ok:
+                    msg = f"status_code={response.status_code}, err={response.text}, request_params={inventory_params}"
+                    self.__get_nr_timestamps_invalid_response(response=response, msg=msg)
+                    continue
+                for header in probe_pi_headers(response=response):
+                    rows.append(self._get_inventory_row(header=header, qualifier_id=qualifier_id))
+        df = pd.DataFrame(data=rows, columns=self.inventory_columns)
+        df["value_count"] = df["value_count"].astype("Int64")
+        df["first_value_time"] = pd.to_datetime(df["first_value_time"])
+        df["last_value_time"] = pd.to_datetime(df["last_value_time"])
+        df["time_step"] = pd.to_timedelta(df["time_step"])
+        return df
+
+    @staticmethod
+    def _get_inventory_row(header: HeaderStatistics, qualifier_id: Optional[str]) -> Tuple:
+        return (
+            header.location_id,
+            header.parameter_id,
+            qualifier_id,
+            header.value_count,
+            header.first_value_time,
+            header.last_value_time,
+            header.time_step,
+        )
+
+    @staticmethod
+    def _as_list(ids: Union[List[str], str, None]) -> List[str]:
+        if ids is None:
+            return []
+        return [ids] if isinstance(ids, str) else list(ids)
+
+    def _get_nr_timestamps_from_response(self, response: ResponseType, request_params: Dict) -> int:
+        """The valueCount of a statistics probe. Only the header is parsed (see probe_pi_headers)."""
         if not response.ok:
+            msg = f"status_code={response.status_code}, err={response.text}, request_params={request_params}"
             return self.__get_nr_timestamps_invalid_response(response=response, msg=msg)
-        if self.pi_settings.document_format == PiRestDocumentFormatChoices.json:
-            time_series = response.json().get("timeSeries", None)
-            if not time_series:
-                return 0
-            nr_time_series = len(time_series)
-            if nr_time_series == 1:
-                nr_timestamps = int(time_series[0]["header"]["valueCount"])
-                return nr_timestamps
-            msg = f"code error: found {nr_time_series} time_series in _get_nr_timestamps. Expected 0 or 1, {msg}"
-            raise AssertionError(msg)
-        elif self.pi_settings.document_format == PiRestDocumentFormatChoices.xml:
-            xml_python_obj = parse(response.text)
-            try:
-                nr_timestamps = int(xml_python_obj.TimeSeries.series.header.valueCount.cdata)
-                return nr_timestamps
-            except Exception as err:
-                raise AssertionError(f"could not get nr_timestamps from xml_python_obj, err={err}, {msg}")
-        else:
-            raise NotImplementedError(f"invalid document_format {self.pi_settings.document_format}")
+        try:
+            headers = probe_pi_headers(response=response, max_nr_headers=2)
+        except Exception as err:
+            msg = f"err={response.text}, request_params={request_params}"
+            raise AssertionError(f"could not get nr_timestamps from response, err={err}, {msg}")
+        if not headers:
+            return 0
+        if len(headers) == 1 and headers[0].value_count is not None:
+            return headers[0].value_count
+        msg = f"found {len(headers)} time_series (valueCount={headers[0].value_count}), request_params={request_params}"
+        raise AssertionError(f"code error: {msg} in _iter_get_nr_timestamps. Expected 0 or 1 with a valueCount")
 
     def __get_nr_timestamps_invalid_response(self, response: ResponseType, msg: str):
         if self.response_text_no_ts_found in response.text:
@@ -286,6 +762,95 @@ class GetTimeSeriesBase(GetRequest):
             raise exceptions.ParameterIdsDoesNotExistErr(msg)
         raise AssertionError(f"(unknown non-200 response, {msg}")
 
+    @property
+    def series_store(self) -> Optional[SeriesStore]:
+        return get_series_store(root_dir=self.request_settings.series_store_dir, domain=self.pi_settings.domain)
+
+    @property
+    def use_series_store(self) -> bool:
+        """The series store only has time-series with only value and flag, and without thinning."""
+        return self.series_store is not None and not self.thinning and self.only_value_and_flag
+
+    def _iter_sync_series_store(
+        self, request_params: Dict
+    ) -> Generator[Union[Dict, List[Dict]], Union[ResponseType, List[ResponseType]], pd.DataFrame]:
+        """Download only what is not in the series store yet (see SeriesStore.get_download_periods) and merge it.
+
+        Returns the same dataframe as response_jsons_to_one_df would for the whole period, but read from the store.
+        """
+        start_time, end_time = pd.Timestamp(self.start_time), pd.Timestamp(self.end_time)
+        synced_at = self._get_synced_at()
+        periods = self.series_store.get_download_periods(
+            request_params=request_params,
+            start_time=start_time,
+            end_time=end_time,
+            overlap=self.request_settings.series_store_overlap,
+            by_creation_time=self.request_settings.series_store_by_creation_time,
+        )
+        for period in periods:
+            responses = yield from self._iter_download_period(request_params=request_params, period=period)
+            events, missing_value = response_jsons_to_events(responses=responses)
+            self.series_store.write(
+                request_params=request_params,
+                events=events,
+                period=period,
+                missing_value=missing_value,
+                synced_at=synced_at,
+            )
+        stored_series = self.series_store.read(request_params=request_params)
+        return stored_series.to_df(
+            start_time=start_time,
+            end_time=end_time,
+            location_id=request_params["locationIds"],
+            parameter_id=request_params["parameterIds"],
+            drop_missing_values=self.drop_missing_values,
+            flag_threshold=self.flag_threshold,
+        )
+
+    @classmethod
+    def _get_synced_at(cls) -> pd.Timestamp:
+        """The (naive utc, like the stored timestamps) startCreationTime for the next sync of the series store.
+
+        FEWS stores the creation time of events in utc by its own clock. We subtract series_store_clock_margin, so that
+        events created during this sync (or just before it, if our clock is ahead) are downloaded again next time.
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return pd.Timestamp(now).floor("s") - cls.series_store_clock_margin
+
+    def _iter_download_period(
+        self, request_params: Dict, period: DownloadPeriod
+    ) -> Generator[Union[Dict, List[Dict]], Union[ResponseType, List[ResponseType]], List[ResponseType]]:
+        """Download one period of the series store: all events, or only the events created since start_creation_time.
+
+        The changed events are expected to be few, so these are requested at once (bisected if that fails).
+        """
+        changed_since = f" changed since {period.start_creation_time}" if period.start_creation_time else ""
+        logger.info(
+            f"download {self.get_task_uuid(request_params=request_params)} from {period.start} to {period.end}"
+            f"{changed_since}, the rest is read from {self.series_store.get_path(request_params=request_params)}"
+        )
+        api_call = self._copy_with_period(start_time=period.start, end_time=period.end)
+        period_params = request_params.copy()
+        period_params["startTime"] = datetime_to_fews_date_str(period.start)
+        period_params["endTime"] = datetime_to_fews_date_str(period.end)
+        if period.start_creation_time is None:
+            return (yield from api_call._iter_download_time_series_planned(request_params=period_params))
+        period_params["startCreationTime"] = datetime_to_fews_date_str(period.start_creation_time)
+        return (
+            yield from api_call._iter_download_date_ranges(
+                request_params=period_params, date_ranges=[(period.start, period.end)]
+            )
+        )
+
+    def _copy_with_period(self, start_time: pd.Timestamp, end_time: pd.Timestamp) -> "GetTimeSeriesBase":
+        """A copy of this api call for another period (e.g. to download only a part of the period)."""
+        api_call = copy.copy(self)
+        api_call.start_time = pd.Timestamp(start_time).to_pydatetime()
+        api_call.end_time = pd.Timestamp(end_time).to_pydatetime()
+        api_call._initial_fews_parameters = None
+        api_call._filtered_fews_parameters = None
+        return api_call
+
     @abstractmethod
-    def run(self, *args, **kwargs):
+    def iter_run(self) -> Generator[Dict, ResponseType, Any]:
         raise NotImplementedError
@@ -0,0 +1,36 @@
+from hdsr_fewspy.api_calls.time_series.base import GetTimeSeriesBase
+from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.constants.custom_types import ResponseType
+from typing import Dict
+from typing import Generator
+from typing import List
+
+import logging
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+class GetTimeSeriesInventory(GetTimeSeriesBase):
+    """Headers and statistics (valueCount, firstValueTime, lastValueTime) of many time-series with a few requests."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.validate_constructor()
+
+    def validate_constructor(self):
+        for ids in (self.location_ids, self.parameter_ids):
+            assert ids, "location_ids and parameter_ids are required"
+            assert all([isinstance(x, str) for x in self._as_list(ids)])
+        if self.qualifier_ids:
+            assert all([isinstance(x, str) for x in self._as_list(self.qualifier_ids)])
+
+    @property
+    def allowed_output_choices(self) -> List[OutputChoices]:
+        return [OutputChoices.pandas_dataframe_in_memory]
+
+    def iter_run(self) -> Generator[Dict, ResponseType, pd.DataFrame]:
+        self._ensure_efcis_omits_empty_timeseries()
+        df = yield from self._iter_get_inventory(request_params=self.initial_fews_parameters)
+        return df
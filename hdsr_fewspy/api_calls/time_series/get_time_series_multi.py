@@ -1,9 +1,17 @@
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
+from hdsr_fewspy import exceptions
 from hdsr_fewspy.api_calls.time_series.base import GetTimeSeriesBase
+from hdsr_fewspy.api_calls.time_series.base import TimeSeriesStatistics
 from hdsr_fewspy.constants.choices import OutputChoices
-from hdsr_fewspy.date_frequency import DateFrequencyBuilder
+from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.converters.split_response import split_time_series_response_per_location
 from pathlib import Path
 from typing import Dict
+from typing import Generator
 from typing import List
+from typing import Optional
+from typing import Tuple
 
 import logging
 import pandas as pd
@@ -13,11 +21,23 @@ logger = logging.getLogger(__name__)
 
 
 class GetTimeSeriesMulti(GetTimeSeriesBase):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, max_workers: int = 1, batched: bool = False, **kwargs):
+        self.max_workers = max_workers
+        self.batched = batched
         super().__init__(*args, **kwargs)
         self.validate_constructor()
 
     def validate_constructor(self):
+        max_pool_size = self.retry_backoff_session.pool_maxsize
+        is_valid = isinstance(self.max_workers, int) and 1 <= self.max_workers <= max_pool_size
+        assert is_valid, f"max_workers {self.max_workers} must be an int from 1 to {max_pool_size}"
+        nr_requests_in_flight = self.max_workers * self.max_requests_in_flight
+        assert nr_requests_in_flight <= max_pool_size, (
+            f"max_workers {self.max_workers} x request_settings max_requests_in_flight {self.max_requests_in_flight} "
+            f"must be <= {max_pool_size}"
+        )
+        assert isinstance(self.batched, bool), f"batched {self.batched} must be a bool"
+
         assert isinstance(self.location_ids, list) and self.location_ids
         assert [isinstance(x, str) for x in self.location_ids]
 
@@ -33,7 +53,7 @@ class GetTimeSeriesMulti(GetTimeSeriesBase):
             any_multi
         ), "Please specify >1 location_ids and/or parameter_ids and/or qualifier_ids. Or use get_time_series_single"
 
-        if self.output_choice != OutputChoices.csv_file_in_download_dir:
+        if self.output_choice not in {OutputChoices.csv_file_in_download_dir, OutputChoices.arrow_file_in_download_dir}:
             logger.warning(f"flag_threshold is not used for output_choice {self.output_choice}")
             if self.drop_missing_values == True:  # noqa
                 logger.warning(f"drop_missing_values is not used for output_choice {self.output_choice}")
@@ -44,52 +64,283 @@ class GetTimeSeriesMulti(GetTimeSeriesBase):
             OutputChoices.xml_file_in_download_dir,
             OutputChoices.json_file_in_download_dir,
             OutputChoices.csv_file_in_download_dir,
+            OutputChoices.arrow_file_in_download_dir,
         ]
 
     def run(self) -> List[Path]:
+        if self.max_workers == 1:
+            return super().run()
+        inventory = self._send_requests(requests_generator=self.iter_get_inventory())
+        # every worker downloads and writes its own location_parameter_qualifier combination. The shared
+        # rate limiter ensures that all workers together respect requests_per_second
+        requests_generators = self.iter_run_per_combination(inventory=inventory)
+        nr_total = len(requests_generators)
+        logger.info(f"download {nr_total} time-series with max_workers={self.max_workers}")
+        file_paths_per_index = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hdsr_fewspy") as executor:
+            future_to_index = {
+                executor.submit(self._send_requests, requests_generator): index
+                for index, requests_generator in enumerate(requests_generators)
+            }
+            for nr_done, future in enumerate(as_completed(future_to_index), start=1):
+                file_paths_per_index[future_to_index[future]] = future.result()
+                self._log_progress(nr_done=nr_done, nr_total=nr_total)
+        # keep the order of the combinations, regardless which worker finished first
+        return self.collect_file_paths(file_paths_per_combination=[file_paths_per_index[x] for x in range(nr_total)])
+
+    def iter_run(self) -> Generator[Dict, ResponseType, List[Path]]:
+        """Download and write the unique combinations one after another."""
+        inventory = yield from self.iter_get_inventory()
+        requests_generators = self.iter_run_per_combination(inventory=inventory)
+        nr_total = len(requests_generators)
+        file_paths_per_combination = []
+        for index, requests_generator in enumerate(requests_generators):
+            file_paths_created = yield from requests_generator
+            file_paths_per_combination.append(file_paths_created)
+            self._log_progress(nr_done=index + 1, nr_total=nr_total)
+        return self.collect_file_paths(file_paths_per_combination=file_paths_per_combination)
+
+    def iter_get_inventory(self) -> Generator[Dict, ResponseType, Optional[pd.DataFrame]]:
+        """Get valueCount, firstValueTime, lastValueTime, timeStep of all combinations (see _iter_get_inventory).
+
+        Returns None if the inventory could not be made, e.g. since one of the location_ids does not exist.
+        """
         self._ensure_efcis_omits_empty_timeseries()
+        try:
+            return (yield from self._iter_get_inventory(request_params=self.initial_fews_parameters))
+        except (exceptions.LocationIdsDoesNotExistErr, exceptions.ParameterIdsDoesNotExistErr) as err:
+            logger.warning(f"could not get inventory, continue without it, err={err}")
+            return None
+
+    def iter_run_per_combination(
+        self, inventory: Optional[pd.DataFrame] = None
+    ) -> List[Generator[Dict, ResponseType, List[Path]]]:
+        """One requests generator per unique location_parameter_qualifier combination. Each can run concurrently.
 
-        all_file_paths = []
+        With an inventory, combinations without time-series are dropped before any download starts. If batched, then
+        one requests generator per batch of combinations (see _get_batches). Batches do not apply to time-series that
+        are synced with the series store: these are downloaded per combination.
+        """
         cartesian_parameters_list = self._get_cartesian_parameters_list(parameters=self.initial_fews_parameters)
-        nr_total = len(cartesian_parameters_list)
-        for index, request_params in enumerate(cartesian_parameters_list):
-            responses = []
-            request_frequency = pd.Timedelta(self.end_time - self.start_time)
-
-            # eventually continue with request_period of last request (avoiding all freq update iterations)
-            frequency = (
-                self.request_settings.updated_request_period
-                if self.request_settings.updated_request_period
-                else request_frequency
+        statistics_per_combination = self._get_statistics_per_combination(inventory=inventory)
+        if statistics_per_combination is None:
+            if self.batched:
+                logger.warning("batched requires an inventory, continue without batch")
+            return [self._iter_download_and_write(request_params=x) for x in cartesian_parameters_list]
+
+        cartesian_parameters_list = self._drop_empty_combinations(
+            cartesian_parameters_list=cartesian_parameters_list,
+            statistics_per_combination=statistics_per_combination,
+        )
+        if self.batched and self._use_series_store_for_file:
+            logger.warning("batched does not apply to the series store, continue without batch")
+        elif self.batched:
+            return [
+                self._iter_download_and_write_batch(
+                    request_params_list=x, statistics_per_combination=statistics_per_combination
+                )
+                for x in self._get_batches(cartesian_parameters_list=cartesian_parameters_list)
+            ]
+        return [
+            self._iter_download_and_write(
+                request_params=x, statistics=statistics_per_combination[self._get_combination_key(request_params=x)]
             )
-            date_ranges, date_range_freq = DateFrequencyBuilder.create_date_ranges_and_frequency_used(
-                startdate_obj=pd.Timestamp(self.start_time),
-                enddate_obj=pd.Timestamp(self.end_time),
-                frequency=frequency,
+            for x in cartesian_parameters_list
+        ]
+
+    @property
+    def _use_series_store_for_file(self) -> bool:
+        is_table_file = self.output_choice in {
+            OutputChoices.csv_file_in_download_dir,
+            OutputChoices.arrow_file_in_download_dir,
+        }
+        return is_table_file and self.use_series_store
+
+    def collect_file_paths(self, file_paths_per_combination: List[List[Path]]) -> List[Path]:
+        """All file paths of the finished download. Also writes the window hints of this download at once."""
+        self._save_window_hints()
+        all_file_paths = [path for file_paths in file_paths_per_combination for path in file_paths]
+        if all_file_paths:
+            logger.info(f"finished download and writing to {len(all_file_paths)} file(s)")
+        else:
+            logger.warning("finished download but no data found, so nothing to write to file")
+        return all_file_paths
+
+    @staticmethod
+    def _get_combination_key(request_params: Dict) -> Tuple[str, str, Optional[str]]:
+        return (
+            request_params.get("locationIds", None),
+            request_params.get("parameterIds", None),
+            request_params.get("qualifierIds", None),
+        )
+
+    @classmethod
+    def _get_statistics_per_combination(
+        cls, inventory: Optional[pd.DataFrame]
+    ) -> Optional[Dict[Tuple[str, str, Optional[str]], TimeSeriesStatistics]]:
+        """Returns TimeSeriesStatistics per combination.
+
+        Returns None if the inventory is unknown or incomplete (e.g. FEWS did not return a valueCount).
+        """
+        if inventory is None or inventory["value_count"].isna().any():
+            return None
+        statistics_per_combination = {}
+        for key, inventory_combination in inventory.groupby(
+            ["location_id", "parameter_id", "qualifier_id"], dropna=False, sort=False
+        ):
+            key = tuple(None if pd.isna(x) else x for x in key)
+            statistics_per_combination[key] = cls._get_statistics_from_inventory(inventory=inventory_combination)
+        return statistics_per_combination
+
+    def _drop_empty_combinations(
+        self, cartesian_parameters_list: List[Dict], statistics_per_combination: Dict[Tuple, TimeSeriesStatistics]
+    ) -> List[Dict]:
+        result = []
+        for request_params in cartesian_parameters_list:
+            statistics = statistics_per_combination.get(self._get_combination_key(request_params=request_params))
+            if statistics and statistics.nr_timestamps > 0:
+                result.append(request_params)
+                continue
+            logger.info(f"skipping since no time-series for '{self.get_task_uuid(request_params=request_params)}'")
+        return result
+
+    def _iter_download_and_write(
+        self, request_params: Dict, statistics: Optional[TimeSeriesStatistics] = None
+    ) -> Generator[Dict, ResponseType, List[Path]]:
+        """Download all responses for one unique location_parameter_qualifier combination and write them to file.
+
+        Use statistics if already known (e.g. from the inventory). Files are named after the requested period
+        (start_time, end_time), also if the time-series is downloaded in many time-windows.
+        """
+        file_name_keys = ["locationIds", "parameterIds", "qualifierIds", "startTime", "endTime"]
+        file_name_values = [request_params.get(param, None) for param in file_name_keys]
+        if self._use_series_store_for_file:
+            df = yield from self._iter_sync_series_store(request_params=request_params)
+            return self.response_manager.run_df(df=df, file_name_values=file_name_values)
+        responses = yield from self._iter_download_time_series_planned(
+            request_params=request_params, statistics=statistics
+        )
+        file_paths_created = self.response_manager.run(
+            responses=responses,
+            file_name_values=file_name_values,
+            drop_missing_values=self.drop_missing_values,
+            flag_threshold=self.flag_threshold,
+            only_value_and_flag=self.only_value_and_flag,
+        )
+        return file_paths_created
+
+    @classmethod
+    def _get_batches(cls, cartesian_parameters_list: List[Dict]) -> List[List[Dict]]:
+        """Group combinations with the same parameterIds and qualifierIds, max max_request_nr_location_ids per group.
+
+        Combinations in one batch only differ in locationIds, so they can be requested with one multi-id request.
+        """
+        batches_per_key: Dict[Tuple, List[List[Dict]]] = {}
+        for request_params in cartesian_parameters_list:
+            key = (request_params.get("parameterIds", None), request_params.get("qualifierIds", None))
+            batches = batches_per_key.setdefault(key, [[]])
+            if len(batches[-1]) == cls.max_request_nr_location_ids:
+                batches.append([])
+            batches[-1].append(request_params)
+        return [batch for batches in batches_per_key.values() for batch in batches]
+
+    def _iter_download_and_write_batch(
+        self, request_params_list: List[Dict], statistics_per_combination: Dict[Tuple, TimeSeriesStatistics]
+    ) -> Generator[Dict, ResponseType, List[Path]]:
+        """Download and write combinations that only differ in locationIds with as few requests as possible.
+
+        Combinations are downloaded with a multi-id request, where each request has max max_request_nr_timestamps
+        (according to the inventory). Combinations that exceed max_request_nr_timestamps on their own are downloaded
+        in little chunks.
+        """
+        sub_batches, too_large = self._split_batch_by_nr_timestamps(
+            request_params_list=request_params_list, statistics_per_combination=statistics_per_combination
+        )
+        file_paths_created = []
+        for sub_batch in sub_batches:
+            file_paths_created += yield from self._iter_download_and_write_sub_batch(
+                request_params_list=sub_batch, statistics_per_combination=statistics_per_combination
             )
-            responses = self._download_time_series(
-                date_ranges=date_ranges,
-                date_range_freq=date_range_freq,
+        for request_params in too_large:
+            file_paths_created += yield from self._iter_download_and_write(
                 request_params=request_params,
-                responses=responses,
+                statistics=statistics_per_combination[self._get_combination_key(request_params=request_params)],
+            )
+        return file_paths_created
+
+    def _split_batch_by_nr_timestamps(
+        self, request_params_list: List[Dict], statistics_per_combination: Dict[Tuple, TimeSeriesStatistics]
+    ) -> Tuple[List[List[Dict]], List[Dict]]:
+        """Returns sub_batches with max max_request_nr_timestamps each, and combinations too large for one request."""
+        max_nr_timestamps = self.request_settings.max_request_nr_timestamps
+        sub_batches = [[]]
+        sub_batch_nr_timestamps = 0
+        too_large = []
+        for request_params in request_params_list:
+            nr_timestamps = statistics_per_combination[
+                self._get_combination_key(request_params=request_params)
+            ].nr_timestamps
+            if nr_timestamps > max_nr_timestamps:
+                too_large.append(request_params)
+                continue
+            if sub_batches[-1] and sub_batch_nr_timestamps + nr_timestamps > max_nr_timestamps:
+                sub_batches.append([])
+                sub_batch_nr_timestamps = 0
+            sub_batches[-1].append(request_params)
+            sub_batch_nr_timestamps += nr_timestamps
+        return [x for x in sub_batches if x], too_large
+
+    def _iter_download_and_write_sub_batch(
+        self, request_params_list: List[Dict], statistics_per_combination: Dict[Tuple, TimeSeriesStatistics]
+    ) -> Generator[Dict, ResponseType, List[Path]]:
+        """Download combinations with one multi-id request and write the response per combination.
+
+        If the multi-id request fails (timeout, connection error, or not a 200 response, e.g. a 5xx), then each
+        combination is downloaded on its own (see _iter_download_and_write), where a failed time-window is bisected.
+        So one failing request does not drop all combinations, nor stops the whole get_time_series_multi.
+        """
+        request_params = request_params_list[0].copy()
+        request_params["locationIds"] = [x["locationIds"] for x in request_params_list]
+        request_params["onlyHeaders"] = False
+        request_params["showStatistics"] = False
+        response = (yield from self._iter_get_many(request_params_list=[request_params], return_exceptions=True))[0]
+        if isinstance(response, Exception) and not isinstance(response, self.time_window_errors):
+            raise response
+        if isinstance(response, Exception) or response.status_code != 200:
+            error = response if isinstance(response, Exception) else f"{response.status_code} {response.text}"
+            logger.warning(
+                f"batch request for {len(request_params_list)} combinations failed ({error}), continue per combination"
             )
-            file_name_keys = ["locationIds", "parameterIds", "qualifierIds", "startTime", "endTime"]
-            file_name_values = [request_params.get(param, None) for param in file_name_keys]
-            file_paths_created = self.response_manager.run(
-                responses=responses,
-                file_name_values=file_name_values,
+            file_paths_created = []
+            for request_params in request_params_list:
+                file_paths_created += yield from self._iter_download_and_write(
+                    request_params=request_params,
+                    statistics=statistics_per_combination[self._get_combination_key(request_params=request_params)],
+                )
+            return file_paths_created
+        response_per_location = split_time_series_response_per_location(
+            response=response,
+            document_format=self.document_format,
+        )
+        file_paths_created = []
+        file_name_keys = ["locationIds", "parameterIds", "qualifierIds", "startTime", "endTime"]
+        for request_params in request_params_list:
+            response = response_per_location.get(request_params["locationIds"], None)
+            if response is None:
+                continue
+            file_paths_created += self.response_manager.run(
+                responses=[response],
+                file_name_values=[request_params.get(param, None) for param in file_name_keys],
                 drop_missing_values=self.drop_missing_values,
                 flag_threshold=self.flag_threshold,
                 only_value_and_flag=self.only_value_and_flag,
             )
-            all_file_paths.extend(file_paths_created)
-            progress_percentage = int((index + 1) / nr_total * 100)
-            logger.info(f"get_time_series_multi progress = {progress_percentage}%")
-        if all_file_paths:
-            logger.info(f"finished download and writing to {len(all_file_paths)} file(s)")
-        else:
-            logger.warning("finished download but no data found, so nothing to write to file")
-        return all_file_paths
+        return file_paths_created
+
+    @staticmethod
+    def _log_progress(nr_done: int, nr_total: int) -> None:
+        progress_percentage = int(nr_done / nr_total * 100)
+        logger.info(f"get_time_series_multi progress = {progress_percentage}%")
 
     @classmethod
     def _get_cartesian_parameters_list(cls, parameters: Dict) -> List[Dict]:  # noqa
@@ -1,15 +1,22 @@
 from hdsr_fewspy.api_calls.time_series.base import GetTimeSeriesBase
 from hdsr_fewspy.constants.choices import OutputChoices
 from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.converters import json_to_arrow
 from hdsr_fewspy.converters.json_to_df_time_series import response_jsons_to_one_df
-from hdsr_fewspy.date_frequency import DateFrequencyBuilder
+from hdsr_fewspy.converters.json_to_df_time_series import to_compact_dtypes
+from typing import Dict
+from typing import Generator
 from typing import List
+from typing import TYPE_CHECKING
 from typing import Union
 
 import logging
 import pandas as pd
 
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,7 +31,7 @@ class GetTimeSeriesSingle(GetTimeSeriesBase):
         if self.qualifier_ids:
             assert isinstance(self.qualifier_ids, str) and "," not in self.qualifier_ids
 
-        if self.output_choice != OutputChoices.pandas_dataframe_in_memory:
+        if self.output_choice not in {OutputChoices.pandas_dataframe_in_memory, OutputChoices.arrow_table_in_memory}:
             logger.warning(f"flag_threshold is not used for output_choice {self.output_choice}")
             if self.drop_missing_values == True:  # noqa
                 logger.warning(f"drop_missing_values is not used for output_choice {self.output_choice}")
@@ -35,31 +42,37 @@ class GetTimeSeriesSingle(GetTimeSeriesBase):
             OutputChoices.json_response_in_memory,
             OutputChoices.xml_response_in_memory,
             OutputChoices.pandas_dataframe_in_memory,
+            OutputChoices.arrow_table_in_memory,
         ]
 
-    def run(self) -> Union[List[ResponseType], pd.DataFrame]:
+    def iter_run(self) -> Generator[Dict, ResponseType, Union[List[ResponseType], pd.DataFrame, "pa.Table"]]:
         self._ensure_efcis_omits_empty_timeseries()
 
-        request_frequency = pd.Timedelta(self.end_time - self.start_time)
-        # eventually continue with request_period of last request (avoiding all freq update iterations)
-
-        frequency = (
-            self.request_settings.updated_request_period
-            if self.request_settings.updated_request_period
-            else request_frequency
-        )
-        date_ranges, date_range_freq = DateFrequencyBuilder.create_date_ranges_and_frequency_used(
-            startdate_obj=pd.Timestamp(self.start_time), enddate_obj=pd.Timestamp(self.end_time), frequency=frequency
-        )
-        responses = self._download_time_series(
-            date_ranges=date_ranges,
-            date_range_freq=date_range_freq,
-            request_params=self.initial_fews_parameters,
-        )
+        if self.output_choice == OutputChoices.arrow_table_in_memory and self.use_series_store:
+            df = yield from self._iter_sync_series_store(request_params=self.initial_fews_parameters)
+            self._save_window_hints()
+            return json_to_arrow.df_to_table(df=df)
+        if self.output_choice == OutputChoices.pandas_dataframe_in_memory and self.use_series_store:
+            df = yield from self._iter_sync_series_store(request_params=self.initial_fews_parameters)
+            self._save_window_hints()
+            return to_compact_dtypes(df=df) if self.request_settings.compact_dtypes else df
+        responses = yield from self._iter_download_time_series_planned(request_params=self.initial_fews_parameters)
+        self._save_window_hints()
+        return self.parse_responses(responses=responses)
 
+    def parse_responses(self, responses: List[ResponseType]) -> Union[List[ResponseType], pd.DataFrame, "pa.Table"]:
         if self.output_choice in {OutputChoices.json_response_in_memory, OutputChoices.xml_response_in_memory}:
             return responses
 
+        if self.output_choice == OutputChoices.arrow_table_in_memory:
+            # straight from the parsed event columns to arrow, without a dataframe in between
+            return json_to_arrow.response_jsons_to_one_table(
+                responses=responses,
+                drop_missing_values=self.drop_missing_values,
+                flag_threshold=self.flag_threshold,
+                only_value_and_flag=self.only_value_and_flag,
+            )
+
         assert self.output_choice == OutputChoices.pandas_dataframe_in_memory, "code error GetTimeSeriesSingle"
         # parse the response to dataframe
         df = response_jsons_to_one_df(
@@ -68,4 +81,4 @@ class GetTimeSeriesSingle(GetTimeSeriesBase):
             flag_threshold=self.flag_threshold,
             only_value_and_flag=self.only_value_and_flag,
         )
-        return df
+        return to_compact_dtypes(df=df) if self.request_settings.compact_dtypes else df
@@ -1,6 +1,8 @@
 from hdsr_fewspy.api_calls.time_series.get_time_series_single import GetTimeSeriesSingle
 from hdsr_fewspy.constants.choices import OutputChoices
 from hdsr_fewspy.constants.custom_types import ResponseType
+from typing import Dict
+from typing import Generator
 from typing import List
 
 import logging
@@ -35,5 +37,6 @@ class GetTimeSeriesStatistics(GetTimeSeriesSingle):
             OutputChoices.xml_response_in_memory,
         ]
 
-    def run(self) -> ResponseType:
-        return self._get_statistics(request_params=self.filtered_fews_parameters)
+    def iter_run(self) -> Generator[Dict, ResponseType, ResponseType]:
+        response = yield self._get_statistics_params(request_params=self.filtered_fews_parameters)
+        return response
@@ -0,0 +1,326 @@
+from datetime import datetime
+from hdsr_fewspy import api_calls
+from hdsr_fewspy.api_base import ApiBase
+from hdsr_fewspy.api_calls.base import GetRequest
+from hdsr_fewspy.async_retry_session import AsyncRetryBackoffSession
+from hdsr_fewspy.constants.choices import DefaultPiSettingsChoices
+from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.constants.paths import SECRETS_ENV_PATH
+from hdsr_fewspy.constants.pi_settings import PiSettings
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Generator
+from typing import List
+from typing import TYPE_CHECKING
+from typing import Union
+
+import asyncio
+import logging
+import pandas as pd
+
+
+if TYPE_CHECKING:
+    import geopandas as gpd  # imported when used (see GetLocations), as it is slow to import
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncApi(ApiBase):
+    """Asyncio variant of Api with the same methods, but each method must be awaited.
+
+    Many requests (e.g. get_time_series_single for many locations) can run concurrently on one event loop. All requests
+    share one rate limiter per FEWS domain, so together they respect the request_settings requests_per_second.
+
+    The constructor does not go to github: permissions and pi_settings are resolved on first use (see ApiBase). With
+    'async with' that happens in a thread (the downloads use blocking requests), so the event loop is not blocked.
+    Without it, the first awaited call resolves them and blocks the event loop meanwhile.
+
+    Example:
+        async with AsyncApi(pi_settings=...) as api:
+            df1, df2 = await asyncio.gather(
+                api.get_time_series_single(location_id="OW433001", ...),
+                api.get_time_series_single(location_id="OW433002", ...),
+            )
+    """
+
+    def __init__(
+        self,
+        github_personal_access_token: str = None,
+        secrets_env_path: Union[str, Path] = SECRETS_ENV_PATH,
+        pi_settings: Union[PiSettings, DefaultPiSettingsChoices] = None,
+        output_directory_root: Union[str, Path] = None,
+        startup_cache_path: Union[str, Path] = None,
+    ):
+        super().__init__(
+            github_personal_access_token=github_personal_access_token,
+            secrets_env_path=secrets_env_path,
+            pi_settings=pi_settings,
+            output_directory_root=output_directory_root,
+            startup_cache_path=startup_cache_path,
+        )
+        self.__retry_backoff_session = None
+
+    @property
+    def retry_backoff_session(self) -> AsyncRetryBackoffSession:
+        """Created on first use, as it needs the pi_settings (resolved on first use, see ApiBase)."""
+        if self.__retry_backoff_session is None:
+            self.__retry_backoff_session = AsyncRetryBackoffSession(
+                _request_settings=self.request_settings,
+                pi_settings=self.pi_settings,
+                output_dir=self.output_dir,
+            )
+        return self.__retry_backoff_session
+
+    async def __aenter__(self) -> "AsyncApi":
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: self.retry_backoff_session)
+        await self.ensure_service_is_running()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self.__retry_backoff_session is not None:
+            await self.__retry_backoff_session.aclose()
+
+    async def ensure_service_is_running(self) -> None:
+        """Just request endpoint with smallest response (=timezonid). Skipped if it was running a moment ago."""
+        if self._is_service_recently_running():
+            return
+        try:
+            response = await self.get_timezone_id(output_choice=OutputChoices.json_response_in_memory)
+            if response.ok:
+                self._set_service_running()
+                return
+            self._log_not_running_service(err=None, response=response)
+        except Exception as err:
+            self._log_not_running_service(err=err, response=None)
+
+    async def _send_requests(self, api_call: GetRequest, requests_generator: Generator[Dict, ResponseType, Any]) -> Any:
+        """Async version of GetRequest._send_requests: await every request_params yielded by requests_generator."""
+        try:
+            request_params = next(requests_generator)
+            while True:
+                try:
+                    if isinstance(request_params, list):
+                        response = list(
+                            await asyncio.gather(
+                                *[self.retry_backoff_session.get(url=api_call.url, params=x) for x in request_params],
+                                return_exceptions=True,
+                            )
+                        )
+                    else:
+                        response = await self.retry_backoff_session.get(url=api_call.url, params=request_params)
+                except Exception as err:
+                    request_params = requests_generator.throw(err)
+                    continue
+                request_params = requests_generator.send(response)
+        except StopIteration as stop:
+            return stop.value
+
+    async def _run(self, api_call: GetRequest) -> Any:
+        return await self._send_requests(api_call=api_call, requests_generator=api_call.iter_run())
+
+    async def get_parameters(self, output_choice: OutputChoices) -> Union[ResponseType, pd.DataFrame]:
+        api_call = api_calls.GetParameters(
+            output_choice=output_choice,
+            retry_backoff_session=self.retry_backoff_session,
+        )
+        result = await self._run(api_call=api_call)
+        return result
+
+    async def get_filters(self, output_choice: OutputChoices) -> ResponseType:
+        api_call = api_calls.GetFilters(output_choice=output_choice, retry_backoff_session=self.retry_backoff_session)
+        result = await self._run(api_call=api_call)
+        return result
+
+    async def get_locations(
+        self, output_choice: OutputChoices, show_attributes: bool = True
+    ) -> Union[ResponseType, "gpd.GeoDataFrame"]:
+        api_call = api_calls.GetLocations(
+            show_attributes=show_attributes,
+            output_choice=output_choice,
+            retry_backoff_session=self.retry_backoff_session,
+        )
+        result = await self._run(api_call=api_call)
+        return result
+
+    async def get_qualifiers(self, output_choice: OutputChoices) -> pd.DataFrame:
+        api_call = api_calls.GetQualifiers(
+            output_choice=output_choice, retry_backoff_session=self.retry_backoff_session
+        )
+        result = await self._run(api_call=api_call)
+        return result
+
+    async def get_timezone_id(self, output_choice: OutputChoices) -> ResponseType:
+        """Get FEWS timezone_id the FEWS API is running on."""
+        api_call = api_calls.GetTimeZoneId(
+            output_choice=output_choice, retry_backoff_session=self.retry_backoff_session
+        )
+        result = await self._run(api_call=api_call)
+        return result
+
+    async def get_samples(
+        self,
+        output_choice: OutputChoices,
+        #
+        start_time: datetime,
+        end_time: datetime,
+        location_id: str = None,
+        sample_id: str = None,
+    ) -> Union[ResponseType, pd.DataFrame]:
+        api_call = api_calls.GetSamples(
+            start_time=start_time,
+            end_time=end_time,
+            location_ids=location_id,
+            sample_ids=sample_id,
+            #
+            output_choice=output_choice,
+            retry_backoff_session=self.retry_backoff_session,
+        )
+        result = await self._run(api_call=api_call)
+        return result
+
+    async def get_time_series_statistics(
+        self,
+        output_choice: OutputChoices,
+        #
+        start_time: datetime,
+        end_time: datetime,
+        location_id: str,
+        parameter_id: str,
+        qualifier_id: str = None,
+        thinning: int = None,
+        omit_empty_time_series: bool = True,
+    ) -> ResponseType:
+        """See Api.get_time_series_statistics."""
+        api_call = api_calls.GetTimeSeriesStatistics(
+            start_time=start_time,
+            end_time=end_time,
+            location_ids=location_id,
+            parameter_ids=parameter_id,
+            qualifier_ids=qualifier_id,
+            thinning=thinning,
+            omit_empty_time_series=omit_empty_time_series,
+            #
+            output_choice=output_choice,
+            retry_backoff_session=self.retry_backoff_session,
+        )
+        result = await self._run(api_call=api_call)
+        return result
+
+    async def get_time_series_inventory(
+        self,
+        output_choice: OutputChoices,
+        #
+        start_time: Union[datetime, str],
+        end_time: Union[datetime, str],
+        location_ids: List[str],
+        parameter_ids: List[str],
+        qualifier_ids: List[str] = None,
+        omit_empty_time_series: bool = True,
+    ) -> pd.DataFrame:
+        """See Api.get_time_series_inventory."""
+        api_call = api_calls.GetTimeSeriesInventory(
+            start_time=start_time,
+            end_time=end_time,
+            location_ids=location_ids,
+            parameter_ids=parameter_ids,
+            qualifier_ids=qualifier_ids,
+            thinning=None,
+            omit_empty_time_series=omit_empty_time_series,
+            #
+            output_choice=output_choice,
+            retry_backoff_session=self.retry_backoff_session,
+        )
+        result = await self._run(api_call=api_call)
+        return result
+
+    async def get_time_series_single(
+        self,
+        output_choice: OutputChoices,
+        #
+        start_time: Union[datetime, str],
+        end_time: Union[datetime, str],
+        location_id: str,
+        parameter_id: str,
+        qualifier_id: str = None,
+        thinning: int = None,
+        omit_empty_time_series: bool = True,
+        #
+        drop_missing_values: bool = False,
+        flag_threshold: int = 6,
+        #
+        only_value_and_flag: bool = True,
+    ) -> Union[List[ResponseType], pd.DataFrame]:
+        """See Api.get_time_series_single."""
+        api_call = api_calls.GetTimeSeriesSingle(
+            start_time=start_time,
+            end_time=end_time,
+            location_ids=location_id,
+            parameter_ids=parameter_id,
+            qualifier_ids=qualifier_id,
+            thinning=thinning,
+            omit_empty_time_series=omit_empty_time_series,
+            drop_missing_values=drop_missing_values,
+            flag_threshold=flag_threshold,
+            #
+            only_value_and_flag=only_value_and_flag,
+            output_choice=output_choice,
+            retry_backoff_session=self.retry_backoff_session,
+        )
+        result = await self._run(api_call=api_call)
+        return result
+
+    async def get_time_series_multi(
+        self,
+        output_choice: OutputChoices,
+        #
+        start_time: Union[datetime, str],
+        end_time: Union[datetime, str],
+        location_ids: List[str] = None,
+        parameter_ids: List[str] = None,
+        qualifier_ids: List[str] = None,
+        thinning: int = None,
+        omit_empty_time_series: bool = True,
+        #
+        drop_missing_values: bool = False,
+        flag_threshold: int = 6,
+        #
+        only_value_and_flag: bool = True,
+        #
+        max_workers: int = 1,
+        batched: bool = False,
+    ) -> List[Path]:
+        """See Api.get_time_series_multi. Here max_workers is the number of combinations downloaded concurrently."""
+        api_call = api_calls.GetTimeSeriesMulti(
+            start_time=start_time,
+            end_time=end_time,
+            location_ids=location_ids,
+            parameter_ids=parameter_ids,
+            qualifier_ids=qualifier_ids,
+            thinning=thinning,
+            omit_empty_time_series=omit_empty_time_series,
+            drop_missing_values=drop_missing_values,
+            flag_threshold=flag_threshold,
+            #
+            max_workers=max_workers,
+            batched=batched,
+            output_choice=output_choice,
+            retry_backoff_session=self.retry_backoff_session,
+        )
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def download_and_write(requests_generator: Generator[Dict, ResponseType, List[Path]]) -> List[Path]:
+            async with semaphore:
+                return await self._send_requests(api_call=api_call, requests_generator=requests_generator)
+
+        inventory = await self._send_requests(api_call=api_call, requests_generator=api_call.iter_get_inventory())
+        file_paths_per_combination = await asyncio.gather(
+            *[download_and_write(requests_generator=x) for x in api_call.iter_run_per_combination(inventory=inventory)]
+        )
+        all_file_paths = api_call.collect_file_paths(file_paths_per_combination=list(file_paths_per_combination))
+        return all_file_paths
@@ -0,0 +1,183 @@
+from enum import Enum
+from hdsr_fewspy import exceptions
+from hdsr_fewspy.constants.pi_settings import PiSettings
+from hdsr_fewspy.constants.request_settings import RequestSettings
+from hdsr_fewspy.converters.utils import create_response
+from hdsr_fewspy.rate_limiter import SessionRateLimiter
+from hdsr_fewspy.rate_limiter import TokenBucketRateLimiter
+from hdsr_fewspy.response_cache import get_response_cache
+from hdsr_fewspy.response_cache import ResponseCache
+from hdsr_fewspy.retry_session import RetryBackoffSession
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import asyncio
+import functools
+import logging
+import pandas as pd
+import requests
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRetryBackoffSession:
+    """The asyncio variant of RetryBackoffSession (same retry, backoff, timeout and rate-limit strategy).
+
+    It uses httpx.AsyncClient (pip install hdsr_fewspy[async]) for the requests. Waiting for a response or waiting for
+    the rate limiter does not block the event loop, so other coroutines can continue meanwhile.
+    Responses are converted to a requests.Response, so everything downstream (ResponseManager, converters) does not
+    need to know whether a response came from Api or AsyncApi.
+
+    max_connections:
+    Max number of concurrent connections to the FEWS server.
+    """
+
+    retries: int = RetryBackoffSession.retries
+    backoff_factor: float = RetryBackoffSession.backoff_factor
+    status_force_list: Tuple = RetryBackoffSession.status_force_list
+    timeout_seconds: int = RetryBackoffSession.timeout_seconds
+    max_connections: int = RetryBackoffSession.pool_maxsize
+
+    def __init__(
+        self,
+        _request_settings: RequestSettings,
+        pi_settings: PiSettings,
+        output_dir: Optional[Path],
+    ):
+        self.request_settings = _request_settings
+        self.pi_settings = pi_settings
+        self.output_dir = output_dir
+        self.__client = None
+        self.__session_rate_limiter = SessionRateLimiter()
+
+    @property
+    def pool_maxsize(self) -> int:
+        """Same name as RetryBackoffSession, so that GetRequest validation works for both sessions."""
+        return self.max_connections
+
+    @property
+    def _client(self):
+        if self.__client is None:
+            httpx = self.__import_httpx()
+            self.__client = httpx.AsyncClient(
+                verify=self.pi_settings.ssl_verify,
+                limits=httpx.Limits(max_connections=self.max_connections),
+            )
+        return self.__client
+
+    @property
+    def rate_limiter(self) -> TokenBucketRateLimiter:
+        # the same limiter as RetryBackoffSession, so sync and async requests to one domain share one budget
+        return self.__session_rate_limiter.get(
+            domain=self.pi_settings.domain, rate_limit=self.request_settings.rate_limit
+        )
+
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        # the same cache as RetryBackoffSession, so sync and async requests share cached responses
+        return get_response_cache(
+            path=self.request_settings.response_cache_path,
+            max_size_bytes=self.request_settings.response_cache_max_size_bytes,
+            ttl_per_endpoint=self.request_settings.response_cache_ttl_per_endpoint,
+        )
+
+    @staticmethod
+    def __import_httpx():
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("AsyncApi requires httpx. Please install it with 'pip install hdsr_fewspy[async]'")
+        return httpx
+
+    @staticmethod
+    def _to_query_params(params: Optional[Dict]) -> List[Tuple[str, str]]:
+        """Encode params the same way requests does: a list results in a repeated key and None values are skipped."""
+        query_params = []
+        for key, value in (params or {}).items():
+            for x in value if isinstance(value, (list, tuple)) else [value]:
+                if x is None:
+                    continue
+                query_params.append((key, str(x.value if isinstance(x, Enum) else x)))
+        return query_params
+
+    async def get(
+        self, url: str, timeout_seconds: int = timeout_seconds, params: Dict = None, **kwargs
+    ) -> requests.Response:
+        """Async version of RetryBackoffSession.get(). Argument 'verify' is set once per session (pi_settings)."""
+        assert url.endswith("/"), f"url {url} must end with '/"
+        kwargs.pop("verify", None)
+        httpx = self.__import_httpx()
+        response_cache = self.response_cache
+        loop = asyncio.get_running_loop()
+        if response_cache:
+            # the cache (sqlite) is used in a thread, so it does not block the event loop
+            response = await loop.run_in_executor(None, functools.partial(response_cache.get, url=url, params=params))
+            if response is not None:
+                return response
+        await self.rate_limiter.acquire_async()
+        now = pd.Timestamp.now()
+        query_params = self._to_query_params(params=params)
+        try:
+            response = await self.__get_with_retries(url=url, timeout_seconds=timeout_seconds, params=query_params)
+        except httpx.TimeoutException as err:
+            logger.error(f"request timed out for url: {url}, err: {err}")
+            raise requests.exceptions.Timeout(str(err))
+        except httpx.TransportError as err:
+            msg = f"request failed for url: {url}, err: {err}"
+            logger.error(msg)
+            if self.pi_settings.domain == "localhost":
+                msg += (
+                    f"Please make sure fews SA webservice is running (D:/Tomcat/bin/Tomcat9w.exe). Verify in "
+                    f"browser it is running: {self.pi_settings.test_url}"
+                )
+                raise exceptions.StandAloneFewsWebServiceNotRunningError(msg)
+            raise requests.exceptions.ConnectionError(msg)
+        response_seconds = (pd.Timestamp.now() - now).seconds
+        if response_seconds > self.request_settings.max_response_time.seconds:
+            logger.warning(f"response_seconds={response_seconds}, status={response.status_code}, url={url}")
+        if response_cache:
+            await loop.run_in_executor(
+                None, functools.partial(response_cache.set, url=url, params=params, response=response)
+            )
+        return response
+
+    async def __get_with_retries(
+        self, url: str, timeout_seconds: int, params: List[Tuple[str, str]]
+    ) -> requests.Response:
+        httpx = self.__import_httpx()
+        for retry_nr in range(self.retries + 1):
+            if retry_nr:
+                # same backoff algorithm as urllib3 Retry: {backoff factor} * (2 ** ({number of retries} - 1))
+                await asyncio.sleep(self.backoff_factor * (2 ** (retry_nr - 1)))
+                # a retry is a request too (see RateLimitedRetry)
+                await self.rate_limiter.acquire_async()
+            try:
+                httpx_response = await self._client.get(url=url, params=params, timeout=timeout_seconds)
+            except httpx.TransportError:
+                if retry_nr == self.retries:
+                    raise
+                continue
+            if httpx_response.status_code in self.status_force_list and retry_nr < self.retries:
+                continue
+            if httpx_response.status_code in self.status_force_list:
+                msg = f"max retries exceeded for url: {url}, status={httpx_response.status_code}"
+                raise requests.exceptions.RetryError(msg)
+            response = create_response(
+                status_code=httpx_response.status_code,
+                content=httpx_response.content,
+                url=str(httpx_response.url),
+                headers=dict(httpx_response.headers),
+                encoding=httpx_response.encoding,
+                reason=httpx_response.reason_phrase,
+            )
+            response.elapsed = httpx_response.elapsed
+            return response
+
+    async def aclose(self) -> None:
+        if self.__client is not None:
+            await self.__client.aclose()
+            self.__client = None
@@ -108,9 +108,11 @@ class OutputChoices(Enum):
     xml_file_in_download_dir = "xml_file_in_download_dir"
     json_file_in_download_dir = "json_file_in_download_dir"
     csv_file_in_download_dir = "csv_file_in_download_dir"
+    arrow_file_in_download_dir = "arrow_file_in_download_dir"
     xml_response_in_memory = "xml_response_in_memory"
     json_response_in_memory = "json_response_in_memory"
     pandas_dataframe_in_memory = "pandas_dataframe_in_memory"
+    arrow_table_in_memory = "arrow_table_in_memory"
 
     @classmethod
     def validate(cls, output_choice: OutputChoices) -> OutputChoices:
@@ -118,10 +120,28 @@ class OutputChoices(Enum):
         return output_choice
 
     @classmethod
-    def get_pi_rest_document_format(cls, output_choice: OutputChoices) -> PiRestDocumentFormatChoices:
+    def get_pi_rest_document_format(
+        cls, output_choice: OutputChoices, dataframe_document_format: PiRestDocumentFormatChoices = None
+    ) -> PiRestDocumentFormatChoices:
+        """The FEWS document format to request. For a dataframe (or csv, or arrow) output this is
+        dataframe_document_format, as time-series can be converted from both PI_JSON and PI_XML (default PI_JSON)."""
         output_choice = cls.validate(output_choice=output_choice)
         if output_choice in [cls.xml_file_in_download_dir, cls.xml_response_in_memory]:
             return PiRestDocumentFormatChoices.xml
+        if (
+            output_choice
+            in [
+                cls.pandas_dataframe_in_memory,
+                cls.csv_file_in_download_dir,
+                cls.arrow_table_in_memory,
+                cls.arrow_file_in_download_dir,
+            ]
+            and dataframe_document_format
+        ):
+            assert isinstance(
+                dataframe_document_format, PiRestDocumentFormatChoices
+            ), "invalid dataframe_document_format"
+            return dataframe_document_format
         return PiRestDocumentFormatChoices.json
 
     @classmethod
@@ -131,6 +151,7 @@ class OutputChoices(Enum):
             cls.xml_file_in_download_dir,
             cls.json_file_in_download_dir,
             cls.csv_file_in_download_dir,
+            cls.arrow_file_in_download_dir,
         }
 
     @classmethod
@@ -8,3 +8,4 @@ GITHUB_HDSR_FEWSPY_AUTH_BRANCH_NAME = "main"
 GITHUB_HDSR_FEWSPY_AUTH_PERMISSIONS_TARGET_FILE = Path("permissions.csv")
 GITHUB_HDSR_FEWSPY_AUTH_SETTINGS_TARGET_FILE = Path("settings.csv")
 GITHUB_HDSR_FEWSPY_AUTH_ALLOWED_PERIOD_NO_UPDATES = timedelta(weeks=52)
+GITHUB_HDSR_FEWSPY_AUTH_CACHE_TTL = timedelta(hours=12)  # max age of permissions and settings in the StartupCache
@@ -8,6 +8,8 @@ assert BASE_DIR.is_dir()
 assert BASE_DIR.name == "hdsr_fewspy", f"BASE_DIR must be hdsr_fewspy, but is {BASE_DIR.name}"
 TEST_INPUT_DIR = BASE_DIR / "tests" / "data" / "input"
 DEFAULT_OUTPUT_FOLDER = G_DRIVE / "hdsr_fewspy_output"
+CACHE_DIR = Path.home() / ".hdsr_fewspy"  # things we remember between runs (e.g. window hints)
+STARTUP_CACHE_PATH = CACHE_DIR / "startup.json"  # permissions, settings and health check (see StartupCache)
 
 SECRETS_ENV_PATH = G_DRIVE / "secrets.env"
 GITHUB_PERSONAL_ACCESS_TOKEN = "GITHUB_PERSONAL_ACCESS_TOKEN"
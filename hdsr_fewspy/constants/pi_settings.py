@@ -1,8 +1,9 @@
 from dataclasses import asdict
 from dataclasses import dataclass
 from hdsr_fewspy.constants import github
-from hdsr_pygithub import GithubFileDownloader
+from hdsr_fewspy.startup_cache import StartupCache
 from typing import Dict
+from typing import Optional
 
 import logging
 import pandas as pd
@@ -28,7 +29,7 @@ class PiSettings:
             time_zone=TimeZoneChoices.gmt_0.value,
         )
 
-    Note that document_format (JSON/XMl) is automatically set (based on api.output_choice) during Api instance
+    Note that document_format (JSON/XMl) is automatically set (based on output_choice) in a copy per api call
     """
 
     settings_name: str
@@ -43,7 +44,7 @@ class PiSettings:
     time_zone: float
     #
     ssl_verify: bool
-    document_format: str = None  # updated based on api.output_choice during Api instance
+    document_format: str = None  # set based on output_choice in a copy per api call (see GetRequest)
 
     def __repr__(self) -> str:
         return f"{self.all_fields}"
@@ -107,14 +108,34 @@ class GithubPiSettingDefaults:
         "time_zone",
     ]
 
-    def __init__(self, github_personal_access_token: str):
+    def __init__(self, github_personal_access_token: str, startup_cache: Optional[StartupCache] = None):
         self.github_personal_access_token = github_personal_access_token
+        self.startup_cache = startup_cache
         self._df_github_settings = None
 
     @property
     def df_github_settings(self) -> pd.DataFrame:
+        """The default pi settings. Taken from the startup cache if possible (no github requests)."""
         if self._df_github_settings is not None:
             return self._df_github_settings
+        cache_key = f"settings|{StartupCache.hash_token(token=self.github_personal_access_token)}"
+        cached_records = (
+            self.startup_cache.get(key=cache_key, ttl=github.GITHUB_HDSR_FEWSPY_AUTH_CACHE_TTL)
+            if self.startup_cache
+            else None
+        )
+        if cached_records is not None:
+            self._df_github_settings = pd.DataFrame(data=cached_records, columns=self.expected_columns)
+            return self._df_github_settings
+        self._df_github_settings = self._download_df_github_settings()
+        if self.startup_cache:
+            self.startup_cache.set(key=cache_key, value=self._df_github_settings.to_dict(orient="records"))
+        return self._df_github_settings
+
+    def _download_df_github_settings(self) -> pd.DataFrame:
+        # hdsr_pygithub (PyGithub) is slow to import and not needed if the settings are in the startup cache
+        from hdsr_pygithub import GithubFileDownloader
+
         github_downloader = GithubFileDownloader(
             target_file=github.GITHUB_HDSR_FEWSPY_AUTH_SETTINGS_TARGET_FILE,
             allowed_period_no_updates=github.GITHUB_HDSR_FEWSPY_AUTH_ALLOWED_PERIOD_NO_UPDATES,
@@ -125,8 +146,7 @@ class GithubPiSettingDefaults:
         )
         df = pd.read_csv(filepath_or_buffer=github_downloader.get_download_url(), sep=";")
         assert sorted(df.columns) == sorted(self.expected_columns), "code_error"
-        self._df_github_settings = df
-        return self._df_github_settings
+        return df
 
     def _read_github(self, settings_name: str) -> pd.Series:
         logger.info(f"get_on_the_fly_pi_settings for setttings_name '{settings_name}'")
@@ -1,6 +1,11 @@
 from dataclasses import dataclass
+from hdsr_fewspy.constants.choices import PiRestDocumentFormatChoices
+from pathlib import Path
+from typing import Dict
+from typing import Tuple
 
 import pandas as pd
+import warnings
 
 
 @dataclass
@@ -8,9 +13,40 @@ class RequestSettings:
     max_request_nr_timestamps: int  # parse_raw(xml=response.text) takes 4 sec with 96054 timestamps
     min_request_nr_timestamps: int
     max_request_period: pd.Timedelta
-    min_time_between_requests: pd.Timedelta = None
+    min_time_between_requests: pd.Timedelta = None  # deprecated, use requests_per_second (see rate_limit)
     max_response_time: pd.Timedelta = None  # Warn if response time is above and adapt next request
-    updated_request_period: pd.Timedelta = None
+    updated_request_period: pd.Timedelta = None  # deprecated, no longer set (see GetTimeSeriesBase)
+    min_request_period: pd.Timedelta = None  # a failed time-window is bisected down to this period (None = no bisect)
+    requests_per_second: float = 1.0  # max sustained nr requests per second to one FEWS domain (token bucket)
+    burst_size: int = 1  # max nr requests that can be done at once after some idle time (token bucket)
+    max_requests_in_flight: int = None  # max nr concurrent requests for one time-series (1 = one request at a time)
+    window_hints_path: Path = None  # remember time-window per time-series between runs (None = do not remember)
+    response_cache_path: Path = None  # cache responses on disk, see ResponseCache (None = no cache)
+    response_cache_max_size_bytes: int = None  # None = ResponseCache.default_max_size_bytes
+    response_cache_ttl_per_endpoint: Dict[str, pd.Timedelta] = None  # e.g. {"locations": pd.Timedelta(days=7)}
+    series_store_dir: Path = None  # local Parquet store, see SeriesStore (None = no store, always download all)
+    series_store_overlap: pd.Timedelta = None  # download again this period before the last stored timestamp
+    series_store_by_creation_time: bool = False  # instead of overlap, download only events changed since last sync
+    metadata_cache_path: Path = None  # cache metadata responses on disk, see MetadataCache (None = only in memory)
+    metadata_cache_ttl: pd.Timedelta = None  # max age of a cached metadata response (None = no metadata cache)
+    dataframe_document_format: PiRestDocumentFormatChoices = None  # time-series to dataframe/csv from (None = PI_JSON)
+    compact_dtypes: bool = False  # get_time_series_single dataframe with less memory (see to_compact_dtypes)
+
+    def __post_init__(self):
+        if self.min_time_between_requests is not None:
+            warnings.warn(
+                "request setting 'min_time_between_requests' is deprecated, use 'requests_per_second' instead",
+                DeprecationWarning,
+                stacklevel=3,
+            )
+
+    @property
+    def rate_limit(self) -> Tuple[float, int]:
+        """(requests_per_second, burst_size) of the token bucket. The deprecated min_time_between_requests (if set and
+        > 0) overrules both: e.g. 2 seconds becomes 0.5 requests per second without burst, as it was before."""
+        if self.min_time_between_requests is None or self.min_time_between_requests <= pd.Timedelta(0):
+            return self.requests_per_second, self.burst_size
+        return 1 / self.min_time_between_requests.total_seconds(), 1
 
 
 def get_default_request_settings():
@@ -18,6 +54,12 @@ def get_default_request_settings():
         max_request_nr_timestamps=100000,
         min_request_nr_timestamps=10000,
         max_request_period=pd.Timedelta(weeks=52 * 2),
-        min_time_between_requests=pd.Timedelta(seconds=1),
         max_response_time=pd.Timedelta(seconds=20),
+        min_request_period=pd.Timedelta(days=1),
+        # the same load as before the token bucket (min 1 second between requests): FEWS WIS is shared by all users
+        requests_per_second=1.0,
+        burst_size=1,
+        max_requests_in_flight=1,
+        series_store_overlap=pd.Timedelta(days=7),
+        metadata_cache_ttl=pd.Timedelta(days=1),  # only in memory, see metadata_cache_path
     )
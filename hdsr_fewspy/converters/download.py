@@ -1,13 +1,19 @@
 from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.converters import json_to_arrow
 from hdsr_fewspy.converters.json_to_df_time_series import response_jsons_to_one_df
 from pathlib import Path
 from typing import List
+from typing import TYPE_CHECKING
 
 import json
 import logging
+import pandas as pd
 import requests
 
 
+if TYPE_CHECKING:
+    import pyarrow as pa
+
 logger = logging.getLogger(__name__)
 
 
@@ -104,13 +110,17 @@ class CsvDownloadDir(DownloadBase):
         drop_missing_values: bool = kwargs["drop_missing_values"]
         flag_threshold: int = kwargs["flag_threshold"]
         only_value_and_flag: bool = kwargs["only_value_and_flag"]
-        file_name_base = self._get_base_file_name(request_class=self.request_class, file_name_values=file_name_values)
         df = response_jsons_to_one_df(
             responses=responses,
             drop_missing_values=drop_missing_values,
             flag_threshold=flag_threshold,
             only_value_and_flag=only_value_and_flag,
         )
+        return self.run_df(df=df, file_name_values=file_name_values)
+
+    def run_df(self, df: pd.DataFrame, file_name_values: List[str]) -> List[Path]:
+        """Write a time-series dataframe (e.g. from the SeriesStore) to 1 .csv file."""
+        file_name_base = self._get_base_file_name(request_class=self.request_class, file_name_values=file_name_values)
         if df.empty:
             return []
         file_path = self.output_dir / f"{file_name_base}.csv"
@@ -118,3 +128,30 @@ class CsvDownloadDir(DownloadBase):
         self._ensure_output_dir_exists(file_path=file_path)
         df.to_csv(path_or_buf=file_path.as_posix(), sep=",", encoding="utf-8")
         return [file_path]
+
+
+class ArrowDownloadDir(DownloadBase):
+    def run(self, responses: List[ResponseType], file_name_values: List[str], **kwargs) -> List[Path]:
+        """Only for time-series: Aggregate all responses into 1 .arrow file (Arrow IPC, also known as Feather v2) as
+        all responses are for a unique location_parameter_qualifier combi in get_time_series_multi."""
+        table = json_to_arrow.response_jsons_to_one_table(
+            responses=responses,
+            drop_missing_values=kwargs["drop_missing_values"],
+            flag_threshold=kwargs["flag_threshold"],
+            only_value_and_flag=kwargs["only_value_and_flag"],
+        )
+        return self.run_table(table=table, file_name_values=file_name_values)
+
+    def run_df(self, df: pd.DataFrame, file_name_values: List[str]) -> List[Path]:
+        """Write a time-series dataframe (e.g. from the SeriesStore) to 1 .arrow file."""
+        return self.run_table(table=json_to_arrow.df_to_table(df=df), file_name_values=file_name_values)
+
+    def run_table(self, table: "pa.Table", file_name_values: List[str]) -> List[Path]:
+        file_name_base = self._get_base_file_name(request_class=self.request_class, file_name_values=file_name_values)
+        if not len(table):
+            return []
+        file_path = self.output_dir / f"{file_name_base}.arrow"
+        logger.info(f"writing response to new file {file_path}")
+        self._ensure_output_dir_exists(file_path=file_path)
+        json_to_arrow.write_table(table=table, file_path=file_path)
+        return [file_path]
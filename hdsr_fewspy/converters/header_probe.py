@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.converters.utils import dict_to_datetime
+from hdsr_fewspy.converters.utils import time_step_to_timedelta
+from hdsr_fewspy.converters.xml_stream import is_xml_response
+from hdsr_fewspy.converters.xml_stream import iter_pi_xml_headers
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+import itertools
+import json
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HeaderStatistics:
+    """The header fields of one time-series that are needed to plan downloads (statistics probe, inventory)."""
+
+    location_id: str
+    parameter_id: str
+    value_count: Optional[int] = None  # None if FEWS did not return a valueCount (showStatistics=False)
+    first_value_time: Optional[datetime] = None
+    last_value_time: Optional[datetime] = None
+    miss_val: Optional[float] = None
+    time_step: Optional[timedelta] = None  # None for nonequidistant time-series
+
+    @classmethod
+    def from_pi_header(cls, pi_header: Dict) -> HeaderStatistics:
+        value_count = pi_header.get("valueCount", None)
+        first_value_time = pi_header.get("firstValueTime", None)
+        last_value_time = pi_header.get("lastValueTime", None)
+        miss_val = pi_header.get("missVal", None)
+        return cls(
+            location_id=pi_header["locationId"],
+            parameter_id=pi_header["parameterId"],
+            value_count=int(value_count) if value_count is not None else None,
+            first_value_time=dict_to_datetime(first_value_time) if first_value_time else None,
+            last_value_time=dict_to_datetime(last_value_time) if last_value_time else None,
+            miss_val=float(miss_val) if miss_val is not None else None,
+            time_step=time_step_to_timedelta(time_step=pi_header.get("timeStep", None)),
+        )
+
+
+def probe_pi_headers(response: ResponseType, max_nr_headers: int = None) -> List[HeaderStatistics]:
+    """HeaderStatistics of the time-series in a /timeseries response (PI_JSON or PI_XML), e.g. a statistics probe
+    (onlyHeaders=True, showStatistics=True).
+
+    Only the headers are parsed, not the events, and parsing stops after max_nr_headers headers (PI_XML). We do not use
+    response.json() or response.text, as these first guess the encoding of the body (slow for thousands of probes).
+    """
+    pi_headers = _iter_pi_headers(response=response)
+    return [HeaderStatistics.from_pi_header(pi_header=x) for x in itertools.islice(pi_headers, max_nr_headers)]
+
+
+def _iter_pi_headers(response: ResponseType) -> Iterator[Dict]:
+    if is_xml_response(response=response):
+        return iter_pi_xml_headers(response=response)
+    # a probe has no events, so the body is small: json.loads (on bytes, utf-8) is the fastest
+    time_series = json.loads(response.content).get("timeSeries", [])
+    return (x["header"] for x in time_series)
@@ -0,0 +1,148 @@
+from hdsr_fewspy.constants.custom_types import ResponseType
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import io
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+JsonEvent = Tuple[str, object]  # ijson basic_parse event, e.g. ("map_key", "date") or ("string", "2019-01-01")
+
+
+class NotColumnarError(Exception):
+    """The events of a time-series do not fit in columns (e.g. an event without flag), use response.json() instead."""
+
+
+def _import_ijson():
+    try:
+        import ijson
+    except ImportError:
+        return None
+    return ijson
+
+
+def stream_pi_time_series(response: ResponseType) -> Optional[Dict]:
+    """Parse a PI_JSON /timeseries response like response.json(), but without building a dict per event.
+
+    The body is parsed incrementally (ijson, pip install hdsr_fewspy[stream]). The events of each time-series are put
+    straight into one list per event key: {"date": [...], "time": [...], "value": [...], "flag": [...]} instead of
+    [{"date": .., "time": .., "value": .., "flag": ..}, ...]. Nested event data (e.g. flagSourceColumn) is skipped. So
+    peak memory is the body and these lists, instead of the body and a python object tree that is 5-10x bigger.
+
+    Returns None if ijson is not installed or the events do not fit in columns: then use response.json().
+    """
+    ijson = _import_ijson()
+    if ijson is None:
+        return None
+    json_events = ijson.basic_parse(io.BytesIO(response.content), use_float=True)
+    try:
+        return _parse_map(json_events=json_events, ijson=ijson, value_parsers={"timeSeries": _parse_time_series_list})
+    except (NotColumnarError, ijson.JSONError) as err:
+        logger.debug(f"could not stream response {response.url}, use response.json() instead, err={err}")
+        return None
+
+
+def _parse_map(json_events: Iterator[JsonEvent], ijson, value_parsers: Dict) -> Dict:
+    """Parse a json object. A value_parser (per key) parses the value of that key, other values are build as usual."""
+    event, _ = next(json_events)
+    if event != "start_map":
+        raise NotColumnarError(f"expected a json object, got {event}")
+    return _parse_map_items(json_events=json_events, ijson=ijson, value_parsers=value_parsers)
+
+
+def _parse_map_items(json_events: Iterator[JsonEvent], ijson, value_parsers: Dict) -> Dict:
+    """Parse the keys and values of a json object (its start_map is already parsed) up to and including end_map."""
+    result = {}
+    for event, value in json_events:
+        if event == "end_map":
+            return result
+        value_parser = value_parsers.get(value, _build_value)
+        result[value] = value_parser(json_events=json_events, ijson=ijson)
+    raise NotColumnarError("unexpected end of json")
+
+
+def _build_value(json_events: Iterator[JsonEvent], ijson) -> object:
+    """Build the next json value (e.g. a header) with ijson, just like json.loads would."""
+    builder = ijson.ObjectBuilder()
+    depth = 0
+    for event, value in json_events:
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            return builder.value
+    raise NotColumnarError("unexpected end of json")
+
+
+def _parse_time_series_list(json_events: Iterator[JsonEvent], ijson) -> List[Dict]:
+    event, _ = next(json_events)
+    if event != "start_array":
+        raise NotColumnarError(f"expected a json array with time-series, got {event}")
+    time_series_list = []
+    for event, _ in json_events:
+        if event == "end_array":
+            return time_series_list
+        if event != "start_map":
+            raise NotColumnarError(f"expected a json object per time-series, got {event}")
+        time_series_list.append(
+            _parse_map_items(json_events=json_events, ijson=ijson, value_parsers={"events": _parse_event_columns})
+        )
+    raise NotColumnarError("unexpected end of json")
+
+
+def _parse_event_columns(json_events: Iterator[JsonEvent], ijson) -> Dict[str, list]:
+    """The events of one time-series as one list per event key (in key order of the first event)."""
+    event, _ = next(json_events)
+    if event != "start_array":
+        raise NotColumnarError(f"expected a json array with events, got {event}")
+    columns: Dict[str, list] = {}
+    nr_events = 0
+    for event, _ in json_events:
+        if event == "end_array":
+            break
+        if event != "start_map":
+            raise NotColumnarError(f"expected a json object per event, got {event}")
+        _parse_event(json_events=json_events, columns=columns, is_first=nr_events == 0)
+        nr_events += 1
+    if any(len(column) != nr_events for column in columns.values()):
+        raise NotColumnarError("not all events have the same keys")
+    return columns
+
+
+def _parse_event(json_events: Iterator[JsonEvent], columns: Dict[str, list], is_first: bool) -> None:
+    """Append the values of one event (its start_map is already parsed) to columns. Nested data is skipped."""
+    key = None
+    for event, value in json_events:
+        if event == "map_key":
+            key = value
+        elif event == "end_map":
+            return
+        elif event == "start_map" or event == "start_array":
+            _skip_value(json_events=json_events)
+        elif key in columns:
+            columns[key].append(value)
+        elif is_first:
+            columns[key] = [value]
+        else:
+            raise NotColumnarError(f"an event has key '{key}' that the first event does not have")
+    raise NotColumnarError("unexpected end of json")
+
+
+def _skip_value(json_events: Iterator[JsonEvent]) -> None:
+    """Skip a json object or array (its start_map or start_array is already parsed)."""
+    depth = 1
+    for event, _ in json_events:
+        if event == "start_map" or event == "start_array":
+            depth += 1
+        elif event == "end_map" or event == "end_array":
+            depth -= 1
+            if depth == 0:
+                return
+    raise NotColumnarError("unexpected end of json")
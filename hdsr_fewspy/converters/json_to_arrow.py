@@ -0,0 +1,210 @@
+from datetime import datetime
+from datetime import timedelta
+from hdsr_fewspy.constants import choices
+from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.converters.json_to_df_time_series import Events
+from hdsr_fewspy.converters.json_to_df_time_series import Header
+from hdsr_fewspy.converters.json_to_df_time_series import response_to_pi_time_series
+from hdsr_fewspy.converters.utils import camel_to_snake_case
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import TYPE_CHECKING
+from typing import Union
+
+import logging
+import pandas as pd
+
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+col_value = choices.TimeSeriesEventColumns.value.value
+col_flag = choices.TimeSeriesEventColumns.flag.value
+col_datetime = choices.TimeSeriesEventColumns.datetime.value
+col_location_id = "location_id"
+col_parameter_id = "parameter_id"
+
+
+def import_pyarrow():
+    # pyarrow is optional and slow to import, so only import it when we need it
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.feather
+    except ImportError:
+        raise ImportError("Arrow output requires pyarrow. Please install it with 'pip install hdsr_fewspy[arrow]'")
+    return pyarrow
+
+
+def get_time_series_schema() -> "pa.Schema":
+    """The columns of response_jsons_to_one_table with only_value_and_flag. FEWS times are in whole seconds."""
+    pa = import_pyarrow()
+    return pa.schema(
+        [
+            (col_datetime, pa.timestamp("s")),
+            (col_value, pa.float64()),
+            (col_flag, pa.int64()),
+            (col_location_id, pa.dictionary(pa.int32(), pa.string())),
+            (col_parameter_id, pa.dictionary(pa.int32(), pa.string())),
+        ]
+    )
+
+
+def response_jsons_to_one_table(
+    responses: List[ResponseType], drop_missing_values: bool, flag_threshold: int, only_value_and_flag: bool
+) -> "pa.Table":
+    """The time-series of all responses as one pyarrow table, the arrow version of response_jsons_to_one_df.
+
+    Each column is build at once from the parsed event columns (see response_to_pi_time_series), without a pandas
+    dataframe in between: datetime (timestamp[s], utc), value (float64), flag (int64), the other event keys if not
+    only_value_and_flag, and location_id and parameter_id (dictionary encoded, so one string per time-series instead
+    of one per row). A table is a chunk per time-series, so that nothing is copied to concat them.
+    """
+    pa = import_pyarrow()
+    tables = []
+    for response in responses:
+        pi_time_series = response_to_pi_time_series(response=response, only_value_and_flag=only_value_and_flag)
+        time_zone = pi_time_series.get("timeZone", choices.TimeZoneChoices.get_hdsr_default())
+        tz_offset = choices.TimeZoneChoices.get_tz_float(value=time_zone)
+        for time_series in pi_time_series.get("timeSeries", []):
+            if not time_series.get("events", None):
+                continue
+            header = Header.from_pi_header(pi_header=time_series["header"])
+            table = pi_events_to_table(
+                pi_events=time_series["events"],
+                missing_value=header.miss_val,
+                drop_missing_values=drop_missing_values,
+                flag_threshold=flag_threshold,
+                only_value_and_flag=only_value_and_flag,
+                tz_offset=tz_offset,
+            )
+            table = table.append_column(col_location_id, _repeat_dictionary(value=header.location_id, size=len(table)))
+            table = table.append_column(
+                col_parameter_id, _repeat_dictionary(value=header.parameter_id, size=len(table))
+            )
+            tables.append(table)
+    if not tables:
+        logger.warning(f"{len(responses)} response json(s)) resulted in a empty arrow table")
+        return get_time_series_schema().empty_table()
+    # columns that are not in all time-series (e.g. flagSource) are null there
+    table = pa.concat_tables(tables, promote_options="default").unify_dictionaries()
+    if not len(table):
+        logger.warning(f"{len(responses)} response json(s)) resulted in a empty arrow table")
+    return table
+
+
+def pi_events_to_table(
+    pi_events: Union[List[Dict], Dict[str, list]],
+    missing_value: float,
+    drop_missing_values: bool,
+    flag_threshold: int,
+    only_value_and_flag: bool,
+    tz_offset: float = None,
+) -> "pa.Table":
+    """The arrow version of Events.from_pi_events. Values are always float64 (pandas makes int64 of whole numbers), so
+    that all tables have the same schema."""
+    pa = import_pyarrow()
+    pi_event_columns = pi_events if isinstance(pi_events, dict) else _to_pi_event_columns(pi_events=pi_events)
+    nr_events = len(next(iter(pi_event_columns.values()), []))
+    data = {
+        col_datetime: _to_timestamps(pi_event_columns=pi_event_columns, tz_offset=tz_offset),
+        col_value: _to_typed_array(
+            values=pi_event_columns.get(col_value, None), size=nr_events, arrow_type=pa.float64()
+        ),
+        col_flag: _to_typed_array(values=pi_event_columns.get(col_flag, None), size=nr_events, arrow_type=pa.int64()),
+    }
+    if not only_value_and_flag:
+        for key, values in pi_event_columns.items():
+            if key not in data:
+                data[key] = pa.array(values)
+    table = pa.table(data)
+
+    mask = None
+    if drop_missing_values and missing_value is not None:
+        # as in pandas, a value that is not there (null) is not a missing value
+        values = table[col_value]
+        mask = pa.compute.or_kleene(pa.compute.is_null(values), pa.compute.not_equal(values, missing_value))
+    if flag_threshold:
+        # only values with a flag < flag_threshold. Rows without a flag (null) are dropped
+        flag_mask = pa.compute.less(table[col_flag], flag_threshold)
+        mask = flag_mask if mask is None else pa.compute.and_kleene(mask, flag_mask)
+    return table if mask is None else table.filter(mask)
+
+
+def _to_pi_event_columns(pi_events: List[Dict]) -> Dict[str, list]:
+    """One list per event key (nested data, e.g. flagSourceColumn, is flattened). Keys in order of appearance, an event
+    without a key gets None."""
+    pi_events = Events.ensure_flattened_pi_events(pi_events)
+    keys = {}
+    for pi_event in pi_events:
+        keys.update(dict.fromkeys(pi_event))
+    return {key: [pi_event.get(key, None) for pi_event in pi_events] for key in keys}
+
+
+def _to_typed_array(values: list, size: int, arrow_type: "pa.DataType") -> "pa.Array":
+    """E.g. ['0.1', '-999.0'] (PI_XML and PI_JSON) or [0.1, -999.0] (streamed PI_JSON) to float64."""
+    pa = import_pyarrow()
+    if values is None:
+        return pa.nulls(size, type=arrow_type)
+    array = pa.array(values)
+    if pa.types.is_string(array.type) and pa.types.is_integer(arrow_type):
+        # e.g. flag '0.0', as pd.to_numeric would
+        array = array.cast(pa.float64())
+    return array.cast(arrow_type)
+
+
+def _to_timestamps(pi_event_columns: Dict[str, list], tz_offset: float = None) -> "pa.Array":
+    """FEWS PI event 'date' + ' ' + 'time' to timestamp[s] in utc."""
+    pa = import_pyarrow()
+    date_times = pa.compute.binary_join_element_wise(
+        pa.array(pi_event_columns["date"], type=pa.string()), pa.array(pi_event_columns["time"], type=pa.string()), " "
+    )
+    try:
+        timestamps = pa.compute.strptime(date_times, format=Events.datetime_format, unit="s")
+    except pa.ArrowInvalid:
+        # another format (e.g. without seconds), rare so parse per event
+        timestamps = pa.array(
+            [None if x is None else datetime.fromisoformat(x) for x in date_times.to_pylist()], type=pa.timestamp("s")
+        )
+    if tz_offset:
+        timestamps = pa.compute.subtract(timestamps, pa.scalar(timedelta(hours=tz_offset), type=pa.duration("s")))
+    return timestamps
+
+
+def _repeat_dictionary(value: str, size: int) -> "pa.DictionaryArray":
+    """One value for all rows: an index per row and the string only once."""
+    pa = import_pyarrow()
+    indices = pa.repeat(pa.scalar(0, type=pa.int32()), size)
+    return pa.DictionaryArray.from_arrays(indices=indices, dictionary=pa.array([value], type=pa.string()))
+
+
+def df_to_table(df: pd.DataFrame) -> "pa.Table":
+    """A time-series dataframe (e.g. from the SeriesStore) to the same table as response_jsons_to_one_table."""
+    pa = import_pyarrow()
+    if df.empty:
+        return get_time_series_schema().empty_table()
+    table = pa.Table.from_pandas(df=df.reset_index(), preserve_index=False)
+    schema = get_time_series_schema()
+    for name, arrow_type in zip(schema.names, schema.types):
+        index = table.schema.get_field_index(name)
+        if index != -1 and table.schema.field(index).type != arrow_type:
+            table = table.set_column(index, name, table[name].cast(arrow_type))
+    return table
+
+
+def records_to_table(records: List[Dict]) -> "pa.Table":
+    """FEWS metadata (e.g. the 'locations' of /locations) to a pyarrow table with snake_case columns. Nested data
+    (e.g. location attributes) become struct or list columns."""
+    pa = import_pyarrow()
+    table = pa.Table.from_pylist(records)
+    return table.rename_columns([camel_to_snake_case(x) for x in table.column_names])
+
+
+def write_table(table: "pa.Table", file_path: Path) -> None:
+    """Write an Arrow IPC file (Feather v2). Uncompressed, so that it can be memory-mapped, e.g.
+    pyarrow.feather.read_table(file_path, memory_map=True), duckdb or polars.read_ipc(file_path)."""
+    pa = import_pyarrow()
+    pa.feather.write_feather(df=table, dest=file_path.as_posix(), compression="uncompressed")
@@ -5,13 +5,20 @@ from dataclasses import field
 from datetime import datetime
 from hdsr_fewspy.constants import choices
 from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.converters.json_stream import stream_pi_time_series
 from hdsr_fewspy.converters.utils import camel_to_snake_case
 from hdsr_fewspy.converters.utils import dict_to_datetime
+from hdsr_fewspy.converters.xml_stream import is_xml_response
+from hdsr_fewspy.converters.xml_stream import stream_pi_xml_time_series
 from typing import Dict
 from typing import List
+from typing import Optional
 from typing import Tuple
+from typing import Union
 
 import logging
+import numpy as np
+import operator
 import pandas as pd
 
 
@@ -21,6 +28,12 @@ col_value = choices.TimeSeriesEventColumns.value.value
 col_flag = choices.TimeSeriesEventColumns.flag.value
 col_datetime = choices.TimeSeriesEventColumns.datetime.value
 
+_pi_event_keys = ("date", "time", col_value, col_flag)
+
+# float32 keeps (at least) 6 significant digits, see to_compact_dtypes
+_float32_significant_digits = 6
+_is_pandas_2 = int(pd.__version__.split(".")[0]) >= 2  # non-nanosecond datetimes (e.g. datetime64[s])
+
 
 @dataclass
 class Header:
@@ -68,6 +81,8 @@ class Header:
 class Events(pd.DataFrame):
     """FEWS-PI events in pandas DataFrame"""
 
+    datetime_format = "%Y-%m-%d %H:%M:%S"  # FEWS PI event 'date' + ' ' + 'time'
+
     @classmethod
     def ensure_flattened_pi_events(cls, pi_events: list) -> List[Dict]:
         """
@@ -100,6 +115,100 @@ class Events(pd.DataFrame):
 
     @classmethod
     def from_pi_events(
+        cls,
+        pi_events: Union[List[Dict], Dict[str, list]],
+        missing_value: float,
+        drop_missing_values: bool,
+        flag_threshold: int,
+        only_value_and_flag: bool,
+        tz_offset: float = None,
+    ) -> Events:
+        """Parse Events from FEWS PI events dict. pi_events is a list of events, or one list per event key (streamed
+        response, see json_stream.stream_pi_time_series)."""
+        if only_value_and_flag:
+            pi_event_columns = pi_events if isinstance(pi_events, dict) else cls._to_pi_event_columns(pi_events)
+            df = cls._from_pi_event_columns(
+                pi_event_columns=pi_event_columns,
+                missing_value=missing_value,
+                drop_missing_values=drop_missing_values,
+                flag_threshold=flag_threshold,
+                tz_offset=tz_offset,
+            )
+            if df is not None:
+                return df
+        if isinstance(pi_events, dict):
+            pi_events = [dict(zip(pi_events.keys(), row)) for row in zip(*pi_events.values())]
+        return cls._from_pi_events_records(
+            pi_events=pi_events,
+            missing_value=missing_value,
+            drop_missing_values=drop_missing_values,
+            flag_threshold=flag_threshold,
+            only_value_and_flag=only_value_and_flag,
+            tz_offset=tz_offset,
+        )
+
+    @staticmethod
+    def _to_pi_event_columns(pi_events: List[Dict]) -> Optional[Dict[str, list]]:
+        """Date, time, value and flag of all events as one list per key (C-level map, no python loop per event). In
+        key order of the first event. Returns None if an event misses one of these keys."""
+        if not pi_events:
+            return None
+        keys = [x for x in pi_events[0].keys() if x in _pi_event_keys]
+        try:
+            return {key: list(map(operator.itemgetter(key), pi_events)) for key in keys}
+        except KeyError:
+            return None
+
+    @classmethod
+    def _from_pi_event_columns(
+        cls,
+        pi_event_columns: Optional[Dict[str, list]],
+        missing_value: float,
+        drop_missing_values: bool,
+        flag_threshold: int,
+        tz_offset: float = None,
+    ) -> Optional[Events]:
+        """Fast path of from_pi_events for only_value_and_flag: parse each column at once: datetimes with an explicit
+        format (no format inference and no timedelta per row), values and flags with numpy.
+
+        Returns None if the events do not fit this path (e.g. no flag, or another date/time format), then we use
+        _from_pi_events_records, so that the result is always the same.
+        """
+        if not pi_event_columns or any(key not in pi_event_columns for key in _pi_event_keys):
+            return None
+        try:
+            date_times = list(map(" ".join, zip(pi_event_columns["date"], pi_event_columns["time"])))
+            datetime_index = pd.DatetimeIndex(
+                data=pd.to_datetime(date_times, format=cls.datetime_format), name=col_datetime
+            )
+            values = cls._to_numeric_values(values=pi_event_columns[col_value])
+            flags = np.array(pi_event_columns[col_flag], dtype=np.int64)
+        except (TypeError, ValueError):
+            return None
+        if tz_offset is not None:
+            datetime_index = datetime_index - pd.Timedelta(hours=tz_offset)
+
+        # same column order as _from_pi_events_records (the key order of the events)
+        data = {col_value: values, col_flag: flags}
+        columns = [x for x in pi_event_columns.keys() if x in data]
+        df = Events(data={column: data[column] for column in columns}, index=datetime_index)
+        if drop_missing_values:
+            df = df.loc[df[col_value] != missing_value]
+        if flag_threshold:
+            df = df.loc[df[col_flag] < flag_threshold]
+        return df
+
+    @staticmethod
+    def _to_numeric_values(values: list) -> np.ndarray:
+        """Same result as pd.to_numeric(values), but parsed by numpy. pd.to_numeric returns int64 if all values are
+        integer strings, so if all values are whole numbers we let pd.to_numeric decide (rare, e.g. counts)."""
+        float_values = np.array(values, dtype=np.float64)
+        if np.all(np.mod(float_values, 1) == 0):
+            return pd.to_numeric(np.array(values, dtype=object))
+        return float_values
+
+    @classmethod
+    def _from_pi_events_records(
         cls,
         pi_events: list,
         missing_value: float,
@@ -108,7 +217,6 @@ class Events(pd.DataFrame):
         only_value_and_flag: bool,
         tz_offset: float = None,
     ) -> Events:
-        """Parse Events from FEWS PI events dict."""
         pi_events = cls.ensure_flattened_pi_events(pi_events)
 
         # convert list with dicts to dataframe. All dicts keys, also unexpected, will be a df column
@@ -237,27 +345,115 @@ class TimeSeriesSet:
         return list(set(flat_list))
 
 
+def response_to_pi_time_series(response: ResponseType, only_value_and_flag: bool) -> Dict:
+    """The json of a time-series response. With only_value_and_flag (and ijson installed), it is streamed: the events
+    are parsed into one list per key, without a dict per event (see json_stream.stream_pi_time_series). A PI_XML
+    response is always parsed like that (see xml_stream.stream_pi_xml_time_series)."""
+    if is_xml_response(response=response):
+        return stream_pi_xml_time_series(response=response)
+    if only_value_and_flag:
+        pi_time_series = stream_pi_time_series(response=response)
+        if pi_time_series is not None:
+            return pi_time_series
+    return response.json()
+
+
 def response_jsons_to_one_df(
     responses: List[ResponseType], drop_missing_values: bool, flag_threshold: int, only_value_and_flag: bool
 ) -> pd.DataFrame:
-    df = pd.DataFrame(data=None)
-    for index, response in enumerate(responses):
-        data = response.json()
+    # collect the events of all responses and concat once: a concat per response copies all previous rows again
+    all_events = []
+    location_ids = set()
+    parameter_ids = set()
+    for response in responses:
         time_series_set = TimeSeriesSet.from_pi_time_series(
-            pi_time_series=data,
+            pi_time_series=response_to_pi_time_series(response=response, only_value_and_flag=only_value_and_flag),
             drop_missing_values=drop_missing_values,
             flag_threshold=flag_threshold,
             only_value_and_flag=only_value_and_flag,
         )
-        for time_series in time_series_set.time_series:
-            new_df = time_series.events
-            new_df["location_id"] = time_series_set.location_ids[0]
-            new_df["parameter_id"] = time_series_set.parameter_ids[0]
-            df = pd.concat(objs=[df, new_df], axis=0)
+        if not time_series_set.time_series:
+            continue
+        location_ids.add(time_series_set.location_ids[0])
+        parameter_ids.add(time_series_set.parameter_ids[0])
+        all_events.extend([time_series.events for time_series in time_series_set.time_series])
+    if not all_events:
+        logger.warning(f"{len(responses)} response json(s)) resulted in a empty pandas dataframe")
+        return pd.DataFrame(data=None)
+    df = pd.concat(objs=all_events, axis=0)
     if df.empty:
         logger.warning(f"{len(responses)} response json(s)) resulted in a empty pandas dataframe")
     else:
-        is_unique_locations = len(df["location_id"].unique()) == 1
-        is_unique_parameters = len(df["parameter_id"].unique()) == 1
+        is_unique_locations = len(location_ids) == 1
+        is_unique_parameters = len(parameter_ids) == 1
         assert is_unique_locations and is_unique_parameters, "code error response_jsons_to_one_df: 2"
+    # one column (of one value) for the whole dataframe instead of one per time-series
+    df["location_id"] = location_ids.pop()
+    df["parameter_id"] = parameter_ids.pop()
     return df
+
+
+def to_compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """A time-series dataframe (e.g. from response_jsons_to_one_df) with less memory per row:
+        - value: float32 if all values have max 6 significant digits (e.g. 0.123456 or 1234.56), otherwise float64
+        - flag: int8 (FEWS flags are 0-9)
+        - location_id, parameter_id (and other text columns): category, instead of a python string per row
+        - datetime index: datetime64[s] (FEWS times are in whole seconds, needs pandas >= 2)
+    A float32 value is not exactly the float64 of the same decimal (0.1 becomes 0.10000000149011612), so compare
+    values with a tolerance (or round them to 6 significant digits).
+
+    Only used for the in-memory dataframe of get_time_series_single (request setting compact_dtypes). Files of
+    get_time_series_multi are not affected: csv is text anyway and float32 would only add digits like the ones above.
+    """
+    if df.empty:
+        return df
+    df = df.copy(deep=False)
+    if col_value in df.columns and df[col_value].dtype == np.float64 and _fits_float32(values=df[col_value].values):
+        df[col_value] = df[col_value].astype(np.float32)
+    flags = df[col_flag] if col_flag in df.columns else None
+    if flags is not None and pd.api.types.is_integer_dtype(flags) and flags.between(-128, 127).all():
+        df[col_flag] = flags.astype(np.int8)
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].astype("category")
+    if _is_pandas_2 and isinstance(df.index, pd.DatetimeIndex) and df.index.tz is None:
+        df.index = df.index.astype("datetime64[s]")
+    return df
+
+
+def _fits_float32(values: np.ndarray) -> bool:
+    """Whether all (finite) values have max 6 significant digits and are within the float32 range, so that the float32
+    value rounds back to the same decimal."""
+    values = values[np.isfinite(values) & (values != 0)]
+    if not len(values):
+        return True
+    if np.abs(values).max() > np.finfo(np.float32).max / 10 or np.abs(values).min() < np.finfo(np.float32).tiny:
+        return False
+    decimals = _float32_significant_digits - 1 - np.floor(np.log10(np.abs(values)))
+    scale = np.power(10.0, decimals)
+    return bool(np.all(np.isclose(np.round(values * scale) / scale, values, rtol=1e-12, atol=0)))
+
+
+def response_jsons_to_events(responses: List[ResponseType]) -> Tuple[pd.DataFrame, Optional[float]]:
+    """All events (value and flag, no filter) of the responses of one time-series, and the missing value of it.
+
+    Returns an empty dataframe (datetime index, columns value and flag) and None if no time-series in responses.
+    """
+    all_events = []
+    missing_value = None
+    for response in responses:
+        time_series_set = TimeSeriesSet.from_pi_time_series(
+            pi_time_series=response_to_pi_time_series(response=response, only_value_and_flag=True),
+            drop_missing_values=False,
+            flag_threshold=None,
+            only_value_and_flag=True,
+        )
+        for time_series in time_series_set.time_series:
+            missing_value = time_series.header.miss_val
+            all_events.append(time_series.events)
+    dtypes = {col_value: "float64", col_flag: "int64"}
+    if not all_events:
+        empty_events = pd.DataFrame(columns=list(dtypes.keys()), index=pd.DatetimeIndex([], name=col_datetime))
+        return empty_events.astype(dtypes), missing_value
+    events = pd.concat(objs=all_events, axis=0)[list(dtypes.keys())]
+    return events.astype(dtypes), missing_value
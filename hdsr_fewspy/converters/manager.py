@@ -1,5 +1,6 @@
 from hdsr_fewspy.constants.choices import OutputChoices
 from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.converters.download import ArrowDownloadDir
 from hdsr_fewspy.converters.download import CsvDownloadDir
 from hdsr_fewspy.converters.download import JsonDownloadDir
 from hdsr_fewspy.converters.download import XmlDownloadDir
@@ -7,6 +8,7 @@ from pathlib import Path
 from typing import List
 
 import logging
+import pandas as pd
 
 
 logger = logging.getLogger(__name__)
@@ -28,6 +30,8 @@ class ResponseManager:
             return JsonDownloadDir(request_class=self.request_class, output_dir=self.output_dir)
         elif self.output_choice == OutputChoices.csv_file_in_download_dir:
             return CsvDownloadDir(request_class=self.request_class, output_dir=self.output_dir)
+        elif self.output_choice == OutputChoices.arrow_file_in_download_dir:
+            return ArrowDownloadDir(request_class=self.request_class, output_dir=self.output_dir)
         else:
             logger.debug(f"memory choice {self.output_choice} must be handled in GetRequest.run() itself")
             return None
@@ -40,3 +44,12 @@ class ResponseManager:
 
         response_handler = self._get_response_handler()
         return response_handler.run(responses=responses, **kwargs)
+
+    def run_df(self, df: pd.DataFrame, file_name_values: List[str]) -> List[Path]:
+        """Write a time-series dataframe that is not (directly) from responses, e.g. from the SeriesStore."""
+        assert self.output_choice in {
+            OutputChoices.csv_file_in_download_dir,
+            OutputChoices.arrow_file_in_download_dir,
+        }, "code error: run_df only writes csv or arrow"
+        response_handler = self._get_response_handler()
+        return response_handler.run_df(df=df, file_name_values=file_name_values)
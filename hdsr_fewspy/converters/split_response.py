@@ -0,0 +1,80 @@
+from hdsr_fewspy.constants.choices import PiRestDocumentFormatChoices
+from hdsr_fewspy.constants.custom_types import ResponseType
+from hdsr_fewspy.converters.utils import create_response
+from typing import Dict
+from typing import List
+
+import json
+import re
+
+
+XML_SERIES_PATTERN = re.compile(r"<series>.*?</series>\s*", flags=re.DOTALL)
+XML_LOCATION_ID_PATTERN = re.compile(r"<locationId>(.*?)</locationId>")
+
+
+def split_time_series_response_per_location(
+    response: ResponseType, document_format: PiRestDocumentFormatChoices
+) -> Dict[str, ResponseType]:
+    """Split a time-series response with >1 locationIds into one response per locationId.
+
+    Each new response looks like the response of a request with only that locationId, so it can be handled (written
+    to file, converted to a dataframe) exactly the same way.
+
+    Example:
+        a response with time-series ['OW433001 H.G.0', 'OW433002 H.G.0'] results in
+        {'OW433001': <Response [200]>, 'OW433002': <Response [200]>}
+    """
+    if document_format == PiRestDocumentFormatChoices.json:
+        return _split_json_response(response=response)
+    elif document_format == PiRestDocumentFormatChoices.xml:
+        return _split_xml_response(response=response)
+    raise NotImplementedError(f"invalid document_format {document_format}")
+
+
+def _split_json_response(response: ResponseType) -> Dict[str, ResponseType]:
+    response_json = response.json()
+    time_series_per_location: Dict[str, List[Dict]] = {}
+    for time_series in response_json.get("timeSeries", []):
+        location_id = time_series["header"]["locationId"]
+        time_series_per_location.setdefault(location_id, []).append(time_series)
+
+    response_per_location = {}
+    for location_id, time_series in time_series_per_location.items():
+        new_json = {key: value for key, value in response_json.items() if key != "timeSeries"}
+        new_json["timeSeries"] = time_series
+        response_per_location[location_id] = _create_split_response(
+            response=response, content=json.dumps(new_json).encode("utf-8")
+        )
+    return response_per_location
+
+
+def _split_xml_response(response: ResponseType) -> Dict[str, ResponseType]:
+    text = response.text
+    matches = list(XML_SERIES_PATTERN.finditer(text))
+    if not matches:
+        return {}
+    prefix = text[: matches[0].start()]
+    suffix = text[matches[-1].end() :]  # noqa
+
+    series_per_location: Dict[str, List[str]] = {}
+    for match in matches:
+        series = match.group(0)
+        location_id = XML_LOCATION_ID_PATTERN.search(series).group(1)
+        series_per_location.setdefault(location_id, []).append(series)
+
+    response_per_location = {}
+    for location_id, series in series_per_location.items():
+        new_text = prefix + "".join(series) + suffix
+        response_per_location[location_id] = _create_split_response(response=response, content=new_text.encode("utf-8"))
+    return response_per_location
+
+
+def _create_split_response(response: ResponseType, content: bytes) -> ResponseType:
+    return create_response(
+        status_code=response.status_code,
+        content=content,
+        url=response.url,
+        headers={key: value for key, value in response.headers.items() if key.lower() != "content-length"},
+        encoding="utf-8",
+        reason=response.reason,
+    )
@@ -1,9 +1,18 @@
 from datetime import datetime
+from datetime import timedelta
 from hdsr_fewspy.constants.choices import TimeZoneChoices
-from shapely.geometry import Point
+from requests.structures import CaseInsensitiveDict
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import TYPE_CHECKING
 
 import numpy as np
+import requests
+
+
+if TYPE_CHECKING:
+    from shapely.geometry import Point
 
 
 GEODATUM_MAPPING = {
@@ -24,6 +33,14 @@ GEODATUM_MAPPING = {
     "SVY21": "epsg:3414",
 }
 
+TIME_STEP_UNIT_SECONDS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+    "week": 604800,
+}
+
 
 def camel_to_snake_case(camel_case: str) -> str:
     """Convert camelCase to snake_case."""
@@ -48,6 +65,24 @@ def dict_to_datetime(data: dict) -> datetime:
     return date_time
 
 
+def time_step_to_timedelta(time_step: Optional[dict]) -> Optional[timedelta]:
+    """Convert a FEWS PI timeStep dict to timedelta object.
+    Args:
+        time_step (dict): FEWS PI timeStep (e.g. {'unit': 'second', 'multiplier': '900'})
+    Returns:
+        timedelta: Converted timedelta object (in example datetime.timedelta(seconds=900)). None for nonequidistant
+        time-series or units without a fixed length (e.g. month).
+    """
+    if not time_step:
+        return None
+    unit = time_step.get("unit", None)
+    if unit not in TIME_STEP_UNIT_SECONDS:
+        return None
+    multiplier = int(time_step.get("multiplier", 1))
+    divider = int(time_step.get("divider", 1))
+    return timedelta(seconds=TIME_STEP_UNIT_SECONDS[unit] * multiplier / divider)
+
+
 def datetime_to_fews_date_str(date_time: datetime) -> str:
     """Convert a FEWS PI datetime to datetime str e.g. 2022-05-01T00:00:00Z."""
     try:
@@ -68,7 +103,9 @@ def fews_date_str_to_datetime(fews_date_str: str) -> datetime:
         raise AssertionError(msg)
 
 
-def xy_array_to_point(xy_array: np.ndarray) -> List[Point]:
+def xy_array_to_point(xy_array: np.ndarray) -> List["Point"]:
+    from shapely.geometry import Point  # slow to import, so only when used
+
     return [Point(i.astype(float)) for i in xy_array]
 
 
@@ -87,3 +124,22 @@ def geo_datum_to_crs(geo_datum: str) -> str:
     else:
         crs = ""
     return crs
+
+
+def create_response(
+    status_code: int,
+    content: bytes,
+    url: str,
+    headers: Optional[Dict] = None,
+    encoding: Optional[str] = None,
+    reason: str = "",
+) -> requests.Response:
+    """Create a requests.Response so that responses not made by requests (e.g. httpx) can be handled the same way."""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.url = url
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.encoding = encoding
+    response.reason = reason
+    return response
@@ -0,0 +1,111 @@
+from hdsr_fewspy.constants.custom_types import ResponseType
+from typing import Dict
+from typing import Iterator
+from typing import List
+from xml.etree import ElementTree
+
+import io
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+# header elements that can occur more than once (a list in PI_JSON)
+_list_header_keys = ("qualifierId",)
+
+
+def is_xml_response(response: ResponseType) -> bool:
+    return response.content[:100].lstrip()[:1] == b"<"
+
+
+def _get_local_name(tag: str) -> str:
+    """E.g. '{http://www.wldelft.nl/fews/PI}event' returns 'event'."""
+    return tag[tag.rfind("}") + 1 :]  # noqa
+
+
+def stream_pi_xml_time_series(response: ResponseType) -> Dict:
+    """Parse a PI_XML /timeseries response into the same structure as stream_pi_time_series (PI_JSON), so that all
+    time-series converters (e.g. response_jsons_to_one_df) work for both formats.
+
+    The body is parsed incrementally (xml.etree.ElementTree.iterparse). The header fields are taken as in PI_JSON
+    (text, or the attributes, e.g. startDate {'date': .., 'time': ..}). The attributes of each <event> are put straight
+    into one list per attribute and each element is removed once parsed. So memory does not grow with a tree of
+    elements, only with these lists. An event without an attribute that other events have (e.g. flagSource) gets None.
+    """
+    result = {"timeSeries": []}
+    root = None
+    series = None
+    columns: Dict[str, list] = {}
+    nr_events = 0
+    header = None
+    for event, element in ElementTree.iterparse(io.BytesIO(response.content), events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+                result["version"] = element.get("version", None)
+            elif _get_local_name(tag=element.tag) == "series":
+                series = element
+            continue
+        tag = _get_local_name(tag=element.tag)
+        if tag == "event":
+            nr_events = _add_event(attributes=element.attrib, columns=columns, nr_events=nr_events)
+            # remove the event (and the parsed header) from the tree, so that it does not grow
+            series.clear()
+        elif tag == "header":
+            header = _header_to_dict(element=element)
+        elif tag == "series":
+            time_series = {"header": header}
+            if nr_events:
+                time_series["events"] = columns
+            result["timeSeries"].append(time_series)
+            columns, nr_events, header = {}, 0, None
+            root.clear()
+        elif tag == "timeZone":
+            result["timeZone"] = element.text
+    return result
+
+
+def iter_pi_xml_headers(response: ResponseType, chunk_size: int = 2**16) -> Iterator[Dict]:
+    """The header (as in PI_JSON) of each series in a PI_XML /timeseries response, without parsing the events. The
+    body is fed to the parser per chunk, so it stops as soon as the caller stops iterating."""
+    parser = ElementTree.XMLPullParser(events=("end",))
+    content = response.content
+    for index in range(0, len(content), chunk_size):
+        parser.feed(content[index : index + chunk_size])  # noqa
+        for _, element in parser.read_events():
+            tag = _get_local_name(tag=element.tag)
+            if tag == "header":
+                yield _header_to_dict(element=element)
+            elif tag == "series" or tag == "event":
+                element.clear()
+    parser.close()
+
+
+def _add_event(attributes: Dict[str, str], columns: Dict[str, list], nr_events: int) -> int:
+    """Append the attributes of one event to columns. Returns the new number of events."""
+    for key, value in attributes.items():
+        column = columns.get(key, None)
+        if column is None:
+            column = columns[key] = [None] * nr_events
+        column.append(value)
+    nr_events += 1
+    if len(attributes) != len(columns):
+        for column in columns.values():
+            if len(column) < nr_events:
+                column.append(None)
+    return nr_events
+
+
+def _header_to_dict(element: ElementTree.Element) -> Dict:
+    """E.g. <header><locationId>OW433001</locationId><startDate date="2012-01-01" time="00:00:00"/></header> returns
+    {'locationId': 'OW433001', 'startDate': {'date': '2012-01-01', 'time': '00:00:00'}}, just like PI_JSON."""
+    header = {}
+    for child in element:
+        key = _get_local_name(tag=child.tag)
+        value = dict(child.attrib) if child.attrib else child.text
+        if key in _list_header_keys:
+            values: List = header.setdefault(key, [])
+            values.append(value)
+        else:
+            header[key] = value
+    return header
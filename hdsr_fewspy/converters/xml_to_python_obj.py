@@ -7,10 +7,12 @@ Author: Christian Stefanescu (http://0chris.com)
 License: MIT License - http://www.opensource.org/licenses/mit-license.php
 """
 
+from contextlib import contextmanager
 from typing import Any
 from xml.sax import handler
 from xml.sax import make_parser
 
+import gc
 import os
 
 
@@ -37,8 +39,25 @@ def _is_url(string):
         return False
 
 
+# xml name -> element name (a valid python attribute name), so that each xml name is normalised once per process
+_element_names = {}
+
+
+def _get_element_name(name: str) -> str:
+    element_name = _element_names.get(name, None)
+    if element_name is None:
+        element_name = _element_names[name] = name.replace("-", "_").replace(".", "_").replace(":", "_")
+    return element_name
+
+
 class Element(object):
-    """Representation of an XML element."""
+    """Representation of an XML element.
+
+    Children are indexed by name on the first lookup (attribute lookup does not scan all children). Cdata that comes in
+    more than one piece is collected in a list and joined once in end_cdata() (not quadratic for large text nodes).
+    """
+
+    __slots__ = ("_name", "_attributes", "children", "is_root", "cdata", "_cdata_parts", "_children_by_name")
 
     def __init__(self, name, attributes):
         self._name = name
@@ -46,14 +65,36 @@ class Element(object):
         self.children = []
         self.is_root = False
         self.cdata = ""
+        self._cdata_parts = None  # a list once a second piece of cdata is added
+        self._children_by_name = None  # created on the first lookup by name
 
     def add_child(self, element):
         """Store child elements."""
         self.children.append(element)
+        if self._children_by_name is not None:
+            self._children_by_name.setdefault(element._name, []).append(element)
 
     def add_cdata(self, cdata):
-        """Store cdata."""
-        self.cdata = self.cdata + cdata
+        """Store cdata. If the element already has cdata, it is added to self.cdata in end_cdata()."""
+        if self._cdata_parts is not None:
+            self._cdata_parts.append(cdata)
+        elif self.cdata:
+            self._cdata_parts = [self.cdata, cdata]
+        else:
+            self.cdata = cdata
+
+    def end_cdata(self):
+        """Join the stored cdata, e.g. when the end of the element is parsed."""
+        if self._cdata_parts is not None:
+            self.cdata = "".join(self._cdata_parts)
+            self._cdata_parts = None
+
+    def _get_children_by_name(self):
+        if self._children_by_name is None:
+            self._children_by_name = {}
+            for child in self.children:
+                self._children_by_name.setdefault(child._name, []).append(child)
+        return self._children_by_name
 
     def get_attribute(self, key):
         """Get attributes by key."""
@@ -61,27 +102,22 @@ class Element(object):
 
     def get_elements(self, name=None):
         """Find a child element by name."""
-        return [e for e in self.children if e._name == name] if name else self.children
+        return list(self._get_children_by_name().get(name, [])) if name else self.children
 
     def __getitem__(self, key):
         return self.get_attribute(key)
 
     def __getattr__(self, key):
-        matching_children = [x for x in self.children if x._name == key]
-        if matching_children:
-            if len(matching_children) == 1:
-                self.__dict__[key] = matching_children[0]
-                return matching_children[0]
-            else:
-                self.__dict__[key] = matching_children
-                return matching_children
-        else:
+        # only called if key is not a slot, or a slot that is not set yet (e.g. during copy/pickle)
+        if key in Element.__slots__:
+            raise AttributeError(key)
+        matching_children = self._get_children_by_name().get(key, None)
+        if not matching_children:
             raise AttributeError("'%s' has no attribute '%s'" % (self._name, key))
+        return matching_children[0] if len(matching_children) == 1 else matching_children
 
     def __hasattribute__(self, name):
-        if name in self.__dict__:
-            return True
-        return any(x._name == name for x in self.children)
+        return name in self._get_children_by_name()
 
     def __iter__(self):
         yield self
@@ -114,29 +150,34 @@ class Handler(handler.ContentHandler):
     def __init__(self):
         self.root = Element(None, None)
         self.root.is_root = True
-        self.elements = []
+        self.elements = [self.root]
 
     def startElement(self, name, attributes):
-        name = name.replace("-", "_")
-        name = name.replace(".", "_")
-        name = name.replace(":", "_")
-        attrs = dict()
-        for k, v in attributes.items():
-            attrs[k] = v
-        element = Element(name, attrs)
-        if len(self.elements) > 0:
-            self.elements[-1].add_child(element)
-        else:
-            self.root.add_child(element)
+        element_name = _element_names.get(name, None) or _get_element_name(name=name)
+        element = Element(element_name, dict(attributes.items()))
+        self.elements[-1].add_child(element)
         self.elements.append(element)
 
     def endElement(self, name):
-        self.elements.pop()
+        self.elements.pop().end_cdata()
 
     def characters(self, cdata):
         self.elements[-1].add_cdata(cdata)
 
 
+@contextmanager
+def _gc_paused():
+    """Pause the cyclic garbage collector while building the tree. The tree has no reference cycles, but all the new
+    Elements trigger many (slow) collections, which is almost half of the parse time of a large xml."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
 def parse(filename, **parser_features):
     """Interprets the given string as a filename, URL or XML data string, parses it and returns a Python object which
     represents the given document.
@@ -157,10 +198,11 @@ def parse(filename, **parser_features):
         parser.setFeature(getattr(handler, feature), value)
     sax_handler = Handler()
     parser.setContentHandler(sax_handler)
-    if _is_string(filename) and (os.path.exists(filename) or _is_url(filename)):
-        parser.parse(filename)
-    else:
-        parser.parse(filename) if hasattr(filename, "read") else parser.parse(StringIO(filename))
+    with _gc_paused():
+        if _is_string(filename) and (os.path.exists(filename) or _is_url(filename)):
+            parser.parse(filename)
+        else:
+            parser.parse(filename) if hasattr(filename, "read") else parser.parse(StringIO(filename))
     return sax_handler.root
 
 
@@ -175,5 +217,6 @@ def _parse_raw(xml):
     parser = make_parser()
     sax_handler = Handler()
     parser.setContentHandler(sax_handler)
-    parser.parse(StringIO(xml))
+    with _gc_paused():
+        parser.parse(StringIO(xml))
     return sax_handler.root
@@ -1,5 +1,6 @@
 from hdsr_fewspy.constants.request_settings import RequestSettings
 from typing import List
+from typing import Optional
 from typing import Tuple
 
 import logging
@@ -10,6 +11,8 @@ logger = logging.getLogger(__name__)
 
 
 class DateFrequencyBuilder:
+    planned_fill_ratio = 0.75  # create_planned_date_ranges aims for 75% of max_request_nr_timestamps per date range
+
     @classmethod
     def create_date_ranges_and_frequency_used(
         cls, startdate_obj: pd.Timestamp, enddate_obj: pd.Timestamp, frequency: pd.Timedelta
@@ -45,6 +48,107 @@ class DateFrequencyBuilder:
                 logger.debug("no more dates left over")
         return date_range_tuples, frequency_used
 
+    @classmethod
+    def create_planned_date_ranges(
+        cls,
+        startdate_obj: pd.Timestamp,
+        enddate_obj: pd.Timestamp,
+        nr_timestamps: Optional[int],
+        first_value_time: Optional[pd.Timestamp],
+        last_value_time: Optional[pd.Timestamp],
+        request_settings: RequestSettings,
+        time_step: Optional[pd.Timedelta] = None,
+    ) -> Optional[Tuple[List[Tuple[pd.Timestamp, pd.Timestamp]], pd.Timedelta]]:
+        """Create all date ranges at once from the statistics (valueCount, firstValueTime, lastValueTime) of the
+        whole period, so that no probing per date range is needed.
+
+        For equidistant time-series (time_step is known) the date ranges are exact: each date range has at most
+        max_request_nr_timestamps timestamps, also if valueCount is unknown.
+
+        For nonequidistant time-series we assume the timestamps are evenly spread between first_value_time and
+        last_value_time and aim for planned_fill_ratio * max_request_nr_timestamps per date range (some margin for
+        gaps). Returns None if the statistics are not sufficient to plan anything (then probe per date range).
+
+        The first date range starts at startdate_obj and the last one ends at enddate_obj, so the whole period is still
+        covered.
+
+        Example:
+            startdate_obj = pd.Timestamp("2010-01-01"), enddate_obj = pd.Timestamp("2020-01-01")
+            nr_timestamps = 300000, first_value_time = pd.Timestamp("2014-01-01"), last_value_time = enddate_obj
+            request_settings.max_request_nr_timestamps = 100000
+            returns:
+                date_range_tuples = [
+                    (pd.Timestamp("2010-01-01 00:00:00"), pd.Timestamp("2015-07-02 18:00:00")),  # starts at startdate
+                    (pd.Timestamp("2015-07-02 18:00:00"), pd.Timestamp("2016-12-31 12:00:00")),
+                    (pd.Timestamp("2016-12-31 12:00:00"), pd.Timestamp("2018-07-02 06:00:00")),
+                    (pd.Timestamp("2018-07-02 06:00:00"), pd.Timestamp("2020-01-01 00:00:00")),
+                ]  # ~75000 timestamps per date range
+                frequency_used = pd.Timedelta("547 days 18:00:00")
+        """
+        first_value_time = (
+            startdate_obj if pd.isna(first_value_time) else max(pd.Timestamp(first_value_time), startdate_obj)
+        )
+        last_value_time = enddate_obj if pd.isna(last_value_time) else min(pd.Timestamp(last_value_time), enddate_obj)
+        value_period = last_value_time - first_value_time
+        is_equidistant = cls.is_equidistant(time_step=time_step)
+        if is_equidistant:
+            max_nr_timestamps = value_period // time_step + 1
+        elif nr_timestamps:
+            max_nr_timestamps = nr_timestamps
+        else:
+            return None
+
+        if max_nr_timestamps <= request_settings.max_request_nr_timestamps:
+            return [(startdate_obj, enddate_obj)], enddate_obj - startdate_obj
+        if value_period <= pd.Timedelta(seconds=1):
+            return None
+        if is_equidistant:
+            frequency = time_step * (request_settings.max_request_nr_timestamps - 1)
+        else:
+            target_nr_timestamps = max(
+                cls.planned_fill_ratio * request_settings.max_request_nr_timestamps,
+                request_settings.min_request_nr_timestamps,
+            )
+            frequency = value_period * (target_nr_timestamps / nr_timestamps)
+        # floor (not round) to whole seconds, so that an exact date range does not get larger
+        frequency = max(frequency.floor(pd.Timedelta(seconds=1)), pd.Timedelta(seconds=1))
+        date_range_tuples, frequency_used = cls.create_date_ranges_and_frequency_used(
+            startdate_obj=first_value_time, enddate_obj=last_value_time, frequency=frequency
+        )
+        date_range_tuples[0] = (startdate_obj, date_range_tuples[0][1])
+        date_range_tuples[-1] = (date_range_tuples[-1][0], enddate_obj)
+        logger.info(
+            f"planned {len(date_range_tuples)} date ranges of {frequency_used} for {max_nr_timestamps} timestamps"
+        )
+        return date_range_tuples, frequency_used
+
+    @staticmethod
+    def is_equidistant(time_step: Optional[pd.Timedelta]) -> bool:
+        return time_step is not None and not pd.isna(time_step) and time_step > pd.Timedelta(0)
+
+    @staticmethod
+    def bisect_date_range(
+        startdate_obj: pd.Timestamp, enddate_obj: pd.Timestamp, min_period: Optional[pd.Timedelta]
+    ) -> Optional[List[Tuple[pd.Timestamp, pd.Timestamp]]]:
+        """Split a date range in two halves (snapped to whole seconds). Returns None if the date range is not longer
+        than min_period (or min_period is None), so it should not be split any further.
+
+        Example:
+            startdate_obj = pd.Timestamp("2010-01-01"), enddate_obj = pd.Timestamp("2010-01-04")
+            min_period = pd.Timedelta(days=1)
+            returns:
+                date_range_tuples = [
+                    (pd.Timestamp("2010-01-01 00:00:00"), pd.Timestamp("2010-01-02 12:00:00")),
+                    (pd.Timestamp("2010-01-02 12:00:00"), pd.Timestamp("2010-01-04 00:00:00")),
+                ]
+        """
+        if min_period is None or enddate_obj - startdate_obj <= min_period:
+            return None
+        middle = startdate_obj + ((enddate_obj - startdate_obj) / 2).floor(pd.Timedelta(seconds=1))
+        if not startdate_obj < middle < enddate_obj:
+            return None
+        return [(startdate_obj, middle), (middle, enddate_obj)]
+
     @staticmethod
     def log_progress_download_ts(
         task: str, request_end: pd.Timestamp, ts_start: pd.Timestamp, ts_end: pd.Timestamp
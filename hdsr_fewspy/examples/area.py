@@ -24,96 +24,66 @@ def run_example_area():
     """
     setup_logging()
 
-    logger.info("start run_example_point")
+    logger.info("start run_example_area")
 
-    # bodemvocht
-    api = hdsr_fewspy.Api(
-        pi_settings=hdsr_fewspy.DefaultPiSettingsChoices.wis_production_area_soilmoisture,
-    )
-    df = api.get_time_series_single(
-        location_id="AFVG13",
-        parameter_id="SM.d",
-        qualifier_id="Lband05cm",  # ["Lband05cm", "Lband10cm", "Lband20cm"]
-        start_time=datetime(year=2020, month=1, day=1),
-        end_time=datetime(year=2023, month=1, day=1),
-        drop_missing_values=True,
-        output_choice=hdsr_fewspy.OutputChoices.pandas_dataframe_in_memory,
-    )
-    logger.info(
-        f"df wis_production_area_soilmoisture {len(df)} rows from {df.index.date.min()} till {df.index.date.max()}"
-    )
-
-    # neerslag wiwb (tot 2019)
-    api = hdsr_fewspy.Api(
-        pi_settings=hdsr_fewspy.DefaultPiSettingsChoices.wis_production_area_precipitation_wiwb,
-    )
-    df = api.get_time_series_single(
-        location_id="AFVG13",
-        parameter_id="Rh.h",
-        qualifier_id="wiwb_merge",  # choose from ["wiwb_merge"]
-        start_time=datetime(year=2020, month=1, day=1),
-        end_time=datetime(year=2023, month=1, day=1),
-        drop_missing_values=True,
-        output_choice=hdsr_fewspy.OutputChoices.pandas_dataframe_in_memory,
-    )
-    logger.info(
-        f"df wis_production_area_precipitation_wiwb {len(df)} rows from {df.index.date.min()} till "
-        f"{df.index.date.max()}"
-    )
-
-    # neerslag radarcorrection (vanaf 2019)
-    api = hdsr_fewspy.Api(
-        pi_settings=hdsr_fewspy.DefaultPiSettingsChoices.wis_production_area_precipitation_radarcorrection,
-    )
-    df = api.get_time_series_single(
+    # one client for all area datasets: one permission check, one connection pool and one rate limiter
+    multi_api = hdsr_fewspy.MultiApi()
+    choices = hdsr_fewspy.DefaultPiSettingsChoices
+    kwargs = dict(
         location_id="AFVG13",
-        parameter_id="Rh.h",
-        qualifier_id="mfbs_merge",  # choose from ["mfbs_merge"]
         start_time=datetime(year=2020, month=1, day=1),
         end_time=datetime(year=2023, month=1, day=1),
         drop_missing_values=True,
         output_choice=hdsr_fewspy.OutputChoices.pandas_dataframe_in_memory,
     )
-    logger.info(
-        f"df wis_production_area_precipitation_radarcorrection {len(df)} rows from {df.index.date.min()} "
-        f"till {df.index.date.max()}"
-    )
-
-    # verdamping wiwb satdata
-    api = hdsr_fewspy.Api(
-        pi_settings=hdsr_fewspy.DefaultPiSettingsChoices.wis_production_area_evaporation_wiwb_satdata,
-    )
-    df = api.get_time_series_single(
-        location_id="AFVG13",
-        parameter_id="Eact.d",
-        qualifier_id="RA",  # choose from ["RA", "satdata_merge", ""]
-        start_time=datetime(year=2020, month=1, day=1),
-        end_time=datetime(year=2023, month=1, day=1),
-        drop_missing_values=True,
-        output_choice=hdsr_fewspy.OutputChoices.pandas_dataframe_in_memory,
-    )
-    logger.info(
-        f"df wis_production_area_evaporation_wiwb_satdata {len(df)} rows from {df.index.date.min()} till "
-        f"{df.index.date.max()}"
-    )
-
-    # verdamping waterwatch
-    api = hdsr_fewspy.Api(
-        pi_settings=hdsr_fewspy.DefaultPiSettingsChoices.wis_production_area_evaporation_waterwatch,
-    )
-    df = api.get_time_series_single(
-        location_id="AFVG13",
-        parameter_id="Eact.d",
-        qualifier_id="",  # choose from [""]
-        start_time=datetime(year=2000, month=1, day=1),
-        end_time=datetime(year=2023, month=1, day=1),
-        drop_missing_values=True,
-        output_choice=hdsr_fewspy.OutputChoices.pandas_dataframe_in_memory,
-    )
-    logger.info(
-        f"df wis_production_area_evaporation_waterwatch {len(df)} rows from {df.index.date.min()} till "
-        f"{df.index.date.max()}"
-    )
+    api_calls = [
+        # bodemvocht
+        hdsr_fewspy.ApiCall(
+            pi_settings=choices.wis_production_area_soilmoisture,
+            method="get_time_series_single",
+            kwargs={**kwargs, "parameter_id": "SM.d", "qualifier_id": "Lband05cm"},  # Lband05cm, Lband10cm, Lband20cm
+        ),
+        # neerslag wiwb (tot 2019)
+        hdsr_fewspy.ApiCall(
+            pi_settings=choices.wis_production_area_precipitation_wiwb,
+            method="get_time_series_single",
+            kwargs={**kwargs, "parameter_id": "Rh.h", "qualifier_id": "wiwb_merge"},  # choose from ["wiwb_merge"]
+        ),
+        # neerslag radarcorrection (vanaf 2019)
+        hdsr_fewspy.ApiCall(
+            pi_settings=choices.wis_production_area_precipitation_radarcorrection,
+            method="get_time_series_single",
+            kwargs={**kwargs, "parameter_id": "Rh.h", "qualifier_id": "mfbs_merge"},  # choose from ["mfbs_merge"]
+        ),
+        # verdamping wiwb satdata
+        hdsr_fewspy.ApiCall(
+            pi_settings=choices.wis_production_area_evaporation_wiwb_satdata,
+            method="get_time_series_single",
+            kwargs={
+                **kwargs,
+                "parameter_id": "Eact.d",
+                "qualifier_id": "RA",
+            },  # choose from ["RA", "satdata_merge", ""]
+        ),
+        # verdamping waterwatch
+        hdsr_fewspy.ApiCall(
+            pi_settings=choices.wis_production_area_evaporation_waterwatch,
+            method="get_time_series_single",
+            kwargs={
+                **kwargs,
+                "parameter_id": "Eact.d",
+                "qualifier_id": "",  # choose from [""]
+                "start_time": datetime(year=2000, month=1, day=1),
+            },
+        ),
+    ]
+
+    # all five datasets are downloaded in one concurrent batch
+    dfs = multi_api.run_concurrently(api_calls=api_calls, max_workers=5)
+    for api_call, df in zip(api_calls, dfs):
+        logger.info(
+            f"df {api_call.pi_settings.value} {len(df)} rows from {df.index.date.min()} till {df.index.date.max()}"
+        )
 
 
 def setup_logging() -> None:
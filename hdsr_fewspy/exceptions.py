@@ -28,3 +28,9 @@ class ParameterIdsDoesNotExistErr(Exception):
     """get_multi_time_series: some of the parameters do not exists for the external parameter."""
 
     pass
+
+
+class TimeWindowDownloadError(Exception):
+    """Download of a time-window failed, also after bisecting it down to request_settings.min_request_period."""
+
+    pass
@@ -0,0 +1,87 @@
+from hdsr_fewspy.response_cache import ResponseCache
+from hdsr_fewspy.store_utils import Registry
+from pathlib import Path
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+import logging
+import pandas as pd
+import requests
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataCache:
+    """In-memory and on-disk cache of metadata responses (locations, parameters, qualifiers, filters), so that repeated
+    metadata lookups are (nearly) free, both within one python session and across sessions.
+
+    Metadata hardly changes, but e.g. get_locations can take 20 seconds. A response is cached under its url and query
+    parameters, which contain the pi_settings (domain, port, service, filter_id, document_format, document_version).
+    A cached response expires after ttl. The on-disk cache is a ResponseCache with only the metadata endpoints, so
+    other processes (e.g. the next run of the same script) share it. With path None we only cache in memory.
+
+    Example:
+        metadata_cache = MetadataCache(path=Path.home() / ".hdsr_fewspy" / "metadata.sqlite", ttl=pd.Timedelta(days=1))
+        response = metadata_cache.get(url=url, params=params)  # None if not cached (or expired)
+        if response is None:
+            response = requests.get(url=url, params=params)
+            metadata_cache.set(url=url, params=params, response=response)
+    """
+
+    endpoints = ("locations", "parameters", "qualifiers", "filters")
+
+    def __init__(self, path: Optional[Path], ttl: pd.Timedelta):
+        self.ttl = ttl
+        self.response_cache = (
+            ResponseCache(path=path, ttl_per_endpoint={endpoint: ttl for endpoint in self.endpoints})
+            if path is not None
+            else None
+        )
+        self.__lock = threading.Lock()
+        self.__responses: Dict[str, Tuple[float, requests.Response]] = {}
+
+    def get(self, url: str, params: Optional[Dict]) -> Optional[requests.Response]:
+        key = ResponseCache.get_key(url=url, params=params)
+        with self.__lock:
+            created, response = self.__responses.get(key, (None, None))
+        if response is not None and time.time() - created <= self.ttl.total_seconds():
+            logger.debug(f"metadata response from memory {ResponseCache.normalize(url=url, params=params)}")
+            return response
+        if self.response_cache is None:
+            return None
+        response = self.response_cache.get(url=url, params=params)
+        if response is not None:
+            # the age on disk is unknown here, so in memory it can live max ttl longer (still ok for metadata)
+            with self.__lock:
+                self.__responses[key] = (time.time(), response)
+        return response
+
+    def set(self, url: str, params: Optional[Dict], response: requests.Response) -> None:
+        if response.status_code != 200:
+            return
+        with self.__lock:
+            self.__responses[ResponseCache.get_key(url=url, params=params)] = (time.time(), response)
+        if self.response_cache is not None:
+            self.response_cache.set(url=url, params=params, response=response)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__responses.clear()
+        if self.response_cache is not None:
+            self.response_cache.clear()
+
+
+# one cache per path and ttl, so that all Api/AsyncApi instances in this process share the in-memory responses
+_METADATA_CACHES: Registry[MetadataCache] = Registry()
+
+
+def get_metadata_cache(path: Optional[Path], ttl: Optional[pd.Timedelta]) -> Optional[MetadataCache]:
+    """Get the metadata cache of this path and ttl. Returns None if ttl is None or 0 (no cache)."""
+    if ttl is None or ttl <= pd.Timedelta(0):
+        return None
+    path = Path(path) if path is not None else None
+    return _METADATA_CACHES.get(key=(path, ttl), create=lambda: MetadataCache(path=path, ttl=ttl))
@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from hdsr_fewspy.api import Api
+from hdsr_fewspy.constants.choices import DefaultPiSettingsChoices
+from hdsr_fewspy.constants.paths import SECRETS_ENV_PATH
+from hdsr_fewspy.constants.pi_settings import PiSettings
+from hdsr_fewspy.constants.request_settings import RequestSettings
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Union
+
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ApiCall:
+    """One call of MultiApi: an Api method (e.g. 'get_time_series_single') with its arguments and the pi_settings to
+    call it with."""
+
+    pi_settings: Union[PiSettings, DefaultPiSettingsChoices]
+    method: str
+    kwargs: Dict = field(default_factory=dict)
+
+
+class MultiApi:
+    """One client for many pi_settings (e.g. all DefaultPiSettingsChoices 'wis_production_area_*'), with pi_settings
+    per call instead of one Api per pi_settings.
+
+    All calls share one permission check (github), one request_settings, one connection pool and, per FEWS domain, one
+    rate limiter. An Api per pi_settings (see Api.with_pi_settings) is created on first use and then reused.
+
+    Example:
+        multi_api = MultiApi()
+        api = multi_api.api(pi_settings=DefaultPiSettingsChoices.wis_production_area_soilmoisture)
+        df = api.get_time_series_single(location_id="AFVG13", ...)
+        # or many calls (also across pi_settings) concurrently
+        df1, df2 = multi_api.run_concurrently(
+            api_calls=[
+                ApiCall(
+                    pi_settings=DefaultPiSettingsChoices.wis_production_area_soilmoisture,
+                    method="get_time_series_single",
+                    kwargs=dict(location_id="AFVG13", ...),
+                ),
+                ApiCall(
+                    pi_settings=DefaultPiSettingsChoices.wis_production_area_precipitation_wiwb,
+                    method="get_time_series_single",
+                    kwargs=dict(location_id="AFVG13", ...),
+                ),
+            ]
+        )
+    """
+
+    def __init__(
+        self,
+        github_personal_access_token: str = None,
+        secrets_env_path: Union[str, Path] = SECRETS_ENV_PATH,
+        pi_settings: Union[PiSettings, DefaultPiSettingsChoices] = None,
+        output_directory_root: Union[str, Path] = None,
+        startup_cache_path: Union[str, Path] = None,
+    ):
+        """pi_settings is only used to check the permissions and the FEWS webservice once (default, just like Api)."""
+        self.__base_api = Api(
+            github_personal_access_token=github_personal_access_token,
+            secrets_env_path=secrets_env_path,
+            pi_settings=pi_settings,
+            output_directory_root=output_directory_root,
+            startup_cache_path=startup_cache_path,
+        )
+        self.__apis: Dict[str, Api] = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def request_settings(self) -> RequestSettings:
+        """Shared by all pi_settings, so e.g. multi_api.request_settings.requests_per_second = 1 applies to all."""
+        return self.__base_api.request_settings
+
+    @staticmethod
+    def _get_key(pi_settings: Union[PiSettings, DefaultPiSettingsChoices]) -> str:
+        if isinstance(pi_settings, DefaultPiSettingsChoices):
+            return pi_settings.value
+        # PiSettings is not hashable (not frozen), its repr contains all fields
+        return repr(pi_settings)
+
+    def api(self, pi_settings: Union[PiSettings, DefaultPiSettingsChoices]) -> Api:
+        """The Api of these pi_settings. Created on first use, then reused."""
+        key = self._get_key(pi_settings=pi_settings)
+        with self.__lock:
+            api = self.__apis.get(key, None)
+            if api is None:
+                api = self.__base_api.with_pi_settings(pi_settings=pi_settings)
+                self.__apis[key] = api
+        return api
+
+    def run(self, api_call: ApiCall) -> Any:
+        method = api_call.method
+        is_valid = method.startswith("get_") and callable(getattr(Api, method, None))
+        assert is_valid, f"method '{method}' must be a get_ method of Api"
+        api = self.api(pi_settings=api_call.pi_settings)
+        return getattr(api, method)(**api_call.kwargs)
+
+    def run_concurrently(self, api_calls: List[ApiCall], max_workers: int = 4) -> List[Any]:
+        """Run api_calls concurrently (max max_workers at a time) and return their results in the same order.
+
+        All calls share the connection pool and rate limiter, so together they respect request_settings
+        requests_per_second. The first error is raised (after the running calls finished).
+        """
+        max_pool_size = self.__base_api.retry_backoff_session.pool_maxsize
+        is_valid = isinstance(max_workers, int) and 1 <= max_workers <= max_pool_size
+        assert is_valid, f"max_workers {max_workers} must be an int from 1 to {max_pool_size}"
+        # create all Apis first (in this thread), so that each health check is done once
+        for api_call in api_calls:
+            self.api(pi_settings=api_call.pi_settings)
+        logger.info(f"run {len(api_calls)} api calls with max_workers={max_workers}")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hdsr_fewspy") as executor:
+            return list(executor.map(self.run, api_calls))
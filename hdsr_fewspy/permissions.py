@@ -2,8 +2,9 @@ from hdsr_fewspy.constants import github
 from hdsr_fewspy.exceptions import NoPermissionInHdsrFewspyAuthError
 from hdsr_fewspy.exceptions import UserNotFoundInHdsrFewspyAuthError
 from hdsr_fewspy.secrets import Secrets
-from hdsr_pygithub import GithubFileDownloader
+from hdsr_fewspy.startup_cache import StartupCache
 from typing import List
+from typing import Optional
 
 import logging
 import pandas as pd
@@ -26,8 +27,9 @@ class Permissions:
         col_allowed_filter_id,
     ]
 
-    def __init__(self, secrets: Secrets):
+    def __init__(self, secrets: Secrets, startup_cache: Optional[StartupCache] = None):
         self.secrets = secrets
+        self.startup_cache = startup_cache
         self._permission_row = None
         self._github_downloader = None
         self._github_user_url = None
@@ -40,6 +42,9 @@ class Permissions:
     def github_downloader(self):
         if self._github_downloader is not None:
             return self._github_downloader
+        # hdsr_pygithub (PyGithub) is slow to import and not needed if the permissions are in the startup cache
+        from hdsr_pygithub import GithubFileDownloader
+
         self._github_downloader = GithubFileDownloader(
             target_file=github.GITHUB_HDSR_FEWSPY_AUTH_PERMISSIONS_TARGET_FILE,
             allowed_period_no_updates=github.GITHUB_HDSR_FEWSPY_AUTH_ALLOWED_PERIOD_NO_UPDATES,
@@ -52,8 +57,25 @@ class Permissions:
 
     @property
     def permissions_row(self) -> pd.Series:
+        """The permissions of the github user. Taken from the startup cache if possible (no github requests)."""
         if self._permission_row is not None:
             return self._permission_row
+        cache_key = f"permissions|{StartupCache.hash_token(token=self.secrets.github_personal_access_token)}"
+        cached_row = (
+            self.startup_cache.get(key=cache_key, ttl=github.GITHUB_HDSR_FEWSPY_AUTH_CACHE_TTL)
+            if self.startup_cache
+            else None
+        )
+        if cached_row is not None:
+            logger.info("determine permissions (from startup cache)")
+            self._permission_row = pd.Series(data=cached_row)
+            return self._permission_row
+        self._permission_row = self._download_permissions_row()
+        if self.startup_cache:
+            self.startup_cache.set(key=cache_key, value=self._permission_row.to_dict())
+        return self._permission_row
+
+    def _download_permissions_row(self) -> pd.Series:
         logger.info("determine permissions")
         df = pd.read_csv(filepath_or_buffer=self.github_downloader.get_download_url(), sep=";")
 
@@ -79,9 +101,7 @@ class Permissions:
         # check github user exists
         if permissions_row.empty:
             raise NoPermissionInHdsrFewspyAuthError(f"{msg_user} has no permissions in repo hdsr_fewspy_auth")
-
-        self._permission_row = permissions_row
-        return self._permission_row
+        return permissions_row
 
     @staticmethod
     def split_string_in_list(value: str) -> List[str]:
@@ -0,0 +1,130 @@
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+import asyncio
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketRateLimiter:
+    """Token bucket that limits the number of requests per second to a FEWS PiWebService.
+
+    The bucket holds max burst_size tokens and is refilled with requests_per_second tokens per second. Each request
+    takes one token. If no token is left, the request waits (with sub-second precision) until its token is available.
+
+    The limiter is thread-safe and task-safe: a request reserves its token under a lock and only then waits, outside
+    the lock. So threads (Api with max_workers > 1) and asyncio tasks (AsyncApi) can share one limiter, and waiting
+    requests are served in the order they arrived.
+
+    Example:
+        rate_limiter = TokenBucketRateLimiter(requests_per_second=2, burst_size=4)
+        rate_limiter.acquire()  # blocking
+        await rate_limiter.acquire_async()  # in a coroutine
+    """
+
+    def __init__(self, requests_per_second: float, burst_size: int = 1):
+        self.requests_per_second = requests_per_second
+        self.burst_size = burst_size
+        self.validate_constructor()
+        self.__lock = threading.Lock()
+        self.__tokens = float(burst_size)
+        self.__timestamp = time.monotonic()
+
+    def validate_constructor(self) -> None:
+        is_valid = isinstance(self.requests_per_second, (int, float)) and self.requests_per_second > 0
+        assert is_valid, f"requests_per_second {self.requests_per_second} must be a number > 0"
+        is_valid = isinstance(self.burst_size, int) and self.burst_size >= 1
+        assert is_valid, f"burst_size {self.burst_size} must be an int >= 1"
+
+    def configure(self, requests_per_second: float, burst_size: int) -> None:
+        """Change the rate and/or burst size, e.g. when request_settings have been updated."""
+        with self.__lock:
+            self.__refill()
+            self.requests_per_second = requests_per_second
+            self.burst_size = burst_size
+            self.validate_constructor()
+            self.__tokens = min(self.__tokens, float(burst_size))
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+        self.__tokens = min(self.burst_size, self.__tokens + (now - self.__timestamp) * self.requests_per_second)
+        self.__timestamp = now
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds the caller must wait before using it."""
+        with self.__lock:
+            self.__refill()
+            self.__tokens -= 1
+            if self.__tokens >= 0:
+                return 0.0
+            return -self.__tokens / self.requests_per_second
+
+    def acquire(self) -> None:
+        seconds_to_wait = self.reserve()
+        if seconds_to_wait:
+            logger.debug(f"sleep {seconds_to_wait:.3f} seconds until next request")
+            time.sleep(seconds_to_wait)
+
+    async def acquire_async(self) -> None:
+        seconds_to_wait = self.reserve()
+        if seconds_to_wait:
+            logger.debug(f"sleep {seconds_to_wait:.3f} seconds until next request")
+            await asyncio.sleep(seconds_to_wait)
+
+
+# one rate limiter per FEWS domain, so that all Api/AsyncApi instances (and their workers) share the same budget
+_RATE_LIMITERS: Dict[str, TokenBucketRateLimiter] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(domain: str, requests_per_second: float, burst_size: int) -> TokenBucketRateLimiter:
+    """Get the rate limiter shared by everyone that requests this domain, with the given rate and burst size.
+
+    A session calls this when it starts and whenever its request_settings change (see RetryBackoffSession.rate_limiter),
+    so the latest settings apply to all requests to this domain (e.g. a higher requests_per_second after the default).
+    """
+    with _RATE_LIMITERS_LOCK:
+        rate_limiter = _RATE_LIMITERS.get(domain.lower(), None)
+        if rate_limiter is None:
+            rate_limiter = TokenBucketRateLimiter(requests_per_second=requests_per_second, burst_size=burst_size)
+            _RATE_LIMITERS[domain.lower()] = rate_limiter
+            return rate_limiter
+        if (rate_limiter.requests_per_second, rate_limiter.burst_size) != (requests_per_second, burst_size):
+            logger.info(
+                f"rate limiter domain {domain}: requests_per_second={requests_per_second}, burst_size={burst_size}"
+            )
+            rate_limiter.configure(requests_per_second=requests_per_second, burst_size=burst_size)
+        return rate_limiter
+
+
+def find_rate_limiter(domain: Optional[str]) -> Optional[TokenBucketRateLimiter]:
+    """The rate limiter of this domain if one has been created (see get_rate_limiter), otherwise None."""
+    if not domain:
+        return None
+    with _RATE_LIMITERS_LOCK:
+        return _RATE_LIMITERS.get(domain.lower(), None)
+
+
+class SessionRateLimiter:
+    """The rate limiter of a session (RetryBackoffSession or AsyncRetryBackoffSession), so both resolve it the same way.
+
+    get_rate_limiter is only called again if the domain or the rate limit (see RequestSettings.rate_limit) change, so
+    each request does not take the registry lock.
+    """
+
+    def __init__(self):
+        self.__settings_and_rate_limiter: Optional[Tuple[Tuple[str, float, int], TokenBucketRateLimiter]] = None
+
+    def get(self, domain: str, rate_limit: Tuple[float, int]) -> TokenBucketRateLimiter:
+        settings = (domain, *rate_limit)
+        # one tuple (not two attributes) so that threads never see the limiter of other settings
+        settings_and_rate_limiter = self.__settings_and_rate_limiter
+        if settings_and_rate_limiter is None or settings_and_rate_limiter[0] != settings:
+            rate_limiter = get_rate_limiter(domain=domain, requests_per_second=rate_limit[0], burst_size=rate_limit[1])
+            settings_and_rate_limiter = self.__settings_and_rate_limiter = (settings, rate_limiter)
+        return settings_and_rate_limiter[1]
@@ -0,0 +1,202 @@
+from contextlib import contextmanager
+from enum import Enum
+from hdsr_fewspy.converters.utils import create_response
+from hdsr_fewspy.store_utils import Registry
+from pathlib import Path
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import urlencode
+
+import hashlib
+import json
+import logging
+import pandas as pd
+import requests
+import sqlite3
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Persistent (sqlite) cache of FEWS responses, so that repeated requests (e.g. the same notebook or nightly job)
+    do not go to the FEWS server again.
+
+    A response is stored under the sha256 of its normalized url and query parameters (see normalize). Only responses
+    with status 200 are stored. A response expires after the ttl of its endpoint (e.g. 'timeseries', 'locations'):
+    ttl_per_endpoint or, for other endpoints, default_ttl. A ttl of 0 means: do not cache. If all responses together
+    exceed max_size_bytes, the least recently used responses are removed.
+
+    Several threads and processes can use the same cache file: each operation uses its own sqlite connection and sqlite
+    locks the file. A broken or locked cache only results in a warning: then we just request FEWS.
+
+    Example:
+        response_cache = ResponseCache(path=Path.home() / ".hdsr_fewspy" / "responses.sqlite")
+        response = response_cache.get(url=url, params=params)  # None if not cached (or expired)
+        if response is None:
+            response = requests.get(url=url, params=params)
+            response_cache.set(url=url, params=params, response=response)
+    """
+
+    default_ttl = pd.Timedelta(days=1)
+    default_ttl_per_endpoint = {
+        "timeseries": pd.Timedelta(hours=1),  # time-series change more often than metadata
+        "timezoneid": pd.Timedelta(0),  # not cached: Api uses it to check if FEWS is running
+    }
+    default_max_size_bytes = 2 * 1024**3  # 2GB
+    sqlite_timeout_seconds = 30  # max wait for a lock of another thread or process
+
+    def __init__(
+        self,
+        path: Path,
+        max_size_bytes: int = None,
+        ttl_per_endpoint: Dict[str, pd.Timedelta] = None,
+    ):
+        self.path = Path(path)
+        self.max_size_bytes = max_size_bytes or self.default_max_size_bytes
+        self.ttl_per_endpoint = {**self.default_ttl_per_endpoint, **(ttl_per_endpoint or {})}
+        self.__lock = threading.Lock()
+        self.__is_created = False
+
+    @staticmethod
+    def normalize(url: str, params: Optional[Dict]) -> str:
+        """Url and query params sorted by key, encoded the same way as requests does (a list results in a repeated key).
+
+        The order of the values of one key is kept (e.g. locationIds), as FEWS responds in that order.
+        """
+        query_params = []
+        for key, value in (params or {}).items():
+            for x in value if isinstance(value, (list, tuple)) else [value]:
+                if x is None:
+                    continue
+                query_params.append((key, str(x.value if isinstance(x, Enum) else x)))
+        return f"{url}?{urlencode(sorted(query_params, key=lambda x: x[0]))}"
+
+    @classmethod
+    def get_key(cls, url: str, params: Optional[Dict]) -> str:
+        return hashlib.sha256(cls.normalize(url=url, params=params).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_endpoint(url: str) -> str:
+        """E.g. 'http://localhost:8080/FewsWebServices/rest/fewspiservice/v1/timeseries/' returns 'timeseries'."""
+        return url.rstrip("/").rsplit("/", 1)[-1]
+
+    def get_ttl(self, url: str) -> pd.Timedelta:
+        return self.ttl_per_endpoint.get(self.get_endpoint(url=url), self.default_ttl)
+
+    def get(self, url: str, params: Optional[Dict]) -> Optional[requests.Response]:
+        key = self.get_key(url=url, params=params)
+        now = time.time()
+        try:
+            with self.__connect() as connection:
+                row = connection.execute(
+                    "SELECT url, headers, encoding, content, created FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                response_url, headers, encoding, content, created = row
+                if now - created > self.get_ttl(url=url).total_seconds():
+                    connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return None
+                connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        except (sqlite3.Error, OSError) as err:
+            logger.warning(f"could not read response cache {self.path}, err={err}")
+            return None
+        logger.debug(f"response from cache {self.normalize(url=url, params=params)}")
+        return create_response(
+            status_code=200, content=content, url=response_url, headers=json.loads(headers), encoding=encoding
+        )
+
+    def set(self, url: str, params: Optional[Dict], response: requests.Response) -> None:
+        if response.status_code != 200 or self.get_ttl(url=url) <= pd.Timedelta(0):
+            return
+        now = time.time()
+        row = (
+            self.get_key(url=url, params=params),
+            self.get_endpoint(url=url),
+            response.url,
+            json.dumps(dict(response.headers)),
+            response.encoding,
+            response.content,
+            len(response.content),
+            now,
+            now,
+        )
+        try:
+            with self.__connect() as connection:
+                connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+                self.__evict(connection=connection)
+        except (sqlite3.Error, OSError) as err:
+            logger.warning(f"could not write response cache {self.path}, err={err}")
+
+    def clear(self) -> None:
+        try:
+            with self.__connect() as connection:
+                connection.execute("DELETE FROM responses")
+        except (sqlite3.Error, OSError) as err:
+            logger.warning(f"could not clear response cache {self.path}, err={err}")
+
+    def __evict(self, connection: sqlite3.Connection) -> None:
+        """Remove least recently used responses until all responses together are max max_size_bytes."""
+        total_size = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size <= self.max_size_bytes:
+            return
+        rows: List[Tuple[str, int]] = connection.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ).fetchall()
+        keys_to_delete = []
+        for key, size in rows:
+            if total_size <= self.max_size_bytes:
+                break
+            keys_to_delete.append((key,))
+            total_size -= size
+        connection.executemany("DELETE FROM responses WHERE key = ?", keys_to_delete)
+        logger.debug(f"removed {len(keys_to_delete)} least recently used responses from cache {self.path}")
+
+    @contextmanager
+    def __connect(self, create: bool = False) -> Iterator[sqlite3.Connection]:
+        """A new connection per operation, so that threads do not share one. It is committed and closed afterwards."""
+        if not create and not self.__is_created:
+            with self.__lock:
+                if not self.__is_created:
+                    self.__create()
+        connection = sqlite3.connect(self.path.as_posix(), timeout=self.sqlite_timeout_seconds)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def __create(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.__connect(create=True) as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, endpoint TEXT, url TEXT, headers TEXT, "
+                "encoding TEXT, content BLOB, size INTEGER, created REAL, last_access REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self.__is_created = True
+
+
+# one cache per path, so that all Api/AsyncApi instances (and their workers) share the same cache
+_RESPONSE_CACHES: Registry[ResponseCache] = Registry()
+
+
+def get_response_cache(
+    path: Optional[Path],
+    max_size_bytes: int = None,
+    ttl_per_endpoint: Dict[str, pd.Timedelta] = None,
+) -> Optional[ResponseCache]:
+    """Get the response cache of this path. Returns None if path is None (no cache)."""
+    if path is None:
+        return None
+    path = Path(path)
+    return _RESPONSE_CACHES.get(
+        key=(path, max_size_bytes, tuple(sorted((ttl_per_endpoint or {}).items()))),
+        create=lambda: ResponseCache(path=path, max_size_bytes=max_size_bytes, ttl_per_endpoint=ttl_per_endpoint),
+    )
@@ -1,10 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 from hdsr_fewspy import exceptions
 from hdsr_fewspy.constants.pi_settings import PiSettings
 from hdsr_fewspy.constants.request_settings import RequestSettings
+from hdsr_fewspy.rate_limiter import find_rate_limiter
+from hdsr_fewspy.rate_limiter import SessionRateLimiter
+from hdsr_fewspy.rate_limiter import TokenBucketRateLimiter
+from hdsr_fewspy.response_cache import get_response_cache
+from hdsr_fewspy.response_cache import ResponseCache
 from pathlib import Path
 from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.exceptions import ReadTimeoutError
 from requests.packages.urllib3.util.retry import Retry
-from time import sleep
 from typing import List
 from typing import Optional
 from typing import Tuple
@@ -12,11 +18,25 @@ from typing import Tuple
 import logging
 import pandas as pd
 import requests
+import threading
 
 
 logger = logging.getLogger(__name__)
 
 
+class RateLimitedRetry(Retry):
+    """urllib3 Retry that takes a token from the rate limiter of the domain before each retry, so that retries (e.g.
+    after a burst of 5xx responses) are throttled just like the first request."""
+
+    def increment(self, *args, **kwargs) -> Retry:
+        new_retry = super().increment(*args, **kwargs)  # raises MaxRetryError if no retries are left
+        _pool = kwargs.get("_pool", None)
+        rate_limiter = find_rate_limiter(domain=getattr(_pool, "host", None))
+        if rate_limiter:
+            rate_limiter.acquire()
+        return new_retry
+
+
 class RetryBackoffSession:
     """
     Class that provides retry-backoff strategy for requests. Why?
@@ -47,6 +67,20 @@ class RetryBackoffSession:
     timeout_seconds:
     How long to wait for the server to send data before giving up? This arg is here and in can be defined on
     a per-request basis (self.get(url=x, timeout_seconds=y)
+
+    pool_maxsize:
+    Max number of connections kept alive per host. Multiple threads (e.g. get_time_series_multi with max_workers > 1)
+    can share this session. Concurrent requests of one api call (see request_settings max_requests_in_flight) run in
+    one thread pool of this size, that is shared by all sessions with the same connection pool (see executor).
+
+    rate_limiter:
+    Each request (and each retry) first takes a token from the TokenBucketRateLimiter of the FEWS domain (see
+    request_settings requests_per_second and burst_size). This limiter is shared by all threads, sessions, and Api
+    instances. It is resolved once per session (again only if the request_settings of this session change).
+
+    response_cache:
+    Optional (request_settings response_cache_path) on-disk ResponseCache. A cached response is returned without a
+    request to FEWS (and without waiting for the rate_limiter).
     """
 
     retries: int = 2
@@ -54,6 +88,7 @@ class RetryBackoffSession:
     status_force_list: Tuple = (500, 502, 504)
     allowed_methods: List[str] = ["HEAD", "GET", "OPTIONS"]  # we do not PUT/PATCH to PiWebService
     timeout_seconds: int = 30  # /parameters and /filters respond within 5 seconds. /locations in 22 seconds
+    pool_maxsize: int = 10
 
     def __init__(
         self,
@@ -64,53 +99,107 @@ class RetryBackoffSession:
         self.request_settings = _request_settings
         self.pi_settings = pi_settings
         self.output_dir = output_dir
-        self.datetime_previous_request = pd.Timestamp.now()  # this immutable object is updated during runtime
         self.__retry_session = None
+        self.__executor = None
+        self.__session_rate_limiter = SessionRateLimiter()
+        self.__lock = threading.Lock()
+
+    def with_pi_settings(self, pi_settings: PiSettings) -> "RetryBackoffSession":
+        """A session for other pi_settings that shares the connection pool (and request_settings) with this session.
+
+        Argument 'verify' is given per request (see GetRequest), so sessions with a different ssl_verify can share it.
+        """
+        session = RetryBackoffSession(
+            _request_settings=self.request_settings, pi_settings=pi_settings, output_dir=self.output_dir
+        )
+        session.__retry_session = self._retry_session
+        session.__executor = self.executor
+        return session
+
+    @property
+    def rate_limiter(self) -> TokenBucketRateLimiter:
+        return self.__session_rate_limiter.get(
+            domain=self.pi_settings.domain, rate_limit=self.request_settings.rate_limit
+        )
 
-    def _optional_sleep_until_next_request(self, time_since_previous_request: pd.Timedelta) -> None:
-        """Ensure a minimum time between each PiWebService request."""
-        logger.debug(f"time_since_previous_request {time_since_previous_request}")
-        if time_since_previous_request > self.request_settings.min_time_between_requests:
-            return
-        timedelta_to_wait = self.request_settings.min_time_between_requests - time_since_previous_request
-        seconds_to_wait = timedelta_to_wait.round(pd.Timedelta(seconds=1)).seconds  # noqa
-        logger.debug(f"sleep {seconds_to_wait} seconds until next request")
-        sleep(seconds_to_wait)
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        return get_response_cache(
+            path=self.request_settings.response_cache_path,
+            max_size_bytes=self.request_settings.response_cache_max_size_bytes,
+            ttl_per_endpoint=self.request_settings.response_cache_ttl_per_endpoint,
+        )
 
     def get(self, url: str, timeout_seconds: int = timeout_seconds, **kwargs) -> requests.Response:
         assert url.endswith("/"), f"url {url} must end with '/"
+        response_cache = self.response_cache
+        if response_cache:
+            response = response_cache.get(url=url, params=kwargs.get("params", None))
+            if response is not None:
+                return response
+        self.rate_limiter.acquire()
         now = pd.Timestamp.now()
-        time_since_previous_request = now - self.datetime_previous_request
-        self._optional_sleep_until_next_request(time_since_previous_request=time_since_previous_request)  # noqa
-        self.datetime_previous_request = pd.Timestamp.now()
         try:
             response = self._retry_session.get(url=url, timeout=timeout_seconds, **kwargs)
-        except (requests.exceptions.HTTPError, requests.exceptions.ConnectionError) as err:
-            msg = f"request failed for url: {url}, err: {err}"
-            logger.error(msg)
-            if self.pi_settings.domain == "localhost":
-                msg += (
-                    f"Please make sure fews SA webservice is running (D:/Tomcat/bin/Tomcat9w.exe). Verify in "
-                    f"browser it is running: {self.pi_settings.test_url}"
-                )
-                raise exceptions.StandAloneFewsWebServiceNotRunningError(msg)
-            assert isinstance(self.pi_settings, PiSettings)
-            raise
+        except requests.exceptions.ConnectionError as err:
+            if not self._is_read_timeout(err=err):
+                self._raise_request_failed(url=url, err=err)
+            # same error as AsyncRetryBackoffSession, so that a timeout can be handled (e.g. smaller time-window)
+            logger.error(f"request timed out for url: {url}, err: {err}")
+            raise requests.exceptions.ReadTimeout(str(err))
+        except requests.exceptions.HTTPError as err:
+            self._raise_request_failed(url=url, err=err)
         except Exception as err:
             logger.error(f"unexpected error: request failed for url={url}, err={err}")
             raise
         response_seconds = (pd.Timestamp.now() - now).seconds
         if response_seconds > self.request_settings.max_response_time.seconds:
             logger.warning(f"response_seconds={response_seconds}, status={response.status_code}, url={url}")
+        if response_cache:
+            response_cache.set(url=url, params=kwargs.get("params", None), response=response)
         return response
 
+    @staticmethod
+    def _is_read_timeout(err: requests.exceptions.ConnectionError) -> bool:
+        """After the last retry, urllib3 wraps a read timeout in a MaxRetryError and requests in a ConnectionError."""
+        reason = getattr(err.args[0], "reason", None) if err.args else None
+        return isinstance(reason, ReadTimeoutError)
+
+    def _raise_request_failed(self, url: str, err: requests.exceptions.RequestException) -> None:
+        msg = f"request failed for url: {url}, err: {err}"
+        logger.error(msg)
+        if self.pi_settings.domain == "localhost":
+            msg += (
+                f"Please make sure fews SA webservice is running (D:/Tomcat/bin/Tomcat9w.exe). Verify in "
+                f"browser it is running: {self.pi_settings.test_url}"
+            )
+            raise exceptions.StandAloneFewsWebServiceNotRunningError(msg)
+        assert isinstance(self.pi_settings, PiSettings)
+        raise err
+
     @property
     def _retry_session(self) -> requests.Session:
         if self.__retry_session is not None:
             return self.__retry_session
+        with self.__lock:
+            if self.__retry_session is None:
+                self.__retry_session = self.__create_retry_session()
+        return self.__retry_session
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Threads for concurrent requests (see GetRequest._get_concurrently), created once per connection pool."""
+        if self.__executor is not None:
+            return self.__executor
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(max_workers=self.pool_maxsize, thread_name_prefix="hdsr_fewspy")
+        return self.__executor
+
+    def __create_retry_session(self) -> requests.Session:
         try:
             # try it the old way
-            retry = Retry(
+            retry = RateLimitedRetry(
                 total=self.retries,
                 read=self.retries,
                 connect=self.retries,
@@ -127,7 +216,7 @@ class RetryBackoffSession:
                 msg = f"code error: error Retry instance is unexpected. urllib3 version = {urllib3.__version__}"
                 raise AssertionError(msg)
             # try it the new way
-            retry = Retry(
+            retry = RateLimitedRetry(
                 total=self.retries,
                 read=self.retries,
                 connect=self.retries,
@@ -135,9 +224,8 @@ class RetryBackoffSession:
                 allowed_methods=self.allowed_methods,
                 status_forcelist=self.status_force_list,
             )
-        adapter = HTTPAdapter(max_retries=retry)
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=self.pool_maxsize)
         session = requests.Session()
         session.mount("http://", adapter)
         session.mount("https://", adapter)
-        self.__retry_session = session
-        return self.__retry_session
+        return session
@@ -0,0 +1,233 @@
+from dataclasses import dataclass
+from hdsr_fewspy.constants import choices
+from hdsr_fewspy.store_utils import atomic_write
+from hdsr_fewspy.store_utils import Registry
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import json
+import logging
+import pandas as pd
+import re
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+col_value = choices.TimeSeriesEventColumns.value.value
+col_flag = choices.TimeSeriesEventColumns.flag.value
+col_datetime = choices.TimeSeriesEventColumns.datetime.value
+
+
+@dataclass
+class DownloadPeriod:
+    """A period to download for the SeriesStore. With start_creation_time, only events created or edited in FEWS
+    since start_creation_time are downloaded (startCreationTime) and merged into the stored events."""
+
+    start: pd.Timestamp
+    end: pd.Timestamp
+    start_creation_time: Optional[pd.Timestamp] = None
+
+
+@dataclass
+class StoredSeries:
+    """One time-series in the SeriesStore: all events (value and flag, no filter) between synced_start and
+    synced_end."""
+
+    events: pd.DataFrame
+    synced_start: pd.Timestamp
+    synced_end: pd.Timestamp
+    missing_value: Optional[float] = None
+    synced_at: Optional[pd.Timestamp] = None  # (utc) time of the last complete sync of synced_start to synced_end
+
+    def to_df(
+        self,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+        location_id: str,
+        parameter_id: str,
+        drop_missing_values: bool,
+        flag_threshold: Optional[int],
+    ) -> pd.DataFrame:
+        """The same dataframe as get_time_series_single (pandas_dataframe_in_memory) returns."""
+        df = self.events.loc[(self.events.index >= start_time) & (self.events.index <= end_time)]
+        if drop_missing_values and self.missing_value is not None:
+            df = df.loc[df[col_value] != self.missing_value]
+        if flag_threshold:
+            df = df.loc[df[col_flag] < flag_threshold]
+        if df.empty:
+            logger.warning(f"no stored events for {location_id} {parameter_id} from {start_time} to {end_time}")
+            return pd.DataFrame(data=None)
+        df = df.copy()
+        df["location_id"] = location_id
+        df["parameter_id"] = parameter_id
+        return df
+
+
+class SeriesStore:
+    """Local store (Parquet, pip install hdsr_fewspy[parquet]) with one file per time-series (domain, filter_id,
+    module_instance_id, location_id, parameter_id, qualifier_id). A sync only downloads what is not stored yet: the
+    period after the last stored timestamp (minus an overlap to catch edits in FEWS) and the period before the stored
+    period. Everything else is read from local disk.
+
+    With by_creation_time, the overlap is not needed: the whole stored period is refreshed with one request for only
+    the events that were created or edited in FEWS since the last sync (startCreationTime). Note that events that are
+    removed in FEWS are not detected this way.
+
+    Example:
+        series_store = SeriesStore(root_dir=Path.home() / ".hdsr_fewspy" / "series", domain="localhost")
+        periods = series_store.get_download_periods(request_params, start_time, end_time, overlap=pd.Timedelta(days=7))
+        for period in periods:
+            events, missing_value = ...  # download period
+            series_store.write(request_params, events, period=period, missing_value=missing_value, synced_at=now)
+        stored_series = series_store.read(request_params)
+    """
+
+    metadata_key = b"hdsr_fewspy"
+
+    def __init__(self, root_dir: Path, domain: str):
+        self.root_dir = Path(root_dir)
+        self.domain = domain
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __import_pyarrow():
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("SeriesStore requires pyarrow. Please install it with 'pip install hdsr_fewspy[parquet]'")
+        return pyarrow
+
+    @staticmethod
+    def _to_file_name(value: str) -> str:
+        return re.sub(pattern=r"[^\w.\-]", repl="_", string=str(value))
+
+    def get_path(self, request_params: Dict) -> Path:
+        """E.g. root_dir/localhost/WIS_werkfilter/WerkFilter/OW433001/H.G.0.parquet"""
+        qualifier_ids = request_params.get("qualifierIds", None)
+        file_name = request_params["parameterIds"] + (f"__{qualifier_ids}" if qualifier_ids else "")
+        parts = [
+            self.domain,
+            request_params.get("filterId", ""),
+            request_params.get("moduleInstanceIds", ""),
+            request_params["locationIds"],
+            f"{file_name}.parquet",
+        ]
+        return self.root_dir.joinpath(*[self._to_file_name(value=x) for x in parts])
+
+    def read(self, request_params: Dict) -> Optional[StoredSeries]:
+        path = self.get_path(request_params=request_params)
+        if not path.is_file():
+            return None
+        pyarrow = self.__import_pyarrow()
+        try:
+            table = pyarrow.parquet.read_table(path.as_posix())
+            metadata = json.loads(table.schema.metadata[self.metadata_key])
+        except (OSError, ValueError, KeyError, pyarrow.ArrowException) as err:
+            logger.warning(f"could not read stored time-series {path}, download it again, err={err}")
+            return None
+        return StoredSeries(
+            events=table.to_pandas(),
+            synced_start=pd.Timestamp(metadata["synced_start"]),
+            synced_end=pd.Timestamp(metadata["synced_end"]),
+            missing_value=metadata["missing_value"],
+            synced_at=pd.Timestamp(metadata["synced_at"]) if metadata.get("synced_at", None) else None,
+        )
+
+    def get_download_periods(
+        self,
+        request_params: Dict,
+        start_time: pd.Timestamp,
+        end_time: pd.Timestamp,
+        overlap: Optional[pd.Timedelta],
+        by_creation_time: bool = False,
+    ) -> List[DownloadPeriod]:
+        """Periods to download so that the stored time-series covers start_time to end_time.
+
+        Before the stored period we download what is missing. After the stored period we download from the last stored
+        timestamp minus overlap, so that recent edits in FEWS (e.g. validated values) are taken into account. With
+        by_creation_time (and a known synced_at), we download everything after the stored period and only the changes
+        since synced_at within the stored period. The stored period is never extended with a gap.
+        """
+        stored_series = self.read(request_params=request_params)
+        if stored_series is None:
+            return [DownloadPeriod(start=start_time, end=end_time)]
+        synced_start, synced_end = stored_series.synced_start, stored_series.synced_end
+        periods = []
+        if start_time < synced_start:
+            periods.append(DownloadPeriod(start=start_time, end=synced_start))
+        if by_creation_time and stored_series.synced_at is not None:
+            periods.append(
+                DownloadPeriod(start=synced_start, end=synced_end, start_creation_time=stored_series.synced_at)
+            )
+            if end_time > synced_end:
+                periods.append(DownloadPeriod(start=synced_end, end=end_time))
+            return periods
+        # without stored events (nothing found last time), we use the end of the stored period instead
+        last_time = synced_end if stored_series.events.empty else stored_series.events.index.max()
+        delta_start = last_time - (overlap or pd.Timedelta(0))
+        delta_start = max(min(delta_start, synced_end), synced_start)
+        if end_time > delta_start:
+            periods.append(DownloadPeriod(start=delta_start, end=end_time))
+        return periods
+
+    def write(
+        self,
+        request_params: Dict,
+        events: pd.DataFrame,
+        period: DownloadPeriod,
+        missing_value: Optional[float],
+        synced_at: Optional[pd.Timestamp] = None,
+    ) -> Path:
+        """Merge the downloaded events of period into the stored time-series.
+
+        Stored events in period are replaced, unless period has a start_creation_time: then events only has the changed
+        events, so these are updated (or added) and the other stored events are kept. synced_at (the time the sync
+        started) is only stored if the whole stored period is up-to-date after this write: period has a
+        start_creation_time or covers the whole stored period (a full re-sync). Otherwise the old synced_at is kept.
+        """
+        pyarrow = self.__import_pyarrow()
+        path = self.get_path(request_params=request_params)
+        period_start, period_end = pd.Timestamp(period.start), pd.Timestamp(period.end)
+        with self.__lock:
+            stored_series = self.read(request_params=request_params)
+            if stored_series is not None:
+                stored_events = stored_series.events
+                if period.start_creation_time is None:
+                    is_in_period = (stored_events.index >= period_start) & (stored_events.index <= period_end)
+                    stored_events = stored_events.loc[~is_in_period]
+                    is_full_sync = period_start <= stored_series.synced_start and period_end >= stored_series.synced_end
+                    if not is_full_sync:
+                        synced_at = stored_series.synced_at
+                events = pd.concat(objs=[stored_events, events], axis=0)
+                period_start = min(period_start, stored_series.synced_start)
+                period_end = max(period_end, stored_series.synced_end)
+                if missing_value is None:
+                    missing_value = stored_series.missing_value
+            events = events[~events.index.duplicated(keep="last")].sort_index()
+            metadata = {
+                "synced_start": period_start.isoformat(),
+                "synced_end": period_end.isoformat(),
+                "missing_value": missing_value,
+                "synced_at": synced_at.isoformat() if synced_at is not None else None,
+            }
+            table = pyarrow.Table.from_pandas(events)
+            table = table.replace_schema_metadata({**table.schema.metadata, self.metadata_key: json.dumps(metadata)})
+            atomic_write(path=path, write=lambda tmp_path: pyarrow.parquet.write_table(table, tmp_path.as_posix()))
+        logger.info(f"stored {len(events)} events from {period_start} to {period_end} in {path}")
+        return path
+
+
+# one store per root_dir and domain, so that all Api/AsyncApi instances (and their workers) share the same lock
+_SERIES_STORES: Registry[SeriesStore] = Registry()
+
+
+def get_series_store(root_dir: Optional[Path], domain: str) -> Optional[SeriesStore]:
+    """Get the series store of this root_dir. Returns None if root_dir is None (no store)."""
+    if root_dir is None:
+        return None
+    root_dir = Path(root_dir)
+    return _SERIES_STORES.get(key=(root_dir, domain), create=lambda: SeriesStore(root_dir=root_dir, domain=domain))
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from hdsr_fewspy.store_utils import load_json
+from hdsr_fewspy.store_utils import Registry
+from hdsr_fewspy.store_utils import save_json
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+import hashlib
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class StartupCache:
+    """Small on-disk store (json) with what Api needs at startup: the permissions of the github user, the default pi
+    settings and the last time the FEWS webservice was running. So that a new Api (e.g. in a worker process or a short
+    job) starts in milliseconds instead of downloading permissions.csv and settings.csv from github again.
+
+    Every entry expires after the ttl given in get(). Entries of a github token are stored under the sha256 of that
+    token (see hash_token), never the token itself. A broken or unwritable file only results in a warning.
+
+    Example:
+        startup_cache = StartupCache(path=Path.home() / ".hdsr_fewspy" / "startup.json")
+        settings = startup_cache.get(key="settings", ttl=timedelta(hours=12))  # None if not cached (or expired)
+        if settings is None:
+            settings = ...  # download
+            startup_cache.set(key="settings", value=settings)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, ttl: timedelta) -> Optional[Any]:
+        with self.__lock:
+            entry = self.__load().get(key, None)
+        if not entry or time.time() - entry["created"] > ttl.total_seconds():
+            return None
+        return entry["value"]
+
+    def set(self, key: str, value: Any) -> None:
+        with self.__lock:
+            # re-read the file first, so that entries of other processes are kept
+            entries = self.__load()
+            entries[key] = {"created": time.time(), "value": value}
+            self.__save(entries=entries)
+
+    def delete(self, key: str) -> None:
+        with self.__lock:
+            entries = self.__load()
+            if entries.pop(key, None) is not None:
+                self.__save(entries=entries)
+
+    def __load(self) -> Dict[str, Dict]:
+        return load_json(path=self.path, name="startup cache")
+
+    def __save(self, entries: Dict[str, Dict]) -> None:
+        save_json(path=self.path, data=entries, name="startup cache")
+
+
+# one cache per path, so that all Api/AsyncApi instances share the same lock
+_STARTUP_CACHES: Registry[StartupCache] = Registry()
+
+
+def get_startup_cache(path: Optional[Path]) -> Optional[StartupCache]:
+    """Get the startup cache of this path. Returns None if path is None (no cache)."""
+    if path is None:
+        return None
+    path = Path(path)
+    return _STARTUP_CACHES.get(key=path, create=lambda: StartupCache(path=path))
@@ -0,0 +1,77 @@
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Generic
+from typing import Hashable
+from typing import TypeVar
+
+import json
+import logging
+import os
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def atomic_write(path: Path, write: Callable[[Path], None]) -> None:
+    """Call write(tmp_path) and then replace path with tmp_path, so that a crash (or a reader in another process) never
+    sees a half written file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+
+def load_json(path: Path, name: str) -> Dict:
+    """The json object in path. Empty if there is no file yet, or if it is broken (then with a warning)."""
+    if not path.is_file():
+        return {}
+    try:
+        with open(path.as_posix()) as src:
+            return json.load(src)
+    except (OSError, ValueError) as err:
+        logger.warning(f"could not read {name} {path}, start without it, err={err}")
+        return {}
+
+
+def save_json(path: Path, data: Dict, name: str) -> None:
+    """Write data to path (see atomic_write). An unwritable file only results in a warning."""
+
+    def write(tmp_path: Path) -> None:
+        with open(tmp_path.as_posix(), "w") as dst:
+            json.dump(data, dst, indent=1, sort_keys=True)
+
+    try:
+        atomic_write(path=path, write=write)
+    except OSError as err:
+        logger.warning(f"could not write {name} {path}, err={err}")
+
+
+class Registry(Generic[T]):
+    """One instance per key (e.g. a path) in this process, so that all Api/AsyncApi instances (and their workers)
+    share the same store and its lock.
+
+    Example:
+        _WINDOW_HINTS: Registry[WindowHints] = Registry()
+        window_hints = _WINDOW_HINTS.get(key=path, create=lambda: WindowHints(path=path))
+    """
+
+    def __init__(self):
+        self.__instances: Dict[Hashable, T] = {}
+        self.__lock = threading.Lock()
+
+    def get(self, key: Hashable, create: Callable[[], T]) -> T:
+        with self.__lock:
+            instance = self.__instances.get(key, None)
+            if instance is None:
+                instance = create()
+                self.__instances[key] = instance
+            return instance
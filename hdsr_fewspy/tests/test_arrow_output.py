@@ -0,0 +1,114 @@
+from hdsr_fewspy.api_calls.get_locations import GetLocations
+from hdsr_fewspy.api_calls.get_parameters import GetParameters
+from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.constants.choices import PiRestDocumentFormatChoices
+from hdsr_fewspy.converters.json_to_arrow import df_to_table
+from hdsr_fewspy.converters.json_to_arrow import records_to_table
+from hdsr_fewspy.converters.json_to_arrow import response_jsons_to_one_table
+from hdsr_fewspy.converters.json_to_df_time_series import response_jsons_to_one_df
+from hdsr_fewspy.converters.manager import ResponseManager
+from hdsr_fewspy.converters.utils import create_response
+from hdsr_fewspy.tests.test_xml_stream import _get_responses
+from hdsr_fewspy.tests.test_xml_stream import _get_time_series
+
+import json
+import pandas as pd
+import pytest
+
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _to_df(table: "pa.Table") -> pd.DataFrame:
+    """The table as the dataframe of response_jsons_to_one_df (datetime index, string ids)."""
+    df = table.to_pandas()
+    for column in ("location_id", "parameter_id"):
+        df[column] = df[column].astype(object)
+    return df.set_index("datetime").astype({"value": "float64"})
+
+
+@pytest.mark.parametrize("document_format", ["json", "xml"])
+@pytest.mark.parametrize("drop_missing_values, flag_threshold", [(False, None), (True, 3)])
+def test_table_equals_df(document_format, drop_missing_values, flag_threshold):
+    responses = [_get_responses(time_series_list=[_get_time_series("OW433001", 500)])[document_format]] * 2
+    kwargs = dict(drop_missing_values=drop_missing_values, flag_threshold=flag_threshold, only_value_and_flag=True)
+    table = response_jsons_to_one_table(responses=responses, **kwargs)
+    df = response_jsons_to_one_df(responses=responses, **kwargs)
+    assert table.column_names == ["datetime", "value", "flag", "location_id", "parameter_id"]
+    assert table.schema.field("datetime").type == pa.timestamp("s")
+    assert pa.types.is_dictionary(table.schema.field("location_id").type)
+    assert len(table) == len(df) and len(table) > 0
+    pd.testing.assert_frame_equal(_to_df(table=table), df, check_index_type=False)
+
+
+def test_table_not_only_value_and_flag():
+    pi_time_series = _get_time_series("OW433001", 10)
+    pi_time_series["events"][1]["flagSource"] = "d0u1"
+    response = _get_responses(time_series_list=[pi_time_series])["json"]
+    kwargs = dict(drop_missing_values=False, flag_threshold=None, only_value_and_flag=False)
+    table = response_jsons_to_one_table(responses=[response], **kwargs)
+    assert table["flagSource"].to_pylist()[:3] == [None, "d0u1", None]
+    assert table["date"].to_pylist()[0] == "2019-01-01"
+    assert table["datetime"][0].as_py() == pd.Timestamp("2018-12-31 23:00:00")  # timeZone 1.0
+
+
+def test_empty_table():
+    response = _get_responses(time_series_list=[_get_time_series("OW433001", 0)])["json"]
+    kwargs = dict(drop_missing_values=True, flag_threshold=None, only_value_and_flag=True)
+    table = response_jsons_to_one_table(responses=[response], **kwargs)
+    assert len(table) == 0 and table.column_names == ["datetime", "value", "flag", "location_id", "parameter_id"]
+
+
+def test_df_to_table():
+    responses = [_get_responses(time_series_list=[_get_time_series("OW433001", 100)])["json"]]
+    kwargs = dict(drop_missing_values=True, flag_threshold=None, only_value_and_flag=True)
+    table = response_jsons_to_one_table(responses=responses, **kwargs)
+    assert df_to_table(df=response_jsons_to_one_df(responses=responses, **kwargs)).equals(table)
+
+
+def test_arrow_file_in_download_dir(tmp_path):
+    responses = [_get_responses(time_series_list=[_get_time_series("OW433001", 100)])["xml"]]
+    kwargs = dict(drop_missing_values=True, flag_threshold=None, only_value_and_flag=True)
+    response_manager = ResponseManager(
+        output_choice=OutputChoices.arrow_file_in_download_dir, request_class="gettimeseriesmulti", output_dir=tmp_path
+    )
+    file_paths = response_manager.run(
+        responses=responses, file_name_values=["OW433001", "H.G.0", "2019-01-01T00:00:00Z"], **kwargs
+    )
+    assert file_paths == [tmp_path / "gettimeseriesmulti_ow433001_hg0_20190101t000000z.arrow"]
+    # uncompressed, so it can be memory-mapped (zero-copy)
+    with pa.memory_map(file_paths[0].as_posix()) as source:
+        table = pa.ipc.open_file(source).read_all()
+    assert table.equals(response_jsons_to_one_table(responses=responses, **kwargs))
+
+
+def test_records_to_table():
+    records = [
+        {"locationId": "OW433001", "x": 125362.0, "attributes": [{"id": "a", "value": "1"}]},
+        {"locationId": "OW433002", "x": 125363.0},
+    ]
+    table = records_to_table(records=records)
+    assert table.column_names == ["location_id", "x", "attributes"]
+    assert table["attributes"].to_pylist() == [[{"id": "a", "value": "1"}], None]
+
+
+def test_metadata_to_table():
+    parameters = {"timeSeriesParameters": [{"id": "H.G.0", "parameterType": "instantaneous", "usesDatum": "true"}]}
+    response = create_response(status_code=200, content=json.dumps(parameters).encode("utf-8"), url="x")
+    table = GetParameters._parse_response_to_table(response=response)
+    assert table.to_pylist() == [{"id": "H.G.0", "parameter_type": "instantaneous", "uses_datum": True}]
+
+    locations = {"geoDatum": "Rijks Driehoekstelsel", "locations": [{"locationId": "OW433001", "x": "125362.0"}]}
+    response = create_response(status_code=200, content=json.dumps(locations).encode("utf-8"), url="x")
+    table = GetLocations._parse_response_to_table(response=response)
+    assert table.to_pylist() == [{"location_id": "OW433001", "x": "125362.0"}]
+    assert table.schema.metadata == {b"geo_datum": b"Rijks Driehoekstelsel"}
+
+
+def test_arrow_document_format():
+    get_format = OutputChoices.get_pi_rest_document_format
+    xml = PiRestDocumentFormatChoices.xml
+    assert get_format(output_choice=OutputChoices.arrow_table_in_memory) == PiRestDocumentFormatChoices.json
+    assert get_format(output_choice=OutputChoices.arrow_file_in_download_dir, dataframe_document_format=xml) == xml
+    assert OutputChoices.needs_output_dir(output_choice=OutputChoices.arrow_file_in_download_dir)
+    assert not OutputChoices.needs_output_dir(output_choice=OutputChoices.arrow_table_in_memory)
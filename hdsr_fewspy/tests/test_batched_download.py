@@ -0,0 +1,155 @@
+from datetime import datetime
+from hdsr_fewspy.api_calls.time_series.base import TimeSeriesStatistics
+from hdsr_fewspy.api_calls.time_series.get_time_series_multi import GetTimeSeriesMulti
+from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.converters.utils import create_response
+from hdsr_fewspy.tests.test_get_request import _get_session
+from hdsr_fewspy.tests.test_xml_stream import _get_time_series
+from typing import Callable
+from typing import Dict
+from typing import Generator
+from typing import List
+
+import json
+import pandas as pd
+import pytest
+import requests
+
+
+LOCATION_IDS = ["OW433001", "OW433002", "OW433003"]
+
+
+def _get_time_series_response(location_ids: List[str]) -> requests.Response:
+    time_series = [_get_time_series(location_id=x, nr_events=2) for x in location_ids]
+    response_json = {"version": "1.25", "timeZone": "0.0", "timeSeries": time_series}
+    return create_response(status_code=200, content=json.dumps(response_json).encode("utf-8"), url="x")
+
+
+def _run(generator: Generator, respond: Callable[[Dict], object]) -> object:
+    """Drive a sans-IO requests generator: respond to each request_params with a response or an error."""
+    request_params = next(generator)
+    try:
+        while True:
+            response = respond(request_params)
+            if isinstance(response, Exception):
+                request_params = generator.throw(response)
+            else:
+                request_params = generator.send(response)
+    except StopIteration as stop:
+        return stop.value
+
+
+def _get_request(tmp_path, max_workers: int = 1, max_requests_in_flight: int = 1) -> GetTimeSeriesMulti:
+    session = _get_session()
+    session.output_dir = tmp_path
+    session.request_settings.max_requests_in_flight = max_requests_in_flight
+    return GetTimeSeriesMulti(
+        max_workers=max_workers,
+        batched=True,
+        start_time=datetime(2012, 1, 1),
+        end_time=datetime(2012, 1, 2),
+        location_ids=LOCATION_IDS,
+        parameter_ids=["H.G.0"],
+        qualifier_ids=None,
+        thinning=None,
+        omit_empty_time_series=True,
+        output_choice=OutputChoices.csv_file_in_download_dir,
+        retry_backoff_session=session,
+    )
+
+
+@pytest.mark.parametrize(
+    "batch_error",
+    [
+        requests.exceptions.RetryError("max retries exceeded"),
+        requests.exceptions.ReadTimeout("read timeout"),
+        create_response(status_code=400, content=b"Some of the location ids do not exist", url="x"),
+    ],
+    ids=["retry_error", "timeout", "400"],
+)
+def test_failed_batch_continues_per_combination(tmp_path, batch_error):
+    request = _get_request(tmp_path=tmp_path)
+    request_params_list = request._get_cartesian_parameters_list(parameters=request.initial_fews_parameters)
+    statistics_per_combination = {
+        request._get_combination_key(request_params=x): TimeSeriesStatistics(
+            nr_timestamps=1, first_value_time=pd.Timestamp("2012-01-01"), last_value_time=pd.Timestamp("2012-01-01")
+        )
+        for x in request_params_list
+    }
+    requested_location_ids = []
+
+    def respond(request_params: Dict):
+        location_ids = request_params["locationIds"]
+        requested_location_ids.append(location_ids)
+        if isinstance(location_ids, list):
+            return batch_error
+        return _get_time_series_response(location_ids=[location_ids])
+
+    file_paths = _run(
+        generator=request._iter_download_and_write_batch(
+            request_params_list=request_params_list, statistics_per_combination=statistics_per_combination
+        ),
+        respond=respond,
+    )
+    # one batch request, then one request per combination (not dropped, not raised)
+    assert requested_location_ids == [LOCATION_IDS] + LOCATION_IDS
+    assert [x.name.split("_")[1] for x in file_paths] == [x.lower() for x in LOCATION_IDS]
+
+
+def test_batch_is_split_per_combination(tmp_path):
+    request = _get_request(tmp_path=tmp_path)
+    request_params_list = request._get_cartesian_parameters_list(parameters=request.initial_fews_parameters)
+    statistics_per_combination = {
+        request._get_combination_key(request_params=x): TimeSeriesStatistics(nr_timestamps=1)
+        for x in request_params_list
+    }
+    requested_location_ids = []
+
+    def respond(request_params: Dict):
+        requested_location_ids.append(request_params["locationIds"])
+        return _get_time_series_response(location_ids=request_params["locationIds"])
+
+    file_paths = _run(
+        generator=request._iter_download_and_write_batch(
+            request_params_list=request_params_list, statistics_per_combination=statistics_per_combination
+        ),
+        respond=respond,
+    )
+    assert requested_location_ids == [LOCATION_IDS]
+    assert len(file_paths) == 3
+
+
+def test_file_name_is_requested_period(tmp_path):
+    request = _get_request(tmp_path=tmp_path)
+    request.request_settings.max_request_nr_timestamps = 100
+    request.request_settings.min_request_nr_timestamps = 10
+    request_params = request._get_cartesian_parameters_list(parameters=request.initial_fews_parameters)[0]
+    statistics = TimeSeriesStatistics(
+        nr_timestamps=250, first_value_time=pd.Timestamp("2012-01-01"), last_value_time=pd.Timestamp("2012-01-02")
+    )
+    requested_periods = []
+
+    def respond(request_params: Dict):
+        requested_periods.append((request_params["startTime"], request_params["endTime"]))
+        return _get_time_series_response(location_ids=[request_params["locationIds"]])
+
+    file_paths = _run(
+        generator=request._iter_download_and_write(request_params=request_params, statistics=statistics),
+        respond=respond,
+    )
+    # downloaded in many time-windows, but the file is named after the requested period
+    assert len(requested_periods) == 4
+    assert [x.name for x in file_paths] == ["gettimeseriesmulti_ow433001_hg0_20120101t000000z_20120102t000000z.csv"]
+
+
+def test_concurrent_requests_share_one_executor(tmp_path):
+    session = _get_request(tmp_path=tmp_path).retry_backoff_session
+    assert session.executor is session.executor
+    assert session.with_pi_settings(pi_settings=session.pi_settings).executor is session.executor
+
+
+def test_requests_in_flight_fit_in_connection_pool(tmp_path):
+    # 3 workers with 3 requests in flight each fit in the connection pool (10), 3 x 4 do not
+    _get_request(tmp_path=tmp_path, max_workers=3, max_requests_in_flight=3)
+    with pytest.raises(AssertionError, match="max_requests_in_flight 4 must be <= 10"):
+        _get_request(tmp_path=tmp_path, max_workers=3, max_requests_in_flight=4)
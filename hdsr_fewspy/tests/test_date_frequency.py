@@ -0,0 +1,112 @@
+from datetime import timedelta
+from hdsr_fewspy.constants.request_settings import get_default_request_settings
+from hdsr_fewspy.converters.utils import time_step_to_timedelta
+from hdsr_fewspy.date_frequency import DateFrequencyBuilder
+
+import pandas as pd
+
+
+def test_planned_date_ranges_cover_whole_period():
+    request_settings = get_default_request_settings()
+    startdate_obj = pd.Timestamp("2010-01-01")
+    enddate_obj = pd.Timestamp("2020-01-01")
+    date_ranges, frequency_used = DateFrequencyBuilder.create_planned_date_ranges(
+        startdate_obj=startdate_obj,
+        enddate_obj=enddate_obj,
+        nr_timestamps=300000,
+        first_value_time=pd.Timestamp("2014-01-01"),
+        last_value_time=enddate_obj,
+        request_settings=request_settings,
+    )
+    assert len(date_ranges) == 4
+    assert frequency_used == pd.Timedelta("547 days 18:00:00")
+    assert date_ranges[0][0] == startdate_obj
+    assert date_ranges[-1][1] == enddate_obj
+    for (_, previous_end), (next_start, _) in zip(date_ranges[:-1], date_ranges[1:]):
+        assert previous_end == next_start
+
+
+def test_planned_date_ranges_small_or_unknown():
+    request_settings = get_default_request_settings()
+    startdate_obj = pd.Timestamp("2010-01-01")
+    enddate_obj = pd.Timestamp("2020-01-01")
+    kwargs = dict(startdate_obj=startdate_obj, enddate_obj=enddate_obj, request_settings=request_settings)
+
+    # all timestamps fit in one request
+    date_ranges, _ = DateFrequencyBuilder.create_planned_date_ranges(
+        nr_timestamps=500, first_value_time=startdate_obj, last_value_time=enddate_obj, **kwargs
+    )
+    assert date_ranges == [(startdate_obj, enddate_obj)]
+
+    # no statistics, so no plan (fall back to probing per date range)
+    plan = DateFrequencyBuilder.create_planned_date_ranges(
+        nr_timestamps=None, first_value_time=None, last_value_time=None, **kwargs
+    )
+    assert plan is None
+
+
+def test_planned_date_ranges_equidistant_exact():
+    request_settings = get_default_request_settings()
+    startdate_obj = pd.Timestamp("2010-01-01")
+    enddate_obj = pd.Timestamp("2020-01-01")
+    time_step = pd.Timedelta(minutes=15)
+    # no valueCount needed for equidistant time-series
+    date_ranges, frequency_used = DateFrequencyBuilder.create_planned_date_ranges(
+        startdate_obj=startdate_obj,
+        enddate_obj=enddate_obj,
+        nr_timestamps=None,
+        first_value_time=None,
+        last_value_time=None,
+        request_settings=request_settings,
+        time_step=time_step,
+    )
+    assert frequency_used == time_step * (request_settings.max_request_nr_timestamps - 1)
+    assert len(date_ranges) == 4
+    for start, end in date_ranges:
+        assert (end - start) // time_step + 1 <= request_settings.max_request_nr_timestamps
+
+    # a yearly time-series fits in one request
+    date_ranges, _ = DateFrequencyBuilder.create_planned_date_ranges(
+        startdate_obj=startdate_obj,
+        enddate_obj=enddate_obj,
+        nr_timestamps=None,
+        first_value_time=None,
+        last_value_time=None,
+        request_settings=request_settings,
+        time_step=pd.Timedelta(days=365),
+    )
+    assert date_ranges == [(startdate_obj, enddate_obj)]
+
+
+def test_bisect_date_range():
+    min_period = get_default_request_settings().min_request_period
+    startdate_obj = pd.Timestamp("2010-01-01")
+    date_ranges = DateFrequencyBuilder.bisect_date_range(
+        startdate_obj=startdate_obj, enddate_obj=pd.Timestamp("2010-01-04"), min_period=min_period
+    )
+    assert date_ranges == [
+        (startdate_obj, pd.Timestamp("2010-01-02 12:00:00")),
+        (pd.Timestamp("2010-01-02 12:00:00"), pd.Timestamp("2010-01-04")),
+    ]
+
+    # halves are snapped to whole seconds
+    date_ranges = DateFrequencyBuilder.bisect_date_range(
+        startdate_obj=startdate_obj, enddate_obj=pd.Timestamp("2010-01-01 00:00:03"), min_period=pd.Timedelta(0)
+    )
+    assert date_ranges[0][1] == pd.Timestamp("2010-01-01 00:00:01")
+
+    # not longer than min_period (or no min_period at all): do not bisect
+    for enddate_obj, _min_period in ((pd.Timestamp("2010-01-02"), min_period), (pd.Timestamp("2010-01-04"), None)):
+        assert not DateFrequencyBuilder.bisect_date_range(
+            startdate_obj=startdate_obj, enddate_obj=enddate_obj, min_period=_min_period
+        )
+    assert not DateFrequencyBuilder.bisect_date_range(
+        startdate_obj=startdate_obj, enddate_obj=pd.Timestamp("2010-01-01 00:00:01"), min_period=pd.Timedelta(0)
+    )
+
+
+def test_time_step_to_timedelta():
+    assert time_step_to_timedelta({"unit": "second", "multiplier": "900"}) == timedelta(minutes=15)
+    assert time_step_to_timedelta({"unit": "hour"}) == timedelta(hours=1)
+    assert time_step_to_timedelta({"unit": "nonequidistant"}) is None
+    assert time_step_to_timedelta(None) is None
@@ -0,0 +1,150 @@
+from hdsr_fewspy.converters.json_to_df_time_series import Events
+from hdsr_fewspy.converters.json_to_df_time_series import response_jsons_to_one_df
+from hdsr_fewspy.converters.json_to_df_time_series import to_compact_dtypes
+from hdsr_fewspy.converters.utils import create_response
+from typing import Dict
+from typing import List
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+import time
+
+
+MISSING_VALUE = -999.0
+# the columnar parser (only_value_and_flag) must be at least this many times faster. Now about 3.5 times
+MIN_SPEEDUP = 2
+
+
+def _get_pi_events(nr_events: int, with_flag_source: bool = False, integer_values: bool = False) -> List[Dict]:
+    pi_events = []
+    for index, date_time in enumerate(pd.date_range(start="2019-01-01", periods=nr_events, freq="15min")):
+        value = str(index % 7) if integer_values else f"{(index % 400) / 100 - 2:.3f}"
+        pi_event = {
+            "date": date_time.strftime("%Y-%m-%d"),
+            "time": date_time.strftime("%H:%M:%S"),
+            "value": str(MISSING_VALUE) if index % 50 == 0 else value,
+            "flag": str([0, 0, 3, 6][index % 4]),
+        }
+        if with_flag_source:
+            pi_event["flagSourceColumn"] = {"fs:PRIMAIR": "OK", "fs:VISUEEL": "OK"}
+        pi_events.append(pi_event)
+    return pi_events
+
+
+def _get_response(location_id: str, pi_events: List[Dict]) -> requests.Response:
+    date_time = {"date": "2019-01-01", "time": "00:00:00"}
+    header = {
+        "type": "instantaneous",
+        "moduleInstanceId": "WerkFilter",
+        "locationId": location_id,
+        "parameterId": "H.G.0",
+        "timeStep": {"unit": "nonequidistant"},
+        "startDate": date_time,
+        "endDate": date_time,
+        "missVal": str(MISSING_VALUE),
+        "lat": "52.0",
+        "lon": "5.0",
+        "x": "140000.0",
+        "y": "450000.0",
+        "units": "m",
+    }
+    response_json = {"version": "1.25", "timeZone": "0.0", "timeSeries": [{"header": header, "events": pi_events}]}
+    return create_response(status_code=200, content=json.dumps(response_json).encode("utf-8"), url="x")
+
+
+@pytest.mark.parametrize("with_flag_source", [False, True])
+@pytest.mark.parametrize("integer_values", [False, True])
+@pytest.mark.parametrize("drop_missing_values", [False, True])
+@pytest.mark.parametrize("flag_threshold", [None, 6])
+@pytest.mark.parametrize("tz_offset", [None, 1.0])
+def test_columnar_equals_records(with_flag_source, integer_values, drop_missing_values, flag_threshold, tz_offset):
+    pi_events = _get_pi_events(nr_events=1000, with_flag_source=with_flag_source, integer_values=integer_values)
+    kwargs = dict(
+        pi_events=pi_events,
+        missing_value=MISSING_VALUE,
+        drop_missing_values=drop_missing_values,
+        flag_threshold=flag_threshold,
+        only_value_and_flag=True,
+        tz_offset=tz_offset,
+    )
+    df_expected = Events._from_pi_events_records(**kwargs)
+    df = Events.from_pi_events(**kwargs)
+    pd.testing.assert_frame_equal(df, df_expected)
+
+
+def test_columnar_falls_back_to_records():
+    # no flag and another time format: both not supported by the columnar parser
+    pi_events = [{"date": "2019-01-01", "time": "00:00:00", "value": "1.5"}]
+    pi_event_columns = Events._to_pi_event_columns(pi_events)
+    assert Events._from_pi_event_columns(pi_event_columns, MISSING_VALUE, True, None) is None
+    pi_events = [{"date": "2019-01-01", "time": "00:00:00.000", "value": "1.5", "flag": "0"}]
+    pi_event_columns = Events._to_pi_event_columns(pi_events)
+    assert Events._from_pi_event_columns(pi_event_columns, MISSING_VALUE, True, None) is None
+    df = Events.from_pi_events(pi_events, MISSING_VALUE, True, None, only_value_and_flag=True)
+    assert df.index[0] == pd.Timestamp("2019-01-01")
+    assert df["value"].tolist() == [1.5]
+
+
+@pytest.mark.benchmark
+def test_columnar_benchmark():
+    pi_events = _get_pi_events(nr_events=100_000)
+    kwargs = dict(pi_events=pi_events, missing_value=MISSING_VALUE, drop_missing_values=True, flag_threshold=None)
+    seconds = {}
+    for name, func in [("records", Events._from_pi_events_records), ("columnar", Events.from_pi_events)]:
+        # best of 3, so that a busy machine does not make this test fail
+        durations = []
+        for _ in range(3):
+            start = time.perf_counter()
+            func(**kwargs, only_value_and_flag=True, tz_offset=1.0)
+            durations.append(time.perf_counter() - start)
+        seconds[name] = min(durations)
+    speedup = seconds["records"] / seconds["columnar"]
+    assert speedup >= MIN_SPEEDUP, f"columnar parser is only {speedup:.1f} times faster, seconds={seconds}"
+
+
+def test_response_jsons_to_one_df():
+    pi_events = _get_pi_events(nr_events=300)
+    responses = [
+        _get_response(location_id="OW433001", pi_events=pi_events[x:y]) for x, y in ((0, 100), (100, 200), (200, 300))
+    ]
+    df = response_jsons_to_one_df(
+        responses=responses, drop_missing_values=False, flag_threshold=None, only_value_and_flag=True
+    )
+    assert list(df.columns) == ["value", "flag", "location_id", "parameter_id"]
+    assert len(df) == 300 and df.index.is_monotonic_increasing
+    assert df["location_id"].unique().tolist() == ["OW433001"]
+    assert df["parameter_id"].unique().tolist() == ["H.G.0"]
+
+    responses.append(_get_response(location_id="OW433002", pi_events=pi_events[:1]))
+    with pytest.raises(AssertionError):
+        response_jsons_to_one_df(
+            responses=responses, drop_missing_values=False, flag_threshold=None, only_value_and_flag=True
+        )
+
+
+def test_to_compact_dtypes():
+    pi_events = _get_pi_events(nr_events=10_000)
+    responses = [_get_response(location_id="OW433001", pi_events=pi_events)]
+    df = response_jsons_to_one_df(
+        responses=responses, drop_missing_values=False, flag_threshold=None, only_value_and_flag=True
+    )
+    df_compact = to_compact_dtypes(df=df)
+    assert df_compact["value"].dtype == np.float32 and df_compact["flag"].dtype == np.int8
+    assert df_compact["location_id"].dtype == "category" and df_compact["parameter_id"].dtype == "category"
+    assert df_compact.index.dtype == "datetime64[s]" and df_compact.index.name == df.index.name
+    assert df["value"].dtype == np.float64, "the original dataframe is not changed"
+    # the float32 values round back to the original decimals
+    np.testing.assert_array_equal(np.round(df_compact["value"].to_numpy(dtype=np.float64), 3), df["value"].to_numpy())
+    np.testing.assert_array_equal(df_compact["flag"].to_numpy(), df["flag"].to_numpy())
+    np.testing.assert_array_equal(df_compact.index.to_numpy(dtype="datetime64[ns]"), df.index.to_numpy())
+    assert df.memory_usage(deep=True).sum() > 4 * df_compact.memory_usage(deep=True).sum()
+
+
+def test_to_compact_dtypes_keeps_float64():
+    index = pd.DatetimeIndex(["2019-01-01", "2019-01-02"], name="datetime")
+    df = pd.DataFrame(data={"value": [52.08992726570302, 1.0], "flag": [0, 1]}, index=index)
+    assert to_compact_dtypes(df=df)["value"].dtype == np.float64
+    assert to_compact_dtypes(df=pd.DataFrame(data=None)).empty
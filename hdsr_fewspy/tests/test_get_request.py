@@ -0,0 +1,84 @@
+from hdsr_fewspy.api_base import ApiBase
+from hdsr_fewspy.api_calls.get_filters import GetFilters
+from hdsr_fewspy.api_calls.get_parameters import GetParameters
+from hdsr_fewspy.async_api import AsyncApi
+from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.constants.choices import PiRestDocumentFormatChoices
+from hdsr_fewspy.constants.pi_settings import PiSettings
+from hdsr_fewspy.constants.request_settings import get_default_request_settings
+from hdsr_fewspy.retry_session import RetryBackoffSession
+from unittest import mock
+
+import asyncio
+import inspect
+import pandas as pd
+import threading
+
+
+def _get_session(domain: str = "localhost") -> RetryBackoffSession:
+    pi_settings = PiSettings(
+        settings_name="wis_stand_alone_point_work",
+        domain=domain,
+        port=8080,
+        service="FewsWebServices",
+        document_version=1.25,
+        filter_id="INTERNAL-API",
+        module_instance_ids="WerkFilter",
+        time_zone=0.0,
+        ssl_verify=False,
+    )
+    return RetryBackoffSession(
+        _request_settings=get_default_request_settings(), pi_settings=pi_settings, output_dir=None
+    )
+
+
+def test_document_format_per_request():
+    # requests in flight (AsyncApi, MultiApi) share the session, so one request must not change the format of another
+    session = _get_session()
+    xml_request = GetFilters(output_choice=OutputChoices.xml_response_in_memory, retry_backoff_session=session)
+    json_request = GetParameters(output_choice=OutputChoices.json_response_in_memory, retry_backoff_session=session)
+    assert session.pi_settings.document_format is None
+    assert xml_request.pi_settings.document_format == PiRestDocumentFormatChoices.xml
+    assert json_request.pi_settings.document_format == PiRestDocumentFormatChoices.json
+    assert xml_request.filtered_fews_parameters["documentFormat"] == PiRestDocumentFormatChoices.xml.value
+
+
+def test_no_caches_between_runs_by_default():
+    # nothing is remembered on disk (and no permission or health check is skipped) unless a user enables it
+    request_settings = get_default_request_settings()
+    assert request_settings.window_hints_path is None
+    assert request_settings.metadata_cache_path is None
+    # metadata is cached in memory only, so not between runs
+    assert request_settings.metadata_cache_ttl == pd.Timedelta(days=1)
+    assert request_settings.response_cache_path is None and request_settings.series_store_dir is None
+    assert inspect.signature(ApiBase).parameters["startup_cache_path"].default is None
+
+
+def test_api_resolves_permissions_and_pi_settings_on_first_use(tmp_path):
+    with mock.patch("hdsr_fewspy.api_base.Permissions") as permissions_mock:
+        api = ApiBase(github_personal_access_token="x" * 40, startup_cache_path=tmp_path / "startup.json")
+        assert not permissions_mock.called
+        assert api.permissions is api.permissions
+    permissions_mock.assert_called_once_with(secrets=api.secrets, startup_cache=api.startup_cache)
+    assert api.startup_cache.path == tmp_path / "startup.json"
+
+
+def test_async_api_resolves_pi_settings_in_a_thread():
+    threads = []
+
+    def get_pi_settings(_) -> PiSettings:
+        threads.append(threading.current_thread())
+        return _get_session().pi_settings
+
+    async def ensure_service_is_running(_) -> None:
+        return None
+
+    async def enter_and_exit() -> None:
+        async with AsyncApi(github_personal_access_token="x" * 40):
+            pass
+
+    with mock.patch.object(ApiBase, "pi_settings", property(get_pi_settings)), mock.patch.object(
+        AsyncApi, "ensure_service_is_running", ensure_service_is_running
+    ):
+        asyncio.run(enter_and_exit())
+    assert threads and threading.main_thread() not in threads
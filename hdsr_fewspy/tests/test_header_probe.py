@@ -0,0 +1,107 @@
+from datetime import datetime
+from datetime import timedelta
+from hdsr_fewspy.converters.header_probe import HeaderStatistics
+from hdsr_fewspy.converters.header_probe import probe_pi_headers
+from hdsr_fewspy.converters.utils import create_response
+from hdsr_fewspy.converters.xml_to_python_obj import parse
+from typing import Dict
+
+import json
+import pytest
+import requests
+import time
+
+
+# the xml probe must be at least this many times faster than xml_to_python_obj.parse. Now about 3 times
+MIN_SPEEDUP_XML = 1.5
+
+PI_HEADER = {
+    "type": "instantaneous",
+    "moduleInstanceId": "WerkFilter",
+    "locationId": "OW433001",
+    "parameterId": "H.G.0",
+    "timeStep": {"unit": "second", "multiplier": "900"},
+    "startDate": {"date": "2012-01-01", "time": "00:00:00"},
+    "endDate": {"date": "2013-01-01", "time": "00:00:00"},
+    "missVal": "-999.0",
+    "lat": "52.0",
+    "lon": "4.9",
+    "x": "125362.0",
+    "y": "455829.0",
+    "units": "mNAP",
+    "firstValueTime": {"date": "2012-01-01", "time": "00:15:00"},
+    "lastValueTime": {"date": "2013-01-01", "time": "00:00:00"},
+    "valueCount": "35136",
+}
+
+EXPECTED = HeaderStatistics(
+    location_id="OW433001",
+    parameter_id="H.G.0",
+    value_count=35136,
+    first_value_time=datetime(2012, 1, 1, 0, 15),
+    last_value_time=datetime(2013, 1, 1),
+    miss_val=-999.0,
+    time_step=timedelta(minutes=15),
+)
+
+
+def _get_json_response(pi_header: Dict, nr_time_series: int = 1) -> requests.Response:
+    response_json = {"version": "1.25", "timeZone": "0.0", "timeSeries": [{"header": pi_header}] * nr_time_series}
+    return create_response(status_code=200, content=json.dumps(response_json).encode("utf-8"), url="x")
+
+
+def _get_xml_response(pi_header: Dict, nr_time_series: int = 1, tail: str = "</TimeSeries>") -> requests.Response:
+    elements = []
+    for key, value in pi_header.items():
+        if isinstance(value, dict):
+            elements.append(f"<{key} " + " ".join(f'{k}="{v}"' for k, v in value.items()) + "/>")
+        else:
+            elements.append(f"<{key}>{value}</{key}>")
+    series = "<series><header>" + "".join(elements) + "</header></series>"
+    content = '<TimeSeries xmlns="http://www.wldelft.nl/fews/PI" version="1.25"><timeZone>0.0</timeZone>'
+    content += series * nr_time_series + tail
+    return create_response(status_code=200, content=content.encode("utf-8"), url="x")
+
+
+def test_probe_pi_headers():
+    assert probe_pi_headers(response=_get_json_response(pi_header=PI_HEADER)) == [EXPECTED]
+    assert probe_pi_headers(response=_get_xml_response(pi_header=PI_HEADER)) == [EXPECTED]
+    assert probe_pi_headers(response=_get_json_response(pi_header=PI_HEADER, nr_time_series=0)) == []
+    assert probe_pi_headers(response=_get_xml_response(pi_header=PI_HEADER, nr_time_series=0)) == []
+
+
+def test_probe_pi_headers_without_statistics():
+    pi_header = {k: v for k, v in PI_HEADER.items() if k not in ("valueCount", "firstValueTime", "lastValueTime")}
+    pi_header["timeStep"] = {"unit": "nonequidistant"}
+    expected = HeaderStatistics(location_id="OW433001", parameter_id="H.G.0", miss_val=-999.0)
+    assert probe_pi_headers(response=_get_json_response(pi_header=pi_header)) == [expected]
+    assert probe_pi_headers(response=_get_xml_response(pi_header=pi_header)) == [expected]
+
+
+def test_probe_pi_headers_stops_early():
+    # the rest of the body is not parsed (here it is not even valid xml)
+    response = _get_xml_response(pi_header=PI_HEADER, nr_time_series=2, tail="<broken")
+    assert probe_pi_headers(response=response, max_nr_headers=1) == [EXPECTED]
+    response = _get_json_response(pi_header=PI_HEADER, nr_time_series=3)
+    assert probe_pi_headers(response=response, max_nr_headers=2) == [EXPECTED, EXPECTED]
+
+
+@pytest.mark.benchmark
+def test_probe_pi_headers_benchmark():
+    response = _get_xml_response(pi_header=PI_HEADER)
+    seconds = {}
+    funcs = [
+        ("tree", lambda: int(parse(response.text).TimeSeries.series.header.valueCount.cdata)),
+        ("probe", lambda: probe_pi_headers(response=response, max_nr_headers=2)[0].value_count),
+    ]
+    for name, func in funcs:
+        # best of 3, so that a busy machine does not make this test fail
+        durations = []
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(200):
+                func()
+            durations.append(time.perf_counter() - start)
+        seconds[name] = min(durations)
+    speedup = seconds["tree"] / seconds["probe"]
+    assert speedup >= MIN_SPEEDUP_XML, f"xml probe is only {speedup:.1f} times faster, seconds={seconds}"
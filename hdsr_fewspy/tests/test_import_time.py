@@ -0,0 +1,43 @@
+from typing import Dict
+
+import pytest
+import subprocess
+import sys
+
+
+# modules that are slow to import and only needed for some features (e.g. get_locations)
+LAZY_MODULES = ["geopandas", "shapely", "hdsr_pygithub", "github", "httpx"]
+# max seconds for 'import hdsr_fewspy' on top of pandas (which we always need). Now about 0.15 sec
+IMPORT_TIME_BUDGET_SECONDS = 0.5
+
+
+def _get_import_times() -> Dict[str, float]:
+    """Cumulative import time (seconds) per top-level module of 'import hdsr_fewspy' in a new python process."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import hdsr_fewspy"], capture_output=True, text=True, check=True
+    )
+    import_times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if cumulative.strip().isdigit():
+            # the first (outermost) import of a module counts
+            import_times.setdefault(module.strip(), int(cumulative) / 1e6)
+    return import_times
+
+
+def test_import_does_not_load_lazy_modules():
+    code = f"import hdsr_fewspy, sys; print([x for x in {LAZY_MODULES} if x in sys.modules])"
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert completed.stdout.strip() == "[]"
+
+
+@pytest.mark.benchmark
+def test_import_time_budget():
+    # best of 3, so that a busy machine does not make this test fail
+    import_seconds = []
+    for _ in range(3):
+        import_times = _get_import_times()
+        import_seconds.append(import_times["hdsr_fewspy"] - import_times.get("pandas", 0))
+    assert min(import_seconds) < IMPORT_TIME_BUDGET_SECONDS, f"import hdsr_fewspy takes {min(import_seconds)} sec"
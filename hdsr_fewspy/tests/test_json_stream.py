@@ -0,0 +1,97 @@
+from hdsr_fewspy.converters import json_stream
+from hdsr_fewspy.converters.json_stream import stream_pi_time_series
+from hdsr_fewspy.converters.json_to_df_time_series import response_jsons_to_events
+from hdsr_fewspy.converters.json_to_df_time_series import response_jsons_to_one_df
+from hdsr_fewspy.converters.utils import create_response
+from typing import Dict
+from typing import List
+
+import json
+import pandas as pd
+import pytest
+import requests
+import tracemalloc
+
+
+pytest.importorskip("ijson")
+
+
+def _get_time_series(location_id: str, nr_events: int) -> Dict:
+    date_time = {"date": "2019-01-01", "time": "00:00:00"}
+    header = {
+        "type": "instantaneous",
+        "moduleInstanceId": "WerkFilter",
+        "locationId": location_id,
+        "parameterId": "H.G.0",
+        "qualifierId": ["validated"],
+        "timeStep": {"unit": "nonequidistant"},
+        "startDate": date_time,
+        "endDate": date_time,
+        "missVal": "-999.0",
+        "lat": "52.0",
+        "lon": "5.0",
+        "x": "140000.0",
+        "y": "450000.0",
+        "units": "m",
+    }
+    events = [
+        {
+            "date": date_time.strftime("%Y-%m-%d"),
+            "time": date_time.strftime("%H:%M:%S"),
+            "value": "-999.0" if index % 50 == 0 else f"{(index % 400) / 100 - 2:.3f}",
+            "flag": str([0, 3][index % 2]),
+            "flagSourceColumn": {"fs:PRIMAIR": "OK", "fs:VISUEEL": "OK"},
+        }
+        for index, date_time in enumerate(pd.date_range(start="2019-01-01", periods=nr_events, freq="15min"))
+    ]
+    return {"header": header, "events": events}
+
+
+def _get_response(time_series: List[Dict]) -> requests.Response:
+    response_json = {"version": "1.25", "timeZone": "1.0", "timeSeries": time_series}
+    return create_response(status_code=200, content=json.dumps(response_json).encode("utf-8"), url="x")
+
+
+def test_stream_pi_time_series():
+    response = _get_response(time_series=[_get_time_series("OW433001", 3), _get_time_series("OW433002", 0)])
+    expected = response.json()
+    found = stream_pi_time_series(response=response)
+    assert found["version"] == expected["version"] and found["timeZone"] == expected["timeZone"]
+    assert [x["header"] for x in found["timeSeries"]] == [x["header"] for x in expected["timeSeries"]]
+    # nested flagSourceColumn is skipped
+    assert found["timeSeries"][0]["events"] == {
+        key: [event[key] for event in expected["timeSeries"][0]["events"]] for key in ("date", "time", "value", "flag")
+    }
+    assert found["timeSeries"][1]["events"] == {}
+
+
+def test_stream_pi_time_series_not_columnar():
+    time_series = _get_time_series("OW433001", 3)
+    del time_series["events"][1]["flag"]
+    assert stream_pi_time_series(response=_get_response(time_series=[time_series])) is None
+    assert stream_pi_time_series(response=create_response(status_code=200, content=b"{broken", url="x")) is None
+
+
+@pytest.mark.parametrize("only_value_and_flag", [True, False])
+def test_streamed_df_equals_json_df(monkeypatch, only_value_and_flag):
+    responses = [_get_response(time_series=[_get_time_series("OW433001", 500)]) for _ in range(2)]
+    kwargs = dict(drop_missing_values=True, flag_threshold=3, only_value_and_flag=only_value_and_flag)
+    df = response_jsons_to_one_df(responses=responses, **kwargs)
+    events, missing_value = response_jsons_to_events(responses=responses)
+    monkeypatch.setattr(json_stream, "_import_ijson", lambda: None)  # as if ijson is not installed
+    pd.testing.assert_frame_equal(df, response_jsons_to_one_df(responses=responses, **kwargs))
+    expected_events, expected_missing_value = response_jsons_to_events(responses=responses)
+    pd.testing.assert_frame_equal(events, expected_events)
+    assert missing_value == expected_missing_value
+
+
+@pytest.mark.benchmark
+def test_stream_peak_memory():
+    response = _get_response(time_series=[_get_time_series("OW433001", 50_000)])
+    peak_bytes = {}
+    for name, func in [("json", response.json), ("stream", lambda: stream_pi_time_series(response=response))]:
+        tracemalloc.start()
+        func()
+        peak_bytes[name] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    assert peak_bytes["stream"] < peak_bytes["json"] / 2, f"peak_bytes={peak_bytes}"
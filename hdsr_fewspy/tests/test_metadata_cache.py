@@ -0,0 +1,51 @@
+from hdsr_fewspy.converters.utils import create_response
+from hdsr_fewspy.metadata_cache import get_metadata_cache
+from hdsr_fewspy.metadata_cache import MetadataCache
+
+import pandas as pd
+import time
+
+
+url = "http://localhost:8080/FewsWebServices/rest/fewspiservice/v1/locations/"
+params = {"filterId": "INTERNAL-API", "documentFormat": "PI_JSON", "documentVersion": 1.25}
+
+
+def _create_response(content: bytes, status_code: int = 200):
+    return create_response(status_code=status_code, content=content, url=url, headers={}, encoding="utf-8")
+
+
+def test_metadata_cache_memory_and_disk(tmp_path):
+    path = tmp_path / "metadata.sqlite"
+    metadata_cache = MetadataCache(path=path, ttl=pd.Timedelta(days=1))
+    assert metadata_cache.get(url=url, params=params) is None
+    response = _create_response(content=b'{"locations": []}')
+    metadata_cache.set(url=url, params=params, response=response)
+    # same object from memory, and from disk in a new instance (e.g. the next python session)
+    assert metadata_cache.get(url=url, params=params) is response
+    assert MetadataCache(path=path, ttl=pd.Timedelta(days=1)).get(url=url, params=params).json() == {"locations": []}
+    # other pi_settings, other response
+    assert metadata_cache.get(url=url, params={**params, "filterId": "WIS_werkfilter"}) is None
+    # not ok responses are not cached
+    metadata_cache.set(url=url, params={"x": 1}, response=_create_response(content=b"", status_code=500))
+    assert metadata_cache.get(url=url, params={"x": 1}) is None
+
+
+def test_metadata_cache_ttl(tmp_path):
+    metadata_cache = MetadataCache(path=tmp_path / "metadata.sqlite", ttl=pd.Timedelta(milliseconds=100))
+    metadata_cache.set(url=url, params=params, response=_create_response(content=b"{}"))
+    assert metadata_cache.get(url=url, params=params)
+    time.sleep(0.2)
+    assert metadata_cache.get(url=url, params=params) is None
+
+    memory_cache = MetadataCache(path=None, ttl=pd.Timedelta(days=1))
+    memory_cache.set(url=url, params=params, response=_create_response(content=b"{}"))
+    assert memory_cache.get(url=url, params=params)
+    assert MetadataCache(path=None, ttl=pd.Timedelta(days=1)).get(url=url, params=params) is None
+
+
+def test_get_metadata_cache(tmp_path):
+    assert get_metadata_cache(path=tmp_path, ttl=None) is None
+    assert get_metadata_cache(path=tmp_path, ttl=pd.Timedelta(0)) is None
+    path = tmp_path / "metadata.sqlite"
+    metadata_cache = get_metadata_cache(path=path, ttl=pd.Timedelta(days=1))
+    assert metadata_cache is get_metadata_cache(path=str(path), ttl=pd.Timedelta(days=1))
@@ -0,0 +1,72 @@
+from datetime import datetime
+from hdsr_fewspy.api_calls.time_series.base import TimeSeriesStatistics
+from hdsr_fewspy.api_calls.time_series.get_time_series_single import GetTimeSeriesSingle
+from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.converters.utils import create_response
+from hdsr_fewspy.tests.test_batched_download import _get_time_series_response
+from hdsr_fewspy.tests.test_batched_download import _run
+from hdsr_fewspy.tests.test_get_request import _get_session
+from hdsr_fewspy.window_hints import get_window_hints
+from typing import Dict
+
+import json
+import pandas as pd
+
+
+TIMESTAMPS_PER_DAY = 192  # the real density: twice as dense as the window hint of an earlier run
+
+
+def _get_probe_response(request_params: Dict) -> object:
+    days = (pd.Timestamp(request_params["endTime"]) - pd.Timestamp(request_params["startTime"])) / pd.Timedelta(days=1)
+    header = {"locationId": "OW433001", "parameterId": "H.G.0", "valueCount": str(int(days * TIMESTAMPS_PER_DAY))}
+    response_json = {"version": "1.25", "timeZone": "0.0", "timeSeries": [{"header": header}]}
+    return create_response(status_code=200, content=json.dumps(response_json).encode("utf-8"), url="x")
+
+
+def test_estimated_plan_is_checked_per_date_range(tmp_path):
+    session = _get_session()
+    session.request_settings.max_request_nr_timestamps = 10000
+    session.request_settings.min_request_nr_timestamps = 1000
+    session.request_settings.window_hints_path = tmp_path / "window_hints.json"
+    request = GetTimeSeriesSingle(
+        start_time=datetime(2012, 1, 1),
+        end_time=datetime(2013, 1, 1),
+        location_ids="OW433001",
+        parameter_ids="H.G.0",
+        qualifier_ids=None,
+        thinning=None,
+        omit_empty_time_series=True,
+        output_choice=OutputChoices.json_response_in_memory,
+        retry_backoff_session=session,
+    )
+    request_params = request.initial_fews_parameters
+    window_hints = get_window_hints(path=session.request_settings.window_hints_path)
+    window_hints.update(
+        key=window_hints.get_key(domain="localhost", request_params=request_params), timestamps_per_day=96
+    )
+    downloaded_date_ranges = []
+
+    def respond(request_params: Dict):
+        if request_params["onlyHeaders"]:
+            return _get_probe_response(request_params=request_params)
+        downloaded_date_ranges.append(
+            (pd.Timestamp(request_params["startTime"]), pd.Timestamp(request_params["endTime"]))
+        )
+        return _get_time_series_response(location_ids=["OW433001"])
+
+    # FEWS did not return a valueCount, so the date ranges are planned with the density of the window hint
+    responses = _run(
+        generator=request._iter_download_time_series_planned(
+            request_params=request_params, statistics=TimeSeriesStatistics(nr_timestamps=None)
+        ),
+        respond=respond,
+    )
+    assert len(responses) == len(downloaded_date_ranges)
+    assert downloaded_date_ranges[0][0] == pd.Timestamp("2012-01-01", tz="UTC")
+    assert downloaded_date_ranges[-1][1] == pd.Timestamp("2013-01-01", tz="UTC")
+    # the estimate (7500 timestamps per date range) was too low, so the date ranges were halved before the download
+    for start, end in downloaded_date_ranges:
+        assert (end - start) / pd.Timedelta(days=1) * TIMESTAMPS_PER_DAY <= 10000
+    # the time-window is kept on the api call, the request_settings are shared by other api calls and workers
+    assert request.updated_request_period is not None
+    assert session.request_settings.updated_request_period is None
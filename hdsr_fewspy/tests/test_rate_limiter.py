@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+from hdsr_fewspy.constants.request_settings import RequestSettings
+from hdsr_fewspy.rate_limiter import get_rate_limiter
+from hdsr_fewspy.rate_limiter import TokenBucketRateLimiter
+from hdsr_fewspy.retry_session import RateLimitedRetry
+from hdsr_fewspy.tests.test_get_request import _get_session
+from unittest import mock
+from urllib3 import HTTPConnectionPool
+from urllib3 import HTTPResponse
+
+import asyncio
+import pandas as pd
+import pytest
+import time
+
+
+def test_rate_limiter_burst_is_not_throttled():
+    rate_limiter = TokenBucketRateLimiter(requests_per_second=1, burst_size=5)
+    start = time.monotonic()
+    for _ in range(5):
+        rate_limiter.acquire()
+    assert time.monotonic() - start < 0.1
+
+
+def test_rate_limiter_sub_second_rate_threads():
+    rate_limiter = TokenBucketRateLimiter(requests_per_second=20, burst_size=1)
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: rate_limiter.acquire(), range(11)))
+    # first request uses the burst token, the other 10 requests wait 1/20 second each
+    assert 0.45 < time.monotonic() - start < 0.8
+
+
+def test_rate_limiter_sub_second_rate_tasks():
+    rate_limiter = TokenBucketRateLimiter(requests_per_second=20, burst_size=1)
+
+    async def acquire_all():
+        await asyncio.gather(*[rate_limiter.acquire_async() for _ in range(11)])
+
+    start = time.monotonic()
+    asyncio.run(acquire_all())
+    assert 0.45 < time.monotonic() - start < 0.8
+
+
+def test_rate_limiter_shared_per_domain():
+    rate_limiter_1 = get_rate_limiter(domain="test_domain", requests_per_second=2, burst_size=4)
+    rate_limiter_2 = get_rate_limiter(domain="test_domain", requests_per_second=3, burst_size=2)
+    rate_limiter_3 = get_rate_limiter(domain="other_test_domain", requests_per_second=2, burst_size=4)
+    assert rate_limiter_1 is rate_limiter_2
+    assert rate_limiter_1 is not rate_limiter_3
+    # the latest settings apply
+    assert (rate_limiter_1.requests_per_second, rate_limiter_1.burst_size) == (3, 2)
+
+
+def test_rate_limiter_applies_higher_settings():
+    # e.g. Api.__init__ with the default settings and then a higher requests_per_second and burst_size
+    rate_limiter = get_rate_limiter(domain="higher_test_domain", requests_per_second=1.0, burst_size=1)
+    get_rate_limiter(domain="higher_test_domain", requests_per_second=5.0, burst_size=4)
+    assert (rate_limiter.requests_per_second, rate_limiter.burst_size) == (5.0, 4)
+
+
+def test_session_applies_changed_request_settings():
+    session = _get_session(domain="changed_test_domain")
+    assert (session.rate_limiter.requests_per_second, session.rate_limiter.burst_size) == (1.0, 1)
+    session.request_settings.requests_per_second = 5.0
+    session.request_settings.burst_size = 4
+    assert (session.rate_limiter.requests_per_second, session.rate_limiter.burst_size) == (5.0, 4)
+
+
+def test_min_time_between_requests_is_deprecated():
+    with pytest.warns(DeprecationWarning, match="min_time_between_requests"):
+        request_settings = RequestSettings(
+            max_request_nr_timestamps=100000,
+            min_request_nr_timestamps=10000,
+            max_request_period=pd.Timedelta(weeks=52 * 2),
+            min_time_between_requests=pd.Timedelta(seconds=2),
+        )
+    assert request_settings.rate_limit == (0.5, 1)
+    request_settings.min_time_between_requests = None
+    assert request_settings.rate_limit == (1.0, 1)
+
+
+def test_session_resolves_rate_limiter_once():
+    session = _get_session(domain="session_test_domain")
+    rate_limiter = session.rate_limiter
+    with mock.patch("hdsr_fewspy.rate_limiter.get_rate_limiter") as get_rate_limiter_mock:
+        assert all(session.rate_limiter is rate_limiter for _ in range(3))
+        assert not get_rate_limiter_mock.called
+        session.request_settings.requests_per_second = 0.5
+        session.rate_limiter
+        assert get_rate_limiter_mock.call_count == 1
+
+
+def test_retry_takes_a_token():
+    rate_limiter = get_rate_limiter(domain="retry_test_domain", requests_per_second=20, burst_size=1)
+    rate_limiter.acquire()  # the first request
+    retry = RateLimitedRetry(total=2, status_forcelist=(500,), backoff_factor=0)
+    pool = HTTPConnectionPool(host="retry_test_domain")
+    start = time.monotonic()
+    for _ in range(2):
+        retry = retry.increment(method="GET", url="/", response=HTTPResponse(status=500), _pool=pool)
+    # each retry waits 1/20 second for its token
+    assert 0.09 < time.monotonic() - start < 0.4
+
+
+def test_rate_limiter_invalid_settings():
+    with pytest.raises(AssertionError):
+        TokenBucketRateLimiter(requests_per_second=0, burst_size=1)
+    with pytest.raises(AssertionError):
+        TokenBucketRateLimiter(requests_per_second=1, burst_size=0)
@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor
+from hdsr_fewspy.converters.utils import create_response
+from hdsr_fewspy.response_cache import get_response_cache
+from hdsr_fewspy.response_cache import ResponseCache
+
+import pandas as pd
+import time
+
+
+base_url = "http://localhost:8080/FewsWebServices/rest/fewspiservice/v1/"
+url = f"{base_url}timeseries/"
+params = {"locationIds": ["OW433001", "OW433002"], "parameterIds": "H.G.0", "qualifierIds": None}
+
+
+def _create_response(content: bytes, status_code: int = 200):
+    return create_response(status_code=status_code, content=content, url=url, headers={"a": "b"}, encoding="utf-8")
+
+
+def test_response_cache_get_set(tmp_path):
+    response_cache = ResponseCache(path=tmp_path / "responses.sqlite")
+    assert response_cache.get(url=url, params=params) is None
+    response_cache.set(url=url, params=params, response=_create_response(content=b"abc"))
+
+    # same url and params (other order, without None values) in a new instance (e.g. another process)
+    response = ResponseCache(path=tmp_path / "responses.sqlite").get(
+        url=url, params={"parameterIds": "H.G.0", "locationIds": ["OW433001", "OW433002"]}
+    )
+    assert response.status_code == 200
+    assert response.content == b"abc"
+    assert response.headers["A"] == "b"
+    assert response_cache.get(url=url, params={**params, "locationIds": ["OW433002", "OW433001"]}) is None
+
+    # not ok responses and endpoint 'timezoneid' are not cached
+    response_cache.set(url=url, params={"x": 1}, response=_create_response(content=b"", status_code=500))
+    assert response_cache.get(url=url, params={"x": 1}) is None
+    timezone_url = f"{base_url}timezoneid/"
+    response_cache.set(url=timezone_url, params=None, response=_create_response(content=b"GMT"))
+    assert response_cache.get(url=timezone_url, params=None) is None
+
+
+def test_response_cache_ttl_per_endpoint(tmp_path):
+    response_cache = ResponseCache(
+        path=tmp_path / "responses.sqlite", ttl_per_endpoint={"timeseries": pd.Timedelta(milliseconds=100)}
+    )
+    locations_url = f"{base_url}locations/"
+    for _url in (url, locations_url):
+        response_cache.set(url=_url, params=params, response=_create_response(content=b"abc"))
+    time.sleep(0.2)
+    assert response_cache.get(url=url, params=params) is None
+    assert response_cache.get(url=locations_url, params=params).content == b"abc"
+
+
+def test_response_cache_lru(tmp_path):
+    response_cache = ResponseCache(path=tmp_path / "responses.sqlite", max_size_bytes=250)
+    for index in range(2):
+        response_cache.set(url=url, params={"x": index}, response=_create_response(content=b"a" * 100))
+    # use the first one, so that the second one is the least recently used one
+    assert response_cache.get(url=url, params={"x": 0})
+    response_cache.set(url=url, params={"x": 2}, response=_create_response(content=b"a" * 100))
+    assert response_cache.get(url=url, params={"x": 0})
+    assert response_cache.get(url=url, params={"x": 1}) is None
+    assert response_cache.get(url=url, params={"x": 2})
+
+
+def _set_responses(path, process_index: int) -> None:
+    response_cache = ResponseCache(path=path)
+    for index in range(20):
+        content = f"{process_index}_{index}".encode()
+        response_cache.set(url=url, params={"x": process_index, "y": index}, response=_create_response(content))
+
+
+def test_response_cache_processes(tmp_path):
+    path = tmp_path / "responses.sqlite"
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_set_responses, [path] * 4, range(4)))
+    response_cache = ResponseCache(path=path)
+    for process_index in range(4):
+        for index in range(20):
+            response = response_cache.get(url=url, params={"x": process_index, "y": index})
+            assert response.content == f"{process_index}_{index}".encode()
+
+
+def test_get_response_cache(tmp_path):
+    assert get_response_cache(path=None) is None
+    path = tmp_path / "responses.sqlite"
+    assert get_response_cache(path=path) is get_response_cache(path=str(path))
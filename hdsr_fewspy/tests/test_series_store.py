@@ -0,0 +1,176 @@
+from datetime import datetime
+from datetime import timezone
+from hdsr_fewspy.api_calls.time_series.base import GetTimeSeriesBase
+from hdsr_fewspy.series_store import DownloadPeriod
+from hdsr_fewspy.series_store import get_series_store
+from hdsr_fewspy.series_store import SeriesStore
+
+import pandas as pd
+import pytest
+
+
+pytest.importorskip("pyarrow")
+
+request_params = {
+    "filterId": "WIS_werkfilter",
+    "moduleInstanceIds": "WerkFilter",
+    "locationIds": "OW433001",
+    "parameterIds": "H.G.0",
+    "qualifierIds": None,
+}
+
+
+def _create_events(start: str, end: str, value: float) -> pd.DataFrame:
+    index = pd.date_range(start=start, end=end, freq="1D", name="datetime")
+    return pd.DataFrame(data={"value": value, "flag": 0}, index=index)
+
+
+def test_series_store_write_read(tmp_path):
+    series_store = SeriesStore(root_dir=tmp_path, domain="localhost")
+    assert series_store.read(request_params=request_params) is None
+    path = series_store.write(
+        request_params=request_params,
+        events=_create_events(start="2020-01-01", end="2020-01-10", value=1.0),
+        period=DownloadPeriod(start=pd.Timestamp("2020-01-01"), end=pd.Timestamp("2020-01-10")),
+        missing_value=-999.0,
+        synced_at=pd.Timestamp("2020-01-11"),
+    )
+    assert path == tmp_path / "localhost" / "WIS_werkfilter" / "WerkFilter" / "OW433001" / "H.G.0.parquet"
+    stored_series = series_store.read(request_params=request_params)
+    assert len(stored_series.events) == 10
+    assert stored_series.synced_start == pd.Timestamp("2020-01-01")
+    assert stored_series.synced_end == pd.Timestamp("2020-01-10")
+    assert stored_series.missing_value == -999.0
+    assert stored_series.synced_at == pd.Timestamp("2020-01-11")
+
+    df = stored_series.to_df(
+        start_time=pd.Timestamp("2020-01-03"),
+        end_time=pd.Timestamp("2020-01-04"),
+        location_id="OW433001",
+        parameter_id="H.G.0",
+        drop_missing_values=True,
+        flag_threshold=None,
+    )
+    assert df.index.tolist() == [pd.Timestamp("2020-01-03"), pd.Timestamp("2020-01-04")]
+    assert df.columns.tolist() == ["value", "flag", "location_id", "parameter_id"]
+
+
+def test_series_store_download_periods(tmp_path):
+    series_store = SeriesStore(root_dir=tmp_path, domain="localhost")
+    start, end, overlap = pd.Timestamp("2019-12-01"), pd.Timestamp("2020-02-01"), pd.Timedelta(days=2)
+    periods = series_store.get_download_periods(request_params, start_time=start, end_time=end, overlap=overlap)
+    assert periods == [DownloadPeriod(start=start, end=end)]
+
+    series_store.write(
+        request_params=request_params,
+        events=_create_events(start="2020-01-01", end="2020-01-10", value=1.0),
+        period=DownloadPeriod(start=pd.Timestamp("2020-01-01"), end=pd.Timestamp("2020-01-20")),
+        missing_value=None,
+        synced_at=pd.Timestamp("2020-01-20"),
+    )
+    periods = series_store.get_download_periods(request_params, start_time=start, end_time=end, overlap=overlap)
+    # before the stored period, and from the last stored event minus overlap
+    assert periods == [
+        DownloadPeriod(start=start, end=pd.Timestamp("2020-01-01")),
+        DownloadPeriod(start=pd.Timestamp("2020-01-08"), end=end),
+    ]
+    # nothing to download if the stored period covers it (except the overlap)
+    periods = series_store.get_download_periods(
+        request_params, start_time=pd.Timestamp("2020-01-02"), end_time=pd.Timestamp("2020-01-05"), overlap=overlap
+    )
+    assert periods == []
+    # never a gap between the stored period and a later period
+    periods = series_store.get_download_periods(
+        request_params, start_time=pd.Timestamp("2020-01-25"), end_time=end, overlap=overlap
+    )
+    assert periods == [DownloadPeriod(start=pd.Timestamp("2020-01-08"), end=end)]
+
+    # by creation time: only changes since the last sync in the stored period, and all after the stored period
+    periods = series_store.get_download_periods(
+        request_params, start_time=start, end_time=end, overlap=overlap, by_creation_time=True
+    )
+    assert periods == [
+        DownloadPeriod(start=start, end=pd.Timestamp("2020-01-01")),
+        DownloadPeriod(
+            start=pd.Timestamp("2020-01-01"),
+            end=pd.Timestamp("2020-01-20"),
+            start_creation_time=pd.Timestamp("2020-01-20"),
+        ),
+        DownloadPeriod(start=pd.Timestamp("2020-01-20"), end=end),
+    ]
+
+
+def test_series_store_merge(tmp_path):
+    series_store = SeriesStore(root_dir=tmp_path, domain="localhost")
+    series_store.write(
+        request_params=request_params,
+        events=_create_events(start="2020-01-01", end="2020-01-10", value=1.0),
+        period=DownloadPeriod(start=pd.Timestamp("2020-01-01"), end=pd.Timestamp("2020-01-10")),
+        missing_value=-999.0,
+        synced_at=pd.Timestamp("2020-01-11"),
+    )
+    # a new download from 2020-01-08 replaces the stored events in that period (e.g. edited or removed in FEWS)
+    events = _create_events(start="2020-01-09", end="2020-01-15", value=2.0)
+    series_store.write(
+        request_params=request_params,
+        events=events,
+        period=DownloadPeriod(start=pd.Timestamp("2020-01-08"), end=pd.Timestamp("2020-01-15")),
+        missing_value=None,
+        synced_at=pd.Timestamp("2020-01-16"),
+    )
+    stored_series = series_store.read(request_params=request_params)
+    assert stored_series.synced_start == pd.Timestamp("2020-01-01")
+    assert stored_series.synced_end == pd.Timestamp("2020-01-15")
+    assert stored_series.missing_value == -999.0
+    assert stored_series.events.index.is_monotonic_increasing
+    assert pd.Timestamp("2020-01-08") not in stored_series.events.index
+    assert stored_series.events.loc["2020-01-07", "value"] == 1.0
+    assert stored_series.events.loc["2020-01-09":, "value"].eq(2.0).all()
+    assert len(stored_series.events) == 7 + 7
+    # the stored period was not up-to-date as a whole, so we keep the old synced_at
+    assert stored_series.synced_at == pd.Timestamp("2020-01-11")
+
+    # changed events (by creation time) are updated, other events in the period are kept
+    series_store.write(
+        request_params=request_params,
+        events=_create_events(start="2020-01-02", end="2020-01-02", value=3.0),
+        period=DownloadPeriod(
+            start=pd.Timestamp("2020-01-01"),
+            end=pd.Timestamp("2020-01-15"),
+            start_creation_time=pd.Timestamp("2020-01-11"),
+        ),
+        missing_value=None,
+        synced_at=pd.Timestamp("2020-01-17"),
+    )
+    stored_series = series_store.read(request_params=request_params)
+    assert len(stored_series.events) == 7 + 7
+    assert stored_series.events["value"].tolist().count(3.0) == 1
+    assert stored_series.events.loc["2020-01-02", "value"] == 3.0
+    assert stored_series.synced_at == pd.Timestamp("2020-01-17")
+
+    # a download of the whole stored period (without start_creation_time) is a full re-sync too
+    series_store.write(
+        request_params=request_params,
+        events=_create_events(start="2019-12-31", end="2020-01-15", value=4.0),
+        period=DownloadPeriod(start=pd.Timestamp("2019-12-31"), end=pd.Timestamp("2020-01-15")),
+        missing_value=None,
+        synced_at=pd.Timestamp("2020-01-18"),
+    )
+    stored_series = series_store.read(request_params=request_params)
+    assert stored_series.events["value"].eq(4.0).all()
+    assert stored_series.synced_at == pd.Timestamp("2020-01-18")
+
+
+def test_get_series_store(tmp_path):
+    assert get_series_store(root_dir=None, domain="localhost") is None
+    series_store = get_series_store(root_dir=tmp_path, domain="localhost")
+    assert series_store is get_series_store(root_dir=str(tmp_path), domain="localhost")
+    assert series_store is not get_series_store(root_dir=tmp_path, domain="other")
+
+
+def test_synced_at_is_naive_utc_with_clock_margin():
+    before = pd.Timestamp(datetime.now(timezone.utc).replace(tzinfo=None)).floor("s")
+    synced_at = GetTimeSeriesBase._get_synced_at()
+    after = pd.Timestamp(datetime.now(timezone.utc).replace(tzinfo=None))
+    assert synced_at.tzinfo is None
+    assert before - pd.Timedelta(minutes=5) <= synced_at <= after - pd.Timedelta(minutes=5)
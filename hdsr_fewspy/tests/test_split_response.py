@@ -0,0 +1,49 @@
+from hdsr_fewspy.constants.choices import PiRestDocumentFormatChoices
+from hdsr_fewspy.converters.split_response import split_time_series_response_per_location
+from hdsr_fewspy.converters.utils import create_response
+from hdsr_fewspy.converters.xml_to_python_obj import parse
+
+import json
+
+
+def _get_header(location_id: str) -> dict:
+    return {"locationId": location_id, "parameterId": "Q.B.m", "timeStep": {"unit": "nonequidistant"}}
+
+
+def test_split_json_response():
+    response_json = {
+        "version": "1.25",
+        "timeZone": "0.0",
+        "timeSeries": [
+            {"header": _get_header("KW100001"), "events": [{"date": "2012-01-01", "time": "00:00:00", "value": "1"}]},
+            {"header": _get_header("KW100002"), "events": [{"date": "2012-01-01", "time": "00:00:00", "value": "2"}]},
+        ],
+    }
+    response = create_response(status_code=200, content=json.dumps(response_json).encode("utf-8"), url="x")
+    response_per_location = split_time_series_response_per_location(
+        response=response, document_format=PiRestDocumentFormatChoices.json
+    )
+    assert list(response_per_location.keys()) == ["KW100001", "KW100002"]
+    found_json = response_per_location["KW100002"].json()
+    assert found_json["version"] == "1.25"
+    assert found_json["timeSeries"] == [response_json["timeSeries"][1]]
+
+
+def test_split_xml_response():
+    series = (
+        "<series>\n<header>\n<locationId>{location_id}</locationId>\n</header>\n"
+        '<event date="2012-01-01" time="00:00:00" value="1" flag="0"/>\n</series>\n'
+    )
+    response_text = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<TimeSeries xmlns="http://www.wldelft.nl/fews/PI" version="1.25">\n'
+        "<timeZone>0.0</timeZone>\n"
+        f"{series.format(location_id='KW100001')}{series.format(location_id='KW100002')}</TimeSeries>\n"
+    )
+    response = create_response(status_code=200, content=response_text.encode("utf-8"), url="x")
+    response_per_location = split_time_series_response_per_location(
+        response=response, document_format=PiRestDocumentFormatChoices.xml
+    )
+    assert list(response_per_location.keys()) == ["KW100001", "KW100002"]
+    found = parse(response_per_location["KW100002"].text)
+    assert found.TimeSeries.timeZone.cdata == "0.0"
+    assert found.TimeSeries.series.header.locationId.cdata == "KW100002"
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from hdsr_fewspy.constants.pi_settings import GithubPiSettingDefaults
+from hdsr_fewspy.permissions import Permissions
+from hdsr_fewspy.secrets import Secrets
+from hdsr_fewspy.startup_cache import get_startup_cache
+from hdsr_fewspy.startup_cache import StartupCache
+
+import time
+
+
+token = "abcdefghijklmnopqrstuvwxyz"
+
+
+def test_startup_cache_get_set(tmp_path):
+    path = tmp_path / "startup.json"
+    startup_cache = StartupCache(path=path)
+    assert startup_cache.get(key="a", ttl=timedelta(hours=1)) is None
+    startup_cache.set(key="a", value={"b": [1, 2]})
+    # also in a new instance (e.g. another process)
+    assert StartupCache(path=path).get(key="a", ttl=timedelta(hours=1)) == {"b": [1, 2]}
+    time.sleep(0.2)
+    assert startup_cache.get(key="a", ttl=timedelta(milliseconds=100)) is None
+    startup_cache.delete(key="a")
+    assert startup_cache.get(key="a", ttl=timedelta(hours=1)) is None
+
+    # the token itself is never stored
+    startup_cache.set(key=f"permissions|{StartupCache.hash_token(token=token)}", value={})
+    assert token not in path.read_text()
+
+
+def test_startup_cache_broken_file(tmp_path):
+    path = tmp_path / "startup.json"
+    path.write_text("{broken")
+    startup_cache = StartupCache(path=path)
+    assert startup_cache.get(key="a", ttl=timedelta(hours=1)) is None
+    startup_cache.set(key="a", value=1)
+    assert startup_cache.get(key="a", ttl=timedelta(hours=1)) == 1
+
+
+def test_permissions_and_settings_from_startup_cache(tmp_path):
+    """Without github requests (a fake token would fail on github)."""
+    startup_cache = get_startup_cache(path=tmp_path / "startup.json")
+    token_hash = StartupCache.hash_token(token=token)
+    startup_cache.set(
+        key=f"permissions|{token_hash}",
+        value={
+            "github_user": "https://github.com/someone",
+            "allowed_domain": "localhost,",
+            "allowed_service": "FewsWebServices",
+            "allowed_module_instance_id": "WerkFilter,MetingenFilter",
+            "allowed_filter_id": "INTERNAL-API",
+        },
+    )
+    startup_cache.set(
+        key=f"settings|{token_hash}",
+        value=[
+            {
+                "settings_name": "wis_stand_alone_point_work",
+                "document_version": 1.25,
+                "ssl_verify": True,
+                "domain": "localhost",
+                "port": 8080,
+                "service": "FewsWebServices",
+                "filter_id": "INTERNAL-API",
+                "module_instance_ids": "WerkFilter",
+                "time_zone": 0.0,
+            }
+        ],
+    )
+    secrets = Secrets(github_personal_access_token=token, secrets_env_path=tmp_path)
+    permissions = Permissions(secrets=secrets, startup_cache=startup_cache)
+    assert permissions.allowed_domain == ["localhost"]
+    assert permissions.allowed_module_instance_id == ["WerkFilter", "MetingenFilter"]
+
+    github_pi_setting_defaults = GithubPiSettingDefaults(token, startup_cache=startup_cache)
+    pi_settings = github_pi_setting_defaults.get_pi_settings(settings_name="wis_stand_alone_point_work")
+    assert pi_settings.port == 8080
+    assert pi_settings.ssl_verify is True
+    assert pi_settings.module_instance_ids == "WerkFilter"
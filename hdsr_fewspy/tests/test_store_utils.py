@@ -0,0 +1,34 @@
+from hdsr_fewspy.store_utils import load_json
+from hdsr_fewspy.store_utils import Registry
+from hdsr_fewspy.store_utils import save_json
+
+import pytest
+
+
+def test_save_and_load_json(tmp_path, caplog):
+    path = tmp_path / "sub_dir" / "store.json"
+    assert load_json(path=path, name="store") == {}
+    save_json(path=path, data={"a": 1}, name="store")
+    assert load_json(path=path, name="store") == {"a": 1}
+    # no temporary file is left behind
+    assert [x.name for x in path.parent.iterdir()] == ["store.json"]
+
+    path.write_text("{no json")
+    assert load_json(path=path, name="store") == {}
+    assert "could not read store" in caplog.text
+
+
+def test_save_json_crash_keeps_old_file(tmp_path):
+    path = tmp_path / "store.json"
+    save_json(path=path, data={"a": 1}, name="store")
+    with pytest.raises(TypeError):
+        save_json(path=path, data={"a": object()}, name="store")
+    assert load_json(path=path, name="store") == {"a": 1}
+    assert [x.name for x in tmp_path.iterdir()] == ["store.json"]
+
+
+def test_registry():
+    registry = Registry()
+    first = registry.get(key="a", create=list)
+    assert registry.get(key="a", create=list) is first
+    assert registry.get(key="b", create=list) is not first
@@ -0,0 +1,73 @@
+from hdsr_fewspy.window_hints import get_window_hints
+from hdsr_fewspy.window_hints import WindowHints
+
+import pandas as pd
+
+
+request_params = {
+    "filterId": "WIS_werkfilter",
+    "moduleInstanceIds": "WerkFilter",
+    "parameterIds": "H.G.0",
+    "locationIds": "OW433001",
+}
+
+
+def test_window_hints_persist_between_runs(tmp_path):
+    path = tmp_path / "window_hints.json"
+    window_hints = WindowHints(path=path)
+    key = window_hints.get_key(domain="localhost", request_params=request_params)
+    assert window_hints.get(key=key) is None
+
+    window_hints.update(key=key, request_period=pd.Timedelta(days=365))
+    window_hints.update(key=key, timestamps_per_day=96.0)
+    assert window_hints.get(key=key).timestamps_per_day == 96.0
+    # updates are kept in memory and written at once
+    assert not path.is_file()
+    window_hints.save()
+    assert path.is_file()
+
+    # a new instance (e.g. a new python process) reads the hints from file
+    hint = WindowHints(path=path).get(key=key)
+    assert hint.request_period == pd.Timedelta(days=365)
+    assert hint.timestamps_per_day == 96.0
+
+    other_key = window_hints.get_key(domain="localhost", request_params={**request_params, "locationIds": "OW433002"})
+    assert window_hints.get(key=other_key) is None
+
+
+def test_window_hints_broken_file(tmp_path, caplog):
+    path = tmp_path / "window_hints.json"
+    path.write_text("{no json")
+    window_hints = WindowHints(path=path)
+    key = window_hints.get_key(domain="localhost", request_params=request_params)
+    assert window_hints.get(key=key) is None
+    assert "could not read window hints" in caplog.text
+
+    # a broken file is overwritten by the next save
+    window_hints.update(key=key, request_period=pd.Timedelta(days=10))
+    window_hints.save()
+    assert WindowHints(path=path).get(key=key).request_period == pd.Timedelta(days=10)
+
+
+def test_window_hints_save_keeps_hints_of_other_processes(tmp_path):
+    path = tmp_path / "window_hints.json"
+    window_hints = WindowHints(path=path)
+    other_process = WindowHints(path=path)
+    key = window_hints.get_key(domain="localhost", request_params=request_params)
+    other_key = window_hints.get_key(domain="localhost", request_params={**request_params, "locationIds": "OW433002"})
+    window_hints.get(key=key)  # reads the file (no hints yet)
+
+    other_process.update(key=other_key, request_period=pd.Timedelta(days=30))
+    other_process.save()
+    window_hints.update(key=key, request_period=pd.Timedelta(days=365))
+    window_hints.save()
+
+    hints = WindowHints(path=path)
+    assert hints.get(key=key).request_period == pd.Timedelta(days=365)
+    assert hints.get(key=other_key).request_period == pd.Timedelta(days=30)
+
+
+def test_get_window_hints(tmp_path):
+    assert get_window_hints(path=None) is None
+    path = tmp_path / "window_hints.json"
+    assert get_window_hints(path=path) is get_window_hints(path=str(path))
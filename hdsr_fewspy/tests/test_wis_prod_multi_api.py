@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import hdsr_fewspy
+
+
+def test_wis_prod_multi_api_shares_session():
+    multi_api = hdsr_fewspy.MultiApi()
+    api_soilmoisture = multi_api.api(pi_settings=hdsr_fewspy.DefaultPiSettingsChoices.wis_production_area_soilmoisture)
+    api_wiwb = multi_api.api(pi_settings=hdsr_fewspy.DefaultPiSettingsChoices.wis_production_area_precipitation_wiwb)
+    assert api_soilmoisture is multi_api.api(
+        pi_settings=hdsr_fewspy.DefaultPiSettingsChoices.wis_production_area_soilmoisture
+    )
+    assert api_soilmoisture.pi_settings.settings_name == "wis_production_area_soilmoisture"
+    assert api_wiwb.pi_settings.settings_name == "wis_production_area_precipitation_wiwb"
+    assert api_soilmoisture.permissions is api_wiwb.permissions
+    assert api_soilmoisture.request_settings is api_wiwb.request_settings is multi_api.request_settings
+    session_soilmoisture = api_soilmoisture.retry_backoff_session
+    session_wiwb = api_wiwb.retry_backoff_session
+    assert session_soilmoisture is not session_wiwb
+    assert session_soilmoisture._retry_session is session_wiwb._retry_session
+    assert session_soilmoisture.rate_limiter is session_wiwb.rate_limiter
+
+
+def test_wis_prod_multi_api_run_concurrently():
+    multi_api = hdsr_fewspy.MultiApi()
+    kwargs = dict(
+        location_id="AFVG13",
+        start_time=datetime(year=2015, month=1, day=1),
+        end_time=datetime(year=2015, month=6, day=1),
+        drop_missing_values=True,
+        output_choice=hdsr_fewspy.OutputChoices.pandas_dataframe_in_memory,
+    )
+    api_call_soilmoisture = hdsr_fewspy.ApiCall(
+        pi_settings=hdsr_fewspy.DefaultPiSettingsChoices.wis_production_area_soilmoisture,
+        method="get_time_series_single",
+        kwargs={**kwargs, "parameter_id": "SM.d", "qualifier_id": "Lband05cm"},
+    )
+    api_call_wiwb = hdsr_fewspy.ApiCall(
+        pi_settings=hdsr_fewspy.DefaultPiSettingsChoices.wis_production_area_precipitation_wiwb,
+        method="get_time_series_single",
+        kwargs={**kwargs, "parameter_id": "Rh.h", "qualifier_id": "wiwb_merge"},
+    )
+    df_soilmoisture, df_wiwb = multi_api.run_concurrently(api_calls=[api_call_soilmoisture, api_call_wiwb])
+    assert len(df_soilmoisture) == 37
+    assert not df_wiwb.empty
+    # same as a separate Api for this pi_settings
+    api = hdsr_fewspy.Api(pi_settings=hdsr_fewspy.DefaultPiSettingsChoices.wis_production_area_soilmoisture)
+    df_expected = api.get_time_series_single(**api_call_soilmoisture.kwargs)
+    assert df_soilmoisture.equals(df_expected)
@@ -0,0 +1,43 @@
+from hdsr_fewspy.async_api import AsyncApi
+from hdsr_fewspy.constants.choices import DefaultPiSettingsChoices
+from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.constants.choices import TimeZoneChoices
+from hdsr_fewspy.tests import fixtures_requests
+from hdsr_fewspy.tests.fixtures import fixture_api_wis_sa_work_no_download_dir
+
+import asyncio
+import pandas as pd
+
+
+# silence flake8
+fixture_api_wis_sa_work_no_download_dir = fixture_api_wis_sa_work_no_download_dir
+
+
+def test_wis_sa_async_timezone_response():
+    async def get_response():
+        async with AsyncApi(pi_settings=DefaultPiSettingsChoices.wis_stand_alone_point_work) as api:
+            return await api.get_timezone_id(output_choice=OutputChoices.json_response_in_memory)
+
+    response = asyncio.run(get_response())
+    assert response.text == "GMT"
+    assert TimeZoneChoices.get_tz_float(value=response.text) == TimeZoneChoices.gmt.value
+
+
+def test_wis_sa_async_single_timeseries_equals_sync(fixture_api_wis_sa_work_no_download_dir):
+    request_data = fixtures_requests.RequestTimeSeriesMulti1
+    kwargs = dict(
+        start_time=request_data.start_time,
+        end_time=request_data.end_time,
+        parameter_id=request_data.parameter_ids[0],
+        output_choice=OutputChoices.pandas_dataframe_in_memory,
+    )
+
+    async def get_dfs():
+        async with AsyncApi(pi_settings=DefaultPiSettingsChoices.wis_stand_alone_point_work) as api:
+            coroutines = [api.get_time_series_single(location_id=x, **kwargs) for x in request_data.location_ids]
+            return await asyncio.gather(*coroutines)
+
+    dfs_async = asyncio.run(get_dfs())
+    for location_id, df_async in zip(request_data.location_ids, dfs_async):
+        df_sync = fixture_api_wis_sa_work_no_download_dir.get_time_series_single(location_id=location_id, **kwargs)
+        pd.testing.assert_frame_equal(df_async, df_sync)
@@ -0,0 +1,46 @@
+from hdsr_fewspy.api_calls import GetTimeSeriesInventory
+from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.tests import fixtures_requests
+from hdsr_fewspy.tests.fixtures import fixture_api_wis_sa_work_no_download_dir
+
+import pandas as pd
+import pytest
+
+
+# silence flake8
+fixture_api_wis_sa_work_no_download_dir = fixture_api_wis_sa_work_no_download_dir
+
+
+def test_wis_sa_time_series_inventory_wrong(fixture_api_wis_sa_work_no_download_dir):
+    api = fixture_api_wis_sa_work_no_download_dir
+    request_data = fixtures_requests.RequestTimeSeriesMulti1
+
+    # output_choice json_response_in_memory is not possible
+    with pytest.raises(AssertionError):
+        api.get_time_series_inventory(
+            location_ids=request_data.location_ids,
+            parameter_ids=request_data.parameter_ids,
+            start_time=request_data.start_time,
+            end_time=request_data.end_time,
+            output_choice=OutputChoices.json_response_in_memory,
+        )
+
+
+def test_wis_sa_time_series_inventory_1_ok_dataframe(fixture_api_wis_sa_work_no_download_dir):
+    api = fixture_api_wis_sa_work_no_download_dir
+    request_data = fixtures_requests.RequestTimeSeriesMulti1
+
+    df = api.get_time_series_inventory(
+        location_ids=request_data.location_ids,
+        parameter_ids=request_data.parameter_ids,
+        start_time=request_data.start_time,
+        end_time=request_data.end_time,
+        output_choice=OutputChoices.pandas_dataframe_in_memory,
+    )
+
+    assert isinstance(df, pd.DataFrame)
+    assert df.columns.to_list() == GetTimeSeriesInventory.inventory_columns
+    assert sorted(df["location_id"].to_list()) == request_data.location_ids
+    assert (df["value_count"] > 0).all()
+    assert (df["first_value_time"] >= pd.Timestamp(request_data.start_time)).all()
+    assert (df["last_value_time"] <= pd.Timestamp(request_data.end_time)).all()
@@ -180,6 +180,33 @@ def test_wis_sa_multi_timeseries_2_ok_json_download(fixture_api_wis_sa_work_with
         assert found_json == expected_json
 
 
+def test_wis_sa_multi_timeseries_2_ok_json_download_concurrent(fixture_api_wis_sa_work_with_download_dir):
+    """OutputChoices.json_file_in_download_dir with max_workers > 1 results in same files (and order)."""
+    api = fixture_api_wis_sa_work_with_download_dir
+    request_data = fixtures_requests.RequestTimeSeriesMulti2
+
+    all_file_paths = api.get_time_series_multi(
+        location_ids=request_data.location_ids,
+        parameter_ids=request_data.parameter_ids,
+        start_time=request_data.start_time,
+        end_time=request_data.end_time,
+        output_choice=OutputChoices.json_file_in_download_dir,
+        max_workers=3,
+    )
+    assert len(all_file_paths) == 3
+
+    assert all_file_paths[0].name == "gettimeseriesmulti_kw215712_ddy_20050101t000000z_20050102t000000z_0.json"
+    assert all_file_paths[1].name == "gettimeseriesmulti_kw215712_qby_20050101t000000z_20050102t000000z_0.json"
+    assert all_file_paths[2].name == "gettimeseriesmulti_kw322613_qby_20050101t000000z_20050102t000000z_0.json"
+
+    mapper_expected_jsons = request_data.get_expected_jsons()
+    for downloaded_file in all_file_paths:
+        with open(downloaded_file.as_posix()) as src:
+            found_json = json.load(src)
+        expected_json = mapper_expected_jsons[downloaded_file.stem]
+        assert found_json == expected_json
+
+
 def test_wis_sa_multi_time_series_2_ok_xml_download(fixture_api_wis_sa_work_with_download_dir):
     """OutputChoices.xml_file_in_download_dir."""
     api = fixture_api_wis_sa_work_with_download_dir
@@ -231,3 +258,28 @@ def test_wis_sa_multi_timeseries_2_ok_csv_download(fixture_api_wis_sa_work_with_
         df_found = pd.read_csv(filepath_or_buffer=downloaded_file, sep=",")
         df_expected = mapper_csv_expected[downloaded_file.stem]
         pd.testing.assert_frame_equal(left=df_found, right=df_expected)
+
+
+def test_wis_sa_multi_timeseries_1_ok_json_download_batched(fixture_api_wis_sa_work_with_download_dir):
+    """OutputChoices.json_file_in_download_dir with batched=True results in same files (and content)."""
+    api = fixture_api_wis_sa_work_with_download_dir
+    request_data = fixtures_requests.RequestTimeSeriesMulti1
+
+    all_file_paths = api.get_time_series_multi(
+        location_ids=request_data.location_ids,
+        parameter_ids=request_data.parameter_ids,
+        start_time=request_data.start_time,
+        end_time=request_data.end_time,
+        output_choice=OutputChoices.json_file_in_download_dir,
+        batched=True,
+    )
+    assert len(all_file_paths) == 2
+    assert all_file_paths[0].name == "gettimeseriesmulti_ow433001_hg0_20120101t000000z_20120102t000000z_0.json"
+    assert all_file_paths[1].name == "gettimeseriesmulti_ow433002_hg0_20120101t000000z_20120102t000000z_0.json"
+
+    mapper_expected_jsons = request_data.get_expected_jsons()
+    for downloaded_file in all_file_paths:
+        with open(downloaded_file.as_posix()) as src:
+            found_json = json.load(src)
+        expected_json = mapper_expected_jsons[downloaded_file.stem]
+        assert found_json == expected_json
@@ -1,3 +1,4 @@
+from hdsr_fewspy.api_calls.time_series.get_time_series_single import GetTimeSeriesSingle
 from hdsr_fewspy.constants.choices import OutputChoices
 from hdsr_fewspy.constants.choices import TimeZoneChoices
 from hdsr_fewspy.converters.utils import fews_date_str_to_datetime
@@ -7,6 +8,10 @@ from hdsr_fewspy.tests.fixtures import fixture_api_wis_sa_raw_no_download_dir
 from hdsr_fewspy.tests.fixtures import fixture_api_wis_sa_validated_no_download_dir
 from hdsr_fewspy.tests.fixtures import fixture_api_wis_sa_work_no_download_dir
 from hdsr_fewspy.tests.fixtures import fixture_api_wis_sa_work_with_download_dir
+from typing import List
+from typing import Tuple
+from typing import Union
+from unittest import mock
 
 import pandas as pd
 import pytest
@@ -19,6 +24,17 @@ fixture_api_wis_sa_raw_no_download_dir = fixture_api_wis_sa_raw_no_download_dir
 fixture_api_wis_sa_validated_no_download_dir = fixture_api_wis_sa_validated_no_download_dir
 
 
+def _get_time_series_single(api, **kwargs) -> Tuple[Union[List, pd.DataFrame], GetTimeSeriesSingle, int]:
+    """api.get_time_series_single(**kwargs), the api call (to check its updated_request_period afterwards) and the
+    number of requests to FEWS."""
+    session = api.retry_backoff_session
+    with mock.patch.object(
+        GetTimeSeriesSingle, "run", autospec=True, side_effect=GetTimeSeriesSingle.run
+    ) as run_mock, mock.patch.object(session, "get", wraps=session.get) as get_mock:
+        result = api.get_time_series_single(**kwargs)
+    return result, run_mock.call_args[0][0], get_mock.call_count
+
+
 def test_wis_sa_single_ts_wrong(fixture_api_wis_sa_work_no_download_dir):
     api = fixture_api_wis_sa_work_no_download_dir
 
@@ -176,7 +192,8 @@ def test_sa_single_ts_long_ok_json_memory(fixture_api_wis_sa_work_no_download_di
     api = fixture_api_wis_sa_work_no_download_dir
     request_data = fixtures_requests.RequestTimeSeriesSingleLong
 
-    responses = api.get_time_series_single(
+    responses, api_call, _ = _get_time_series_single(
+        api=api,
         location_id=request_data.location_ids,
         parameter_id=request_data.parameter_ids,
         start_time=request_data.start_time,
@@ -184,14 +201,15 @@ def test_sa_single_ts_long_ok_json_memory(fixture_api_wis_sa_work_no_download_di
         output_choice=OutputChoices.json_response_in_memory,
     )
     assert len(responses) == 1  # 4
-    assert not api.request_settings.updated_request_period  # == pd.Timedelta(days=365, hours=6, minutes=0, seconds=0)
+    assert not api_call.updated_request_period  # == pd.Timedelta(days=365, hours=6, minutes=0, seconds=0)
 
 
 def test_wis_sa_single_ts_long_ok_xml_memory(fixture_api_wis_sa_work_no_download_dir):
     api = fixture_api_wis_sa_work_no_download_dir
     request_data = fixtures_requests.RequestTimeSeriesSingleLong
 
-    responses = api.get_time_series_single(
+    responses, api_call, _ = _get_time_series_single(
+        api=api,
         location_id=request_data.location_ids,
         parameter_id=request_data.parameter_ids,
         start_time=request_data.start_time,
@@ -199,14 +217,15 @@ def test_wis_sa_single_ts_long_ok_xml_memory(fixture_api_wis_sa_work_no_download
         output_choice=OutputChoices.xml_response_in_memory,
     )
     assert len(responses) == 1  # 4
-    assert api.request_settings.updated_request_period is None  # pd.Timedelta(days=365, hours=6, minutes=0, seconds=0)
+    assert api_call.updated_request_period is None  # pd.Timedelta(days=365, hours=6, minutes=0, seconds=0)
 
 
 def test_sa_single_ts_long_ok_df_memory(fixture_api_wis_sa_work_no_download_dir):
     api = fixture_api_wis_sa_work_no_download_dir
     request_data = fixtures_requests.RequestTimeSeriesSingleLong
 
-    df_found = api.get_time_series_single(
+    df_found, api_call, _ = _get_time_series_single(
+        api=api,
         location_id=request_data.location_ids,
         parameter_id=request_data.parameter_ids,
         start_time=request_data.start_time,
@@ -214,14 +233,36 @@ def test_sa_single_ts_long_ok_df_memory(fixture_api_wis_sa_work_no_download_dir)
         output_choice=OutputChoices.pandas_dataframe_in_memory,
     )
     assert len(df_found) == 0  # 199252
-    assert api.request_settings.updated_request_period is None  # pd.Timedelta(days=365, hours=6, minutes=0, seconds=0)
+    assert api_call.updated_request_period is None  # pd.Timedelta(days=365, hours=6, minutes=0, seconds=0)
+
+
+def test_wis_sa_single_ts_short_ok_df_memory_pipelined(fixture_api_wis_sa_work_no_download_dir):
+    """max_requests_in_flight > 1 results in the same dataframe."""
+    api = fixture_api_wis_sa_work_no_download_dir
+    request_data = fixtures_requests.RequestTimeSeriesSingleShort
+    kwargs = dict(
+        location_id=request_data.location_ids,
+        parameter_id=request_data.parameter_ids,
+        start_time=request_data.start_time,
+        end_time=request_data.end_time,
+        output_choice=OutputChoices.pandas_dataframe_in_memory,
+    )
+    df_one_at_a_time = api.get_time_series_single(**kwargs)
+
+    api.request_settings.max_requests_in_flight = 3
+    try:
+        df_pipelined = api.get_time_series_single(**kwargs)
+    finally:
+        api.request_settings.max_requests_in_flight = 1
+    pd.testing.assert_frame_equal(df_one_at_a_time, df_pipelined)
 
 
 def test_wis_sa_single_raw_ts_long_ok_df_memory(fixture_api_wis_sa_raw_no_download_dir):
     api = fixture_api_wis_sa_raw_no_download_dir
     request_data = fixtures_requests.RequestTimeSeriesSingleLong
 
-    df_found = api.get_time_series_single(
+    df_found, api_call, _ = _get_time_series_single(
+        api=api,
         location_id=request_data.location_ids,
         parameter_id=request_data.parameter_ids,
         start_time=request_data.start_time,
@@ -229,14 +270,15 @@ def test_wis_sa_single_raw_ts_long_ok_df_memory(fixture_api_wis_sa_raw_no_downlo
         output_choice=OutputChoices.pandas_dataframe_in_memory,
     )
     assert len(df_found) == 0
-    assert api.request_settings.updated_request_period is None
+    assert api_call.updated_request_period is None
 
 
 def test_wis_sa_single_validated_ts_long_ok_df_memory(fixture_api_wis_sa_validated_no_download_dir):
     api = fixture_api_wis_sa_validated_no_download_dir
     request_data = fixtures_requests.RequestTimeSeriesSingleLong
 
-    df_found = api.get_time_series_single(
+    df_found, api_call, nr_requests = _get_time_series_single(
+        api=api,
         location_id=request_data.location_ids,
         parameter_id=request_data.parameter_ids,
         start_time=request_data.start_time,
@@ -245,14 +287,20 @@ def test_wis_sa_single_validated_ts_long_ok_df_memory(fixture_api_wis_sa_validat
     )
     assert sorted(df_found.columns) == ["flag", "location_id", "parameter_id", "value"]
     assert len(df_found) == 194444
-    assert api.request_settings.updated_request_period == pd.Timedelta(days=365, hours=6, minutes=0, seconds=0)
+    # time-windows are planned upfront (see DateFrequencyBuilder.create_planned_date_ranges), so no more halving of
+    # periods. Nonequidistant with valueCount 194444 (= len(df_found)) and the time-series covers the whole period:
+    # 1461 days * 75000 / 194444 = 563 days 12:42:59 (floored to seconds), so 3 time-windows
+    assert api_call.updated_request_period == pd.Timedelta(days=563, hours=12, minutes=42, seconds=59)
+    # 1 statistics request (whole period) + 3 time-windows
+    assert nr_requests == 4
 
 
 def test_wis_sa_single_validated_ts_long_ok_df_memory_all_fields(fixture_api_wis_sa_validated_no_download_dir):
     api = fixture_api_wis_sa_validated_no_download_dir
     request_data = fixtures_requests.RequestTimeSeriesSingleLongWithComment
 
-    df_found = api.get_time_series_single(
+    df_found, api_call, nr_requests = _get_time_series_single(
+        api=api,
         location_id=request_data.location_ids,
         parameter_id=request_data.parameter_ids,
         start_time=request_data.start_time,
@@ -262,4 +310,8 @@ def test_wis_sa_single_validated_ts_long_ok_df_memory_all_fields(fixture_api_wis
     )
     assert sorted(df_found.columns) == ["comment", "date", "flag", "location_id", "parameter_id", "time", "value"]
     assert len(df_found) == 101616
-    assert api.request_settings.updated_request_period == pd.Timedelta(days=2083, hours=4, minutes=30, seconds=0)
+    # nonequidistant with valueCount 101616 (= len(df_found)) and first/last value at start_time/end_time:
+    # 4166 days 09:00:00 * 75000 / 101616 = 3075 days 02:06:28 (floored to seconds), so 2 time-windows
+    assert api_call.updated_request_period == pd.Timedelta(days=3075, hours=2, minutes=6, seconds=28)
+    # 1 statistics request (whole period) + 2 time-windows
+    assert nr_requests == 3
@@ -0,0 +1,148 @@
+from hdsr_fewspy.constants.choices import OutputChoices
+from hdsr_fewspy.constants.choices import PiRestDocumentFormatChoices
+from hdsr_fewspy.constants.paths import TEST_INPUT_DIR
+from hdsr_fewspy.converters.json_to_df_time_series import response_jsons_to_one_df
+from hdsr_fewspy.converters.utils import create_response
+from hdsr_fewspy.converters.xml_stream import is_xml_response
+from hdsr_fewspy.converters.xml_stream import stream_pi_xml_time_series
+from hdsr_fewspy.converters.xml_to_python_obj import parse
+from pathlib import Path
+from typing import Dict
+from typing import List
+from xml.sax.saxutils import quoteattr
+
+import json
+import pandas as pd
+import pytest
+import requests
+import tracemalloc
+
+
+def _get_time_series(location_id: str, nr_events: int) -> Dict:
+    date_time = {"date": "2019-01-01", "time": "00:00:00"}
+    header = {
+        "type": "instantaneous",
+        "moduleInstanceId": "WerkFilter",
+        "locationId": location_id,
+        "parameterId": "H.G.0",
+        "qualifierId": ["validated"],
+        "timeStep": {"unit": "nonequidistant"},
+        "startDate": date_time,
+        "endDate": date_time,
+        "missVal": "-999.0",
+        "lat": "52.0",
+        "lon": "5.0",
+        "x": "140000.0",
+        "y": "450000.0",
+        "units": "m",
+    }
+    events = [
+        {
+            "date": date_time.strftime("%Y-%m-%d"),
+            "time": date_time.strftime("%H:%M:%S"),
+            "value": "-999.0" if index % 50 == 0 else f"{(index % 400) / 100 - 2:.3f}",
+            "flag": str([0, 3][index % 2]),
+        }
+        for index, date_time in enumerate(pd.date_range(start="2019-01-01", periods=nr_events, freq="15min"))
+    ]
+    return {"header": header, "events": events}
+
+
+def _to_xml(time_series_list: List[Dict]) -> bytes:
+    """The PI_XML of the same time-series as PI_JSON {'timeSeries': time_series_list}."""
+    lines = ['<TimeSeries xmlns="http://www.wldelft.nl/fews/PI" version="1.25">', "<timeZone>1.0</timeZone>"]
+    for time_series in time_series_list:
+        lines.append("<series><header>")
+        for key, value in time_series["header"].items():
+            for x in value if isinstance(value, list) else [value]:
+                if isinstance(x, dict):
+                    attributes = " ".join(f"{k}={quoteattr(v)}" for k, v in x.items())
+                    lines.append(f"<{key} {attributes}/>")
+                else:
+                    lines.append(f"<{key}>{x}</{key}>")
+        lines.append("</header>")
+        for event in time_series.get("events", []):
+            lines.append("<event " + " ".join(f"{k}={quoteattr(v)}" for k, v in event.items()) + "/>")
+        lines.append("</series>")
+    lines.append("</TimeSeries>")
+    return "\n".join(lines).encode("utf-8")
+
+
+def _get_responses(time_series_list: List[Dict]) -> Dict[str, requests.Response]:
+    response_json = {"version": "1.25", "timeZone": "1.0", "timeSeries": time_series_list}
+    return {
+        "json": create_response(status_code=200, content=json.dumps(response_json).encode("utf-8"), url="x"),
+        "xml": create_response(status_code=200, content=_to_xml(time_series_list=time_series_list), url="x"),
+    }
+
+
+def test_stream_pi_xml_time_series():
+    responses = _get_responses(time_series_list=[_get_time_series("OW433001", 3), _get_time_series("OW433002", 0)])
+    assert is_xml_response(response=responses["xml"]) and not is_xml_response(response=responses["json"])
+    expected = responses["json"].json()
+    found = stream_pi_xml_time_series(response=responses["xml"])
+    assert found["version"] == expected["version"] and found["timeZone"] == expected["timeZone"]
+    assert [x["header"] for x in found["timeSeries"]] == [x["header"] for x in expected["timeSeries"]]
+    assert found["timeSeries"][0]["events"] == {
+        key: [event[key] for event in expected["timeSeries"][0]["events"]] for key in ("date", "time", "value", "flag")
+    }
+    assert "events" not in found["timeSeries"][1]
+
+
+def test_stream_pi_xml_time_series_missing_attribute():
+    content = (
+        b'<TimeSeries xmlns="http://www.wldelft.nl/fews/PI"><series><header/>'
+        b'<event date="2005-01-01" time="00:00:00" value="1" flag="8"/>'
+        b'<event date="2005-01-02" time="00:00:00" value="2" flag="0" flagSource="d0u1"/>'
+        b'<event date="2005-01-03" time="00:00:00" value="3" flag="0"/>'
+        b"</series></TimeSeries>"
+    )
+    found = stream_pi_xml_time_series(response=create_response(status_code=200, content=content, url="x"))
+    assert found["timeSeries"][0]["events"]["flagSource"] == [None, "d0u1", None]
+    assert found["timeSeries"][0]["events"]["value"] == ["1", "2", "3"]
+
+
+@pytest.mark.parametrize("only_value_and_flag", [True, False])
+def test_xml_df_equals_json_df(only_value_and_flag):
+    responses = [_get_responses(time_series_list=[_get_time_series("OW433001", 500)]) for _ in range(2)]
+    kwargs = dict(drop_missing_values=True, flag_threshold=3, only_value_and_flag=only_value_and_flag)
+    df_xml = response_jsons_to_one_df(responses=[x["xml"] for x in responses], **kwargs)
+    df_json = response_jsons_to_one_df(responses=[x["json"] for x in responses], **kwargs)
+    assert not df_xml.empty
+    pd.testing.assert_frame_equal(df_xml, df_json)
+
+
+@pytest.mark.parametrize(
+    "xml_path", sorted((TEST_INPUT_DIR / "RequestTimeSeriesMulti2").glob("*.xml")), ids=lambda x: x.stem
+)
+def test_stream_pi_xml_time_series_test_data(xml_path: Path):
+    response = create_response(status_code=200, content=xml_path.read_bytes(), url="x")
+    found = stream_pi_xml_time_series(response=response)["timeSeries"]
+    # same as the untangle-style xml_to_python_obj
+    expected = parse(response.text).TimeSeries.series
+    assert len(found) == 1
+    assert found[0]["header"]["locationId"] == expected.header.locationId.cdata
+    assert found[0]["header"]["startDate"]["date"] == expected.header.startDate["date"]
+    columns = found[0]["events"]
+    assert {key: [x[key] for x in expected.event] for key in columns} == columns
+
+
+def test_dataframe_document_format():
+    get_format = OutputChoices.get_pi_rest_document_format
+    xml, json_ = PiRestDocumentFormatChoices.xml, PiRestDocumentFormatChoices.json
+    assert get_format(output_choice=OutputChoices.pandas_dataframe_in_memory) == json_
+    assert get_format(output_choice=OutputChoices.pandas_dataframe_in_memory, dataframe_document_format=xml) == xml
+    assert get_format(output_choice=OutputChoices.csv_file_in_download_dir, dataframe_document_format=xml) == xml
+    assert get_format(output_choice=OutputChoices.json_response_in_memory, dataframe_document_format=xml) == json_
+
+
+@pytest.mark.benchmark
+def test_stream_xml_peak_memory():
+    response = _get_responses(time_series_list=[_get_time_series("OW433001", 50_000)])["xml"]
+    peak_bytes = {}
+    for name, func in [("tree", lambda: parse(response.text)), ("stream", lambda: stream_pi_xml_time_series(response))]:
+        tracemalloc.start()
+        func()
+        peak_bytes[name] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    assert peak_bytes["stream"] < peak_bytes["tree"] / 2, f"peak_bytes={peak_bytes}"
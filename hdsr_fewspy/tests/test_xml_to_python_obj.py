@@ -0,0 +1,112 @@
+from hdsr_fewspy.constants.paths import TEST_INPUT_DIR
+from hdsr_fewspy.converters.xml_to_python_obj import Element
+from hdsr_fewspy.converters.xml_to_python_obj import parse
+from pathlib import Path
+from xml.etree import ElementTree
+
+import copy
+import pytest
+import time
+
+
+XML_PATHS = sorted(TEST_INPUT_DIR.glob("**/*.xml"))
+# parse (python objects) may be at most this many times slower than ElementTree.fromstring (C). Now about 4 times
+MAX_SLOWDOWN_FIXTURES = 10
+# a 4x larger text node (or 4x more children) may take at most this many times longer (linear is 4, quadratic is 16)
+MAX_SLOWDOWN_4X_LARGER = 8
+
+
+def _best_of_3(func) -> float:
+    # best of 3, so that a busy machine does not make a benchmark fail
+    durations = []
+    for _ in range(3):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def _assert_equal(element: Element, expected: ElementTree.Element):
+    assert element._name == expected.tag.replace("-", "_").replace(".", "_").replace(":", "_")
+    # namespace attributes (e.g. xmlns:xsi) differ: sax keeps the prefix, ElementTree the namespace
+    assert {k: v for k, v in element._attributes.items() if ":" not in k and k != "xmlns"} == {
+        k: v for k, v in expected.attrib.items() if "}" not in k
+    }
+    assert element.cdata.strip() == "".join(expected.itertext() if not len(expected) else [expected.text or ""]).strip()
+    assert len(element.children) == len(expected)
+    for child, expected_child in zip(element.children, expected):
+        _assert_equal(element=child, expected=expected_child)
+
+
+@pytest.mark.parametrize("xml_path", XML_PATHS, ids=lambda x: f"{x.parent.name}/{x.name}")
+def test_parse_test_data(xml_path: Path):
+    root = parse(xml_path.as_posix())
+    assert root.is_root and len(root.children) == 1
+    expected = ElementTree.parse(xml_path.as_posix()).getroot()
+    # ElementTree keeps the namespace in the tag, sax does not
+    for expected_element in expected.iter():
+        expected_element.tag = expected_element.tag.split("}")[-1]
+    _assert_equal(element=root.children[0], expected=expected)
+    assert parse(xml_path.read_text(encoding="utf-8")).TimeSeries.series.header.locationId.cdata
+
+
+def test_element_children_by_name():
+    root = parse("<a><b-c>1</b-c><d x='1'/><d x='2'/><e><f>2</f></e></a>")
+    assert root.a.b_c == "1"
+    assert [x["x"] for x in root.a.d] == ["1", "2"]
+    assert root.a.get_elements("d") == root.a.d and root.a.get_elements() == root.a.children
+    assert root.a.e.f.cdata == "2"
+    assert root.a.__hasattribute__("e") and not root.a.__hasattribute__("g")
+    with pytest.raises(AttributeError):
+        root.a.g
+    # a child added after a lookup is indexed too
+    root.a.add_child(Element(name="g", attributes={}))
+    assert root.a.g._name == "g"
+    assert copy.copy(root.a).e.f.cdata == "2"
+    element = parse("<a>" + "".join(f"<c{i}>{i}</c{i}>" for i in range(8_000)) + "</a>").a
+    assert element.c7999 == "7999"
+
+
+def test_element_cdata():
+    root = parse("<a>x<b>1</b>y&amp;z</a>")
+    assert root.a.cdata == "xy&z" and root.a.b.cdata == "1"
+    element = Element(name="a", attributes={})
+    for cdata in ("x", "y", "z"):
+        element.add_cdata(cdata)
+    element.end_cdata()
+    assert element.cdata == "xyz"
+
+
+@pytest.mark.benchmark
+def test_parse_benchmark_test_data():
+    xml_texts = [x.read_text(encoding="utf-8") for x in XML_PATHS]
+    seconds_parse = _best_of_3(lambda: [parse(x) for x in xml_texts for _ in range(10)])
+    seconds_element_tree = _best_of_3(lambda: [ElementTree.fromstring(x) for x in xml_texts for _ in range(10)])
+    slowdown = seconds_parse / seconds_element_tree
+    assert slowdown <= MAX_SLOWDOWN_FIXTURES, f"parse is {slowdown:.1f} times slower than ElementTree"
+
+
+def test_parse_text_node():
+    # the text of an element comes in many pieces (e.g. around each entity), these are joined once
+    assert parse("<a><b>" + "x&amp;" * 20_000 + "</b></a>").a.b.cdata == "x&" * 20_000
+
+
+@pytest.mark.benchmark
+def test_parse_benchmark_text_node():
+    seconds = {}
+    for nr_pieces in (20_000, 80_000):
+        xml = "<a><b>" + "x&amp;" * nr_pieces + "</b></a>"
+        seconds[nr_pieces] = _best_of_3(lambda: parse(xml))
+    slowdown = seconds[80_000] / seconds[20_000]
+    assert slowdown <= MAX_SLOWDOWN_4X_LARGER, f"4x larger text node is {slowdown:.1f} times slower"
+
+
+@pytest.mark.benchmark
+def test_parse_benchmark_children_by_name():
+    # a lookup by name does not scan all children
+    seconds = {}
+    for nr_children in (2_000, 8_000):
+        element = parse("<a>" + "".join(f"<c{i}>{i}</c{i}>" for i in range(nr_children)) + "</a>").a
+        seconds[nr_children] = _best_of_3(lambda: [getattr(element, f"c{i}") for i in range(nr_children)])
+    slowdown = seconds[8_000] / seconds[2_000]
+    assert slowdown <= MAX_SLOWDOWN_4X_LARGER, f"4x more children is {slowdown:.1f} times slower"
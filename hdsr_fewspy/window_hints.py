@@ -0,0 +1,128 @@
+from dataclasses import dataclass
+from datetime import datetime
+from hdsr_fewspy.store_utils import load_json
+from hdsr_fewspy.store_utils import Registry
+from hdsr_fewspy.store_utils import save_json
+from pathlib import Path
+from typing import Dict
+from typing import Optional
+
+import atexit
+import logging
+import pandas as pd
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WindowHint:
+    """What we learned from an earlier download of one time-series."""
+
+    request_period: Optional[pd.Timedelta] = None  # time-window of the last (planned or probed) download
+    timestamps_per_day: Optional[float] = None  # observed density of the time-series
+
+
+class WindowHints:
+    """Small on-disk store (json) with a WindowHint per time-series, so that a new run (new python process) starts
+    with the right time-window immediately instead of probing (again) from the whole period.
+
+    Hints are stored per domain, filter_id, module_instance_id, parameter_id, location_id (and qualifier_id). The store
+    is thread-safe. Updates are kept in memory and written at once with save() (at the end of a time-series download,
+    and at exit). save() first re-reads the file and only overwrites the hints that were updated, so that hints of other
+    processes are kept. A broken or unwritable file only results in a warning: hints are nice to have.
+
+    Example:
+        window_hints = WindowHints(path=Path.home() / ".hdsr_fewspy" / "window_hints.json")
+        key = window_hints.get_key(domain="localhost", request_params={"locationIds": "OW433001", ...})
+        window_hints.update(key=key, request_period=pd.Timedelta(days=365), timestamps_per_day=96.0)
+        window_hints.get(key=key)  # WindowHint(request_period=Timedelta('365 days 00:00:00'), timestamps_per_day=96.0)
+        window_hints.save()
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.__lock = threading.Lock()
+        self.__hints: Optional[Dict[str, Dict]] = None
+        self.__updated_hints: Dict[str, Dict] = {}  # not saved yet
+        atexit.register(self.save)
+
+    @staticmethod
+    def get_key(domain: str, request_params: Dict) -> str:
+        parts = [
+            domain,
+            request_params.get("filterId", ""),
+            request_params.get("moduleInstanceIds", ""),
+            request_params.get("parameterIds", ""),
+            request_params.get("locationIds", ""),
+            request_params.get("qualifierIds", "") or "",
+        ]
+        return "|".join(str(x) for x in parts)
+
+    def get(self, key: str) -> Optional[WindowHint]:
+        with self.__lock:
+            hint = self.__get_hints().get(key, None)
+        if not hint:
+            return None
+        request_period = hint.get("request_period_seconds", None)
+        return WindowHint(
+            request_period=pd.Timedelta(seconds=request_period) if request_period else None,
+            timestamps_per_day=hint.get("timestamps_per_day", None),
+        )
+
+    def update(
+        self,
+        key: str,
+        request_period: Optional[pd.Timedelta] = None,
+        timestamps_per_day: Optional[float] = None,
+    ) -> None:
+        """Remember what we learned from a time-series (in memory, see save). None means: keep the old value."""
+        new_hint = {}
+        if request_period is not None:
+            new_hint["request_period_seconds"] = request_period.total_seconds()
+        if timestamps_per_day:
+            new_hint["timestamps_per_day"] = round(timestamps_per_day, 6)
+        if not new_hint:
+            return
+        with self.__lock:
+            if all(self.__get_hints().get(key, {}).get(k, None) == v for k, v in new_hint.items()):
+                return
+            new_hint["updated"] = datetime.now().isoformat(timespec="seconds")
+            self.__get_hints().setdefault(key, {}).update(new_hint)
+            self.__updated_hints.setdefault(key, {}).update(new_hint)
+
+    def save(self) -> None:
+        """Write the updated hints to file. The file is re-read first, so that hints of other processes are kept."""
+        with self.__lock:
+            if not self.__updated_hints:
+                return
+            hints = self.__load()
+            for key, updated_hint in self.__updated_hints.items():
+                hints.setdefault(key, {}).update(updated_hint)
+            self.__save(hints=hints)
+            self.__hints = hints
+            self.__updated_hints = {}
+
+    def __get_hints(self) -> Dict[str, Dict]:
+        if self.__hints is None:
+            self.__hints = self.__load()
+        return self.__hints
+
+    def __load(self) -> Dict[str, Dict]:
+        return load_json(path=self.path, name="window hints")
+
+    def __save(self, hints: Dict[str, Dict]) -> None:
+        save_json(path=self.path, data=hints, name="window hints")
+
+
+# one store per path, so that all Api/AsyncApi instances (and their workers) share the same hints
+_WINDOW_HINTS: Registry[WindowHints] = Registry()
+
+
+def get_window_hints(path: Optional[Path]) -> Optional[WindowHints]:
+    """Get the window hints store of this path. Returns None if path is None (no hints)."""
+    if path is None:
+        return None
+    path = Path(path)
+    return _WINDOW_HINTS.get(key=path, create=lambda: WindowHints(path=path))
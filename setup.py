@@ -30,6 +30,22 @@ tests_require = [
     "pytest",
 ]
 
+async_require = [
+    "httpx",
+]
+
+parquet_require = [
+    "pyarrow",
+]
+
+arrow_require = [
+    "pyarrow>=14",
+]
+
+stream_require = [
+    "ijson",
+]
+
 setup(
     name="hdsr_fewspy",
     packages=find_packages(include=["hdsr_fewspy", "hdsr_fewspy.*"]),
@@ -49,7 +65,13 @@ setup(
     install_requires=install_requires,
     tests_require=tests_require,
     python_requires=">=3.7",
-    extras_require={"test": tests_require},
+    extras_require={
+        "test": tests_require,
+        "async": async_require,
+        "parquet": parquet_require,
+        "stream": stream_require,
+        "arrow": arrow_require,
+    },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",